@@ -0,0 +1,335 @@
+'''
+Benchmark suite for RHS kernels, integrators and setup costs. Run from
+the repository root:
+
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --baseline baseline.json --threshold 0.2
+
+Each benchmark reports the best wall time of several repetitions. With a
+baseline, benchmarks slower than baseline*(1 + threshold) are reported as
+regressions and the script exits with status 1. --save-baseline stores
+the results as the new baseline. Timings are machine dependent, keep a
+baseline per machine.
+'''
+
+import sys
+import json
+import time
+import argparse
+import platform
+import multiprocessing
+import numpy as np
+
+from maxwell.driver import *
+from maxwell.dg.mesh1d import *
+from maxwell.dg.dg1d import *
+from maxwell.dg.dg1d_tools import connect
+from maxwell.dg.mesh2d import *
+from maxwell.dg.dg2d import *
+from maxwell.fd.fd1d import *
+from maxwell.fd.fd2d import *
+from maxwell.fd.slabs import *
+
+TEST_DATA_FOLDER = 'testData/'
+
+
+def bestTime(function, repeat=5, number=1):
+    '''
+    Best wall time, over repeat repetitions, of number calls to function,
+    divided by number.
+    '''
+    best = np.inf
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - tic)/number)
+    return best
+
+
+def record(name, seconds, **params):
+    return {'name': name, 'seconds': seconds, 'params': params}
+
+
+def benchmarkDG1DRHS(quick=False):
+    results = []
+    for K in ([50] if quick else [50, 200, 800]):
+        for N in ([1, 3] if quick else [1, 3, 5]):
+            sp = DG1D(N, Mesh1D(-1.0, 1.0, K, boundary_label='Periodic'), 'Upwind')
+            fields = sp.buildFields()
+            fields['E'][:] = np.sin(np.pi*sp.x)
+            t = bestTime(lambda: sp.computeRHS(fields), number=20)
+            results.append(record('rhs/DG1D/N=%d/K=%d' % (N, K), t, N=N, K=K))
+    return results
+
+
+def benchmarkMaxwell2DRHS(quick=False):
+    results = []
+    for K in ([8] if quick else [8, 146]):
+        mesh = readFromGambitFile(TEST_DATA_FOLDER + 'Maxwell2D_K%d.neu' % K)
+        for N in ([1, 3] if quick else [1, 3, 5]):
+            sp = Maxwell2D(N, mesh, 'Upwind')
+            fields = sp.buildFields()
+            fields['Ez'][:] = np.random.default_rng(0).random(fields['Ez'].shape)
+            t = bestTime(lambda: sp.computeRHS(fields), number=10)
+            results.append(record('rhs/Maxwell2D/N=%d/K=%d' % (N, K), t, N=N, K=K))
+    return results
+
+
+def benchmarkFDUpdateRate(quick=False):
+    '''
+    Seconds per unknown and step of a LF2 step.
+    '''
+    results = []
+    for K in ([100] if quick else [100, 1000, 10000]):
+        sp = FD1D(Mesh1D(-1.0, 1.0, K, boundary_label='PEC'))
+        driver = MaxwellDriver(sp, timeIntegratorType='LF2')
+        N = len(sp.convertToVector(driver.fields))
+        t = bestTime(driver.step, number=20)
+        results.append(record('update/FD1D/K=%d' % K, t/N, K=K))
+
+    for K in ([20] if quick else [20, 100, 400]):
+        sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=K)
+        driver = MaxwellDriver(sp, timeIntegratorType='LF2')
+        N = len(sp.convertToVector(driver.fields))
+        t = bestTime(driver.step, number=10)
+        results.append(record('update/FD2D/K=%d' % K, t/N, K=K))
+    return results
+
+
+def benchmarkTFSF(quick=False):
+    '''
+    Seconds per FD1D LF2 step without TFSF and with the incident field on
+    the auxiliary grid or analytic at the TF/SF boundaries only.
+    '''
+    results = []
+    source = lambda x: np.exp(-x**2/(2*0.1**2))
+    for K in ([1000] if quick else [1000, 100000]):
+        for incident in [None, 'grid', 'analytic']:
+            sp = FD1D(Mesh1D(-1.0, 1.0, K, boundary_label='Mur'))
+            if incident is not None:
+                sp.TFSF_conditions({'left': -0.5, 'right': 0.5, 'source': source,
+                                    'incident': incident})
+            driver = MaxwellDriver(sp, timeIntegratorType='LF2')
+            t = bestTime(driver.step, repeat=10, number=20)
+            results.append(record('tfsf/FD1D/%s/K=%d' % (incident or 'none', K), t, K=K))
+    return results
+
+
+def benchmarkYeeUpdate(quick=False):
+    '''
+    Seconds per FD2D step of LF2 on computeRHS against the in place YEE
+    updates.
+    '''
+    results = []
+    for K in ([200] if quick else [500, 2000]):
+        sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=K)
+        for name in ['LF2', 'YEE']:
+            driver = MaxwellDriver(sp, timeIntegratorType=name)
+            t = bestTime(driver.step, repeat=3, number=5)
+            results.append(record('yee/FD2D/%s/K=%d' % (name, K), t, K=K))
+    return results
+
+
+def benchmarkTiling(quick=False, steps=8):
+    '''
+    Seconds per FD2D step of the untiled YEE updates against the
+    temporally tiled ones, with the cell update rate and the effective
+    memory bandwidth, counting the three fields read and written once
+    per step. Halo rows add 2*steps/tileRows redundant work, which
+    doubles it for 16 rows and 8 steps.
+    '''
+    results = []
+    K = 200 if quick else 2000
+    sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=K)
+    fields = sp.buildFields()
+    dt = MaxwellDriver(sp, timeIntegratorType='YEE').dt
+    cells = fields['H'].size
+    bytesPerStep = 2*8*len(sp.convertToVector(fields))
+
+    def untiled():
+        for _ in range(steps):
+            sp.updateE(fields, dt)
+            sp.updateH(fields, dt)
+
+    runs = [('untiled', untiled)]
+    for tileRows in ([16] if quick else [16, 64, 256]):
+        runs.append((
+            'tiled/rows=%d' % tileRows,
+            lambda tileRows=tileRows: sp.stepTiled(fields, dt, steps, tileRows)
+        ))
+    for name, run in runs:
+        t = bestTime(run, repeat=3)/steps
+        results.append(record(
+            'tiling/FD2D/%s/K=%d' % (name, K), t, K=K, steps=steps,
+            cellUpdatesPerSecond=cells/t, bandwidthGBs=bytesPerStep/t/1e9
+        ))
+    return results
+
+
+def benchmarkSlabs(quick=False, steps=50):
+    '''
+    Seconds per FD2D step of SlabDriver with an increasing number of
+    processes, with the speedup over one process. Process start up is
+    included, amortized over the steps.
+    '''
+    results = []
+    K = 200 if quick else 2000
+    sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=K)
+    counts = [1, 2] if quick else sorted({1, 2, 4, multiprocessing.cpu_count()})
+    reference = None
+    for processes in counts:
+        with SlabDriver(sp, processes=processes) as slabs:
+            t = bestTime(lambda: slabs.run(steps), repeat=3)/steps
+        if reference is None:
+            reference = t
+        results.append(record(
+            'slabs/FD2D/processes=%d/K=%d' % (processes, K), t,
+            K=K, processes=processes, speedup=reference/t
+        ))
+    return results
+
+
+def benchmarkIntegrators(quick=False, final_time=0.5):
+    '''
+    Seconds per unit of simulated time on a periodic DG1D problem,
+    stepping at 90% of the maximum stable time step. Unconditionally
+    stable integrators step at ten times the CFL = 1 time step and
+    those without a stability estimate at CFL = 1. Integrators failing to
+    run, or whose stable step is far below the CFL = 1 one (EULER, AB2 on
+    this purely imaginary spectrum), are recorded with their error and no
+    time.
+    '''
+    sp = DG1D(2, Mesh1D(-1.0, 1.0, 10, boundary_label='Periodic'), 'Centered')
+    names = ['LSERK4', 'LF2'] if quick else list(TIME_INTEGRATORS.keys())
+    results = []
+    for name in names:
+        def run():
+            d = MaxwellDriver(sp, timeIntegratorType=name)
+            d['E'][:] = np.sin(np.pi*sp.x)
+            for _ in range(steps):
+                d.step(dt)
+
+        try:
+            driver = MaxwellDriver(sp, timeIntegratorType=name)
+            try:
+                dt = min(0.9*driver.estimate_max_dt(), 10.0*driver.dt)
+            except ValueError:
+                dt = driver.dt
+            if dt < 0.1*driver.dt:
+                raise ValueError('Unstable on the imaginary axis')
+            steps = int(np.ceil(final_time/dt))
+            t = bestTime(run, repeat=3)
+        except Exception as e:
+            r = record('integrator/' + name, None)
+            r['error'] = repr(e)
+            results.append(r)
+            continue
+        results.append(record('integrator/' + name, t/(steps*dt), dt=dt))
+    return results
+
+
+def benchmarkSetup(quick=False):
+    results = []
+    for K in ([100] if quick else [100, 300, 1000]):
+        mesh = Mesh1D(-1.0, 1.0, K)
+        t = bestTime(lambda: connect(mesh.EToV))
+        results.append(record('setup/connect/K=%d' % K, t, K=K))
+
+    for K in ([8] if quick else [8, 146]):
+        filename = TEST_DATA_FOLDER + 'Maxwell2D_K%d.neu' % K
+        t = bestTime(lambda: readFromGambitFile(filename))
+        results.append(record('setup/readFromGambitFile/K=%d' % K, t, K=K))
+
+        mesh = readFromGambitFile(filename)
+        t = bestTime(mesh.connectivityMatrices)
+        results.append(record('setup/connectivityMatrices/K=%d' % K, t, K=K))
+
+        sp = Maxwell2D(3, mesh)
+        t = bestTime(sp.buildMaps)
+        results.append(record('setup/buildMaps/N=3/K=%d' % K, t, N=3, K=K))
+    return results
+
+
+BENCHMARKS = {
+    'rhs-dg1d': benchmarkDG1DRHS,
+    'rhs-maxwell2d': benchmarkMaxwell2DRHS,
+    'fd-update': benchmarkFDUpdateRate,
+    'tfsf': benchmarkTFSF,
+    'yee': benchmarkYeeUpdate,
+    'tiling': benchmarkTiling,
+    'slabs': benchmarkSlabs,
+    'integrators': benchmarkIntegrators,
+    'setup': benchmarkSetup,
+}
+
+
+def runBenchmarks(groups=None, quick=False):
+    if groups is None:
+        groups = BENCHMARKS.keys()
+    results = []
+    for group in groups:
+        results += BENCHMARKS[group](quick=quick)
+    return {
+        'machine': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+        },
+        'results': results,
+    }
+
+
+def compareWithBaseline(results, baseline, threshold=0.2):
+    '''
+    Benchmarks present in both runs, with their time ratio to the
+    baseline. Returns all of them and the ones slower than
+    baseline*(1 + threshold).
+    '''
+    reference = {r['name']: r['seconds'] for r in baseline['results']}
+    comparison = []
+    for r in results['results']:
+        if r['seconds'] is not None and reference.get(r['name']):
+            comparison.append((r['name'], r['seconds']/reference[r['name']]))
+    regressions = [c for c in comparison if c[1] > 1.0 + threshold]
+    return comparison, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=None)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--groups', nargs='+', choices=list(BENCHMARKS.keys()))
+    parser.add_argument('--quick', action='store_true',
+                        help='Smallest sizes only, to check the suite runs.')
+    args = parser.parse_args(argv)
+
+    results = runBenchmarks(args.groups, args.quick)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    for r in results['results']:
+        if r['seconds'] is None:
+            print('%-45s failed: %s' % (r['name'], r['error']))
+        else:
+            print('%-45s %12.3e s' % (r['name'], r['seconds']))
+
+    if args.baseline is None:
+        return 0
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    comparison, regressions = compareWithBaseline(results, baseline, args.threshold)
+    for name, ratio in comparison:
+        flag = '  REGRESSION' if (name, ratio) in regressions else ''
+        print('%-45s %8.2fx baseline%s' % (name, ratio, flag))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,6 +6,11 @@ from .mesh1d import Mesh1D
 
 
 class DG1D(SpatialDiscretization):
+    PROFILED_PHASES = SpatialDiscretization.PROFILED_PHASES + (
+        'computeFlux', 'computeFluxE', 'computeFluxH', 'computeJumps',
+        'fieldsOnBoundaryConditions', 'computeVolumeDerivative', 'computeLift'
+    )
+
     def __init__(self, n_order: int, mesh: Mesh1D, fluxType="Upwind",epsilon=None,sigma=None):
         SpatialDiscretization.__init__(self, mesh)
         
@@ -52,6 +57,7 @@ class DG1D(SpatialDiscretization):
         self.fmask, self.fmask_1, self.fmask_2 = buildFMask(r)
 
         self.mass = mass_matrix(n_order, r)
+        self.inv_mass = np.linalg.inv(self.mass)
         self.lift = surface_integral_dg(n_order, r)
         self.diff_matrix = differentiation_matrix(n_order, r)
 
@@ -166,18 +172,17 @@ class DG1D(SpatialDiscretization):
                         self.mesh.number_of_elements(), order='F')
         return dE, dH
 
-    def computeRHSE(self, fields):
+    def computeRHSE(self, fields, conductivity=True):
         E = fields['E']
         H = fields['H']
         J = np.zeros((self.number_of_nodes_per_element(), self.mesh.number_of_elements()))
 
-        J[:, :] = E * self.sigma
+        if conductivity:
+            J[:, :] = E * self.sigma
 
         flux_E = self.computeFluxE(E, H)
-        rhs_drH = np.matmul(self.diff_matrix, H)
         rhsE = 1/self.epsilon * \
-            (np.multiply(-1*self.rx, rhs_drH) +
-             np.matmul(self.lift, self.f_scale * flux_E)-J) 
+            (self.computeVolumeDerivative(H) + self.computeLift(flux_E) - J)
 
         return rhsE
 
@@ -186,19 +191,36 @@ class DG1D(SpatialDiscretization):
         H = fields['H']
 
         flux_H = self.computeFluxH(E, H)
-        rhs_drE = np.matmul(self.diff_matrix, E)
-        rhsH = 1/self.mu * (np.multiply(-1*self.rx, rhs_drE) +
-                            np.matmul(self.lift, self.f_scale * flux_H))
-        
+        rhsH = 1/self.mu * (self.computeVolumeDerivative(E) + self.computeLift(flux_H))
+
         return rhsH
 
+    def computeVolumeDerivative(self, F):
+        '''
+        Volume term -dF/dx, element by element.
+        '''
+        return np.multiply(-1*self.rx, np.matmul(self.diff_matrix, F))
+
+    def computeLift(self, flux):
+        '''
+        Surface term, the face fluxes lifted to the element nodes.
+        '''
+        return np.matmul(self.lift, self.f_scale * flux)
+
 
-    def computeRHS(self, fields):
-        rhsE = self.computeRHSE(fields)
+    def computeRHS(self, fields, conductivity=True):
+        rhsE = self.computeRHSE(fields, conductivity)
         rhsH = self.computeRHSH(fields)
 
         return {'E': rhsE, 'H': rhsH}
 
+    def conductivityRate(self):
+        '''
+        Element-wise rate sigma/epsilon of the conductivity term
+        dE/dt = -sigma/epsilon E.
+        '''
+        return self.sigma/self.epsilon
+
     def convertToVector(self, fields):
         return np.concatenate((
             fields['E'].ravel(order='F'),
@@ -211,6 +233,57 @@ class DG1D(SpatialDiscretization):
         fields['E'][:, :] = vec[:(vec.size//2)].reshape(Np, K, order='F')
         fields['H'][:, :] = vec[(vec.size//2):].reshape(Np, K, order='F')
 
+    def hasAdjoint(self):
+        labels = self.mesh.boundary_label.values()
+        if not all(l in ["PEC", "PMC", "SMA", "Periodic"] for l in labels):
+            return False
+        if "Periodic" in labels and self.fluxType == "Upwind":
+            return bool(self.epsilon[0] == self.epsilon[-1]
+                        and self.mu[0] == self.mu[-1])
+        return True
+
+    def applyMassMatrix(self, fields, inverse=False):
+        '''
+        Applies the global mass matrix, weighted with epsilon for E and
+        with mu for H, or its inverse.
+        '''
+        ME = self.jacobian * self.epsilon
+        MH = self.jacobian * self.mu
+        if inverse:
+            return {
+                'E': np.matmul(self.inv_mass, fields['E']) / ME,
+                'H': np.matmul(self.inv_mass, fields['H']) / MH
+            }
+        return {
+            'E': np.matmul(self.mass, fields['E']) * ME,
+            'H': np.matmul(self.mass, fields['H']) * MH
+        }
+
+    def computeAdjointRHS(self, fields):
+        '''
+        Transpose of the evolution operator applied to fields. With the
+        operator split in its centered part C, upwind penalty P and
+        conductivity S, M*A = K + D with K skew and D symmetric, so
+            A^T = - M (C - P - S) M^-1 = - M (2*A_c - A - 2*S) M^-1
+        where A_c is the operator with centered fluxes.
+        '''
+        u = self.applyMassMatrix(fields, inverse=True)
+
+        rhs = self.computeRHS(u)
+        fluxType = self.fluxType
+        try:
+            self.fluxType = "Centered"
+            rhsC = self.computeRHS(u)
+        finally:
+            self.fluxType = fluxType
+
+        w = {
+            'E': 2*rhsC['E'] - rhs['E'] + 2*self.sigma/self.epsilon*u['E'],
+            'H': 2*rhsC['H'] - rhs['H']
+        }
+        Mw = self.applyMassMatrix(w)
+        return {'E': -Mw['E'], 'H': -Mw['H']}
+
     def setFieldWithIndex(self, fields, i, val):
         Np = self.number_of_nodes_per_element()
         node = i % Np
@@ -8,6 +8,12 @@ from ..spatialDiscretization import *
 
 
 class Maxwell2D(SpatialDiscretization):
+    PROFILED_PHASES = SpatialDiscretization.PROFILED_PHASES + (
+        'computeFlux', 'computeFluxE', 'computeFluxH', 'computeJumps',
+        'computeJump', 'fieldsOnBoundaryConditions',
+        'computeGradient', 'computeCurl', 'computeLift'
+    )
+
     def __init__(self, n_order: int, mesh: Mesh2D, fluxType="Upwind"):
         assert n_order > 0
         assert mesh.number_of_elements() > 0
@@ -27,6 +33,9 @@ class Maxwell2D(SpatialDiscretization):
         self.x, self.y = nodes_coordinates(n_order, mesh)
 
         self.lift = lift(n_order)
+        V = vandermonde(n_order, r, s)
+        self.mass = np.linalg.inv(V.dot(V.transpose()))
+        self.inv_mass = V.dot(V.transpose())
 
         eToE, eToF = mesh.connectivityMatrices()
         va = self.mesh.EToV[:, 0]
@@ -269,6 +278,93 @@ class Maxwell2D(SpatialDiscretization):
 
         return A
 
+    def convertToVector(self, fields):
+        return np.concatenate((
+            fields['Ez'].ravel(order='F'),
+            fields['Hx'].ravel(order='F'),
+            fields['Hy'].ravel(order='F')
+        ))
+
+    def copyVectorToFields(self, vec, fields):
+        Np = self.number_of_nodes_per_element()
+        K = self.mesh.number_of_elements()
+        n = Np*K
+        fields['Ez'][:, :] = vec[:n].reshape(Np, K, order='F')
+        fields['Hx'][:, :] = vec[n:2*n].reshape(Np, K, order='F')
+        fields['Hy'][:, :] = vec[2*n:].reshape(Np, K, order='F')
+
+    def hasAdjoint(self):
+        return self.mesh.boundary_label in ["PEC", "PMC", "SMA"]
+
+    def applyMassMatrix(self, fields, inverse=False):
+        if inverse:
+            return {l: np.matmul(self.inv_mass, f) / self.jacobian
+                    for l, f in fields.items()}
+        return {l: np.matmul(self.mass, f) * self.jacobian
+                for l, f in fields.items()}
+
+    def computeAdjointRHS(self, fields):
+        '''
+        Transpose of the evolution operator applied to fields, using
+            A^T = - M (2*A_c - A) M^-1
+        with A_c the operator with centered fluxes.
+        '''
+        u = self.applyMassMatrix(fields, inverse=True)
+
+        rhs = self.computeRHS(u)
+        fluxType = self.fluxType
+        try:
+            self.fluxType = "Centered"
+            rhsC = self.computeRHS(u)
+        finally:
+            self.fluxType = fluxType
+
+        Mw = self.applyMassMatrix(
+            {l: 2*rhsC[l] - rhs[l] for l in rhs.keys()}
+        )
+        return {l: -f for l, f in Mw.items()}
+
+    def colorElements(self):
+        '''
+        Greedy coloring of the elements such that face neighbors never
+        share a color.
+        '''
+        EToE, _ = self.mesh.connectivityMatrices()
+        K = self.mesh.number_of_elements()
+        colors = np.full(K, -1, dtype=int)
+        for k in range(K):
+            used = set(colors[EToE[k]])
+            c = 0
+            while c in used:
+                c += 1
+            colors[k] = c
+        return colors
+
+    def buildElementBlocks(self):
+        '''
+        Local blocks of the evolution operator, i.e. the coupling of each
+        element with itself through volume terms and the interior side of
+        its fluxes. Returned as a (K, 3*Np, 3*Np) array with local unknowns
+        ordered as Ez, Hx, Hy. Elements of the same color are probed at
+        once, so only n_colors*3*Np evaluations of computeRHS are needed.
+        '''
+        Np = self.number_of_nodes_per_element()
+        K = self.mesh.number_of_elements()
+        labels = ['Ez', 'Hx', 'Hy']
+        colors = self.colorElements()
+
+        blocks = np.zeros((K, 3*Np, 3*Np))
+        for c in range(np.max(colors) + 1):
+            elems = np.where(colors == c)[0]
+            for f, label in enumerate(labels):
+                for n in range(Np):
+                    fields = self.buildFields()
+                    fields[label][n, elems] = 1.0
+                    rhs = self.computeRHS(fields)
+                    R = np.vstack([rhs[l] for l in labels])
+                    blocks[elems, :, f*Np + n] = R[:, elems].transpose()
+        return blocks
+
     def buildFields(self):
         Hx = np.zeros([self.number_of_nodes_per_element(),
                        self.mesh.number_of_elements()])
@@ -352,24 +448,51 @@ class Maxwell2D(SpatialDiscretization):
             raise ValueError("Invalid boundary label.")
         return Hbcx, Hbcy, Ebcz
 
+    def computeJump(self, f, fbc):
+        df = f.transpose().take(self.vmapM) - f.transpose().take(self.vmapP)
+        df[self.mapB] = f.transpose().take(self.vmapB) - fbc
+        return df.reshape(self.n_fp*self.n_faces,
+                          self.mesh.number_of_elements(), order='F')
+
     def computeJumps(self, Hx, Hy, Ez):
         Hbcx, Hbcy, Ebcz = self.fieldsOnBoundaryConditions(Hx, Hy, Ez)
-        dHx = Hx.transpose().take(self.vmapM) - Hx.transpose().take(self.vmapP)
-        dHy = Hy.transpose().take(self.vmapM) - Hy.transpose().take(self.vmapP)
-        dEz = Ez.transpose().take(self.vmapM) - Ez.transpose().take(self.vmapP)
+        dHx = self.computeJump(Hx, Hbcx)
+        dHy = self.computeJump(Hy, Hbcy)
+        dEz = self.computeJump(Ez, Ebcz)
 
-        dHx[self.mapB] = Hx.transpose().take(self.vmapB) - Hbcx
-        dHy[self.mapB] = Hy.transpose().take(self.vmapB) - Hbcy
-        dEz[self.mapB] = Ez.transpose().take(self.vmapB) - Ebcz
+        return dHx, dHy, dEz
 
-        dHx = dHx.reshape(self.n_fp*self.n_faces,
-                          self.mesh.number_of_elements(), order='F')
-        dHy = dHy.reshape(self.n_fp*self.n_faces,
-                          self.mesh.number_of_elements(), order='F')
-        dEz = dEz.reshape(self.n_fp*self.n_faces,
-                          self.mesh.number_of_elements(), order='F')
+    def computeFluxE(self, Hx, Hy, Ez):
+        '''
+        Ez part of computeFlux. Only the jumps it needs are computed, the
+        one of Ez being needed by upwind fluxes only.
+        '''
+        Hbcx, Hbcy, Ebcz = self.fieldsOnBoundaryConditions(Hx, Hy, Ez)
+        dHx = self.computeJump(Hx, Hbcx)
+        dHy = self.computeJump(Hy, Hbcy)
+        dEz = 0.0
+        if self.fluxType == "Upwind":
+            dEz = self.computeJump(Ez, Ebcz)
 
-        return dHx, dHy, dEz
+        _, _, f_Ez_zero = self.computeZeroNormalFlux(dEz)
+        _, _, f_Ez_one = self.computeOneNormalFlux(dHx, dHy, dEz)
+        return f_Ez_zero + f_Ez_one
+
+    def computeFluxH(self, Hx, Hy, Ez):
+        '''
+        Hx and Hy parts of computeFlux. The jumps of H are only needed by
+        upwind fluxes.
+        '''
+        Hbcx, Hbcy, Ebcz = self.fieldsOnBoundaryConditions(Hx, Hy, Ez)
+        dEz = self.computeJump(Ez, Ebcz)
+        dHx, dHy = 0.0, 0.0
+        if self.fluxType == "Upwind":
+            dHx = self.computeJump(Hx, Hbcx)
+            dHy = self.computeJump(Hy, Hbcy)
+
+        f_Hx_one, f_Hy_one, _ = self.computeOneNormalFlux(dHx, dHy, dEz)
+        f_Hx_two, f_Hy_two, _ = self.computeTwoNormalFlux(dHx, dHy)
+        return f_Hx_one + f_Hx_two, f_Hy_one + f_Hy_two
 
     def computeRHS(self, fields):
         Hx = fields['Hx']
@@ -378,19 +501,55 @@ class Maxwell2D(SpatialDiscretization):
 
         flux_Hx, flux_Hy, flux_Ez = self.computeFlux(Hx, Hy, Ez)
 
-        rhs_Ezx, rhs_Ezy = grad(
-            self.Dr, self.Ds, Ez, self.rx, self.sx, self.ry, self.sy
-        )
-        rhs_CuHz = curl(
-            self.Dr, self.Ds, Hx, Hy, self.rx, self.sx, self.ry, self.sy
-        )
+        rhs_Ezx, rhs_Ezy = self.computeGradient(Ez)
+        rhs_CuHz = self.computeCurl(Hx, Hy)
 
         # missing material epsilon/mu
-        rhs_Hx = -rhs_Ezy  + np.matmul(self.lift, self.f_scale * flux_Hx)/2.0
-        rhs_Hy =  rhs_Ezx  + np.matmul(self.lift, self.f_scale * flux_Hy)/2.0
-        rhs_Ez =  rhs_CuHz + np.matmul(self.lift, self.f_scale * flux_Ez)/2.0
+        rhs_Hx = -rhs_Ezy  + self.computeLift(flux_Hx)
+        rhs_Hy =  rhs_Ezx  + self.computeLift(flux_Hy)
+        rhs_Ez =  rhs_CuHz + self.computeLift(flux_Ez)
 
         return {'Hx': rhs_Hx, 'Hy': rhs_Hy, 'Ez': rhs_Ez}
+
+    def computeRHSE(self, fields):
+        Hx = fields['Hx']
+        Hy = fields['Hy']
+        Ez = fields['Ez']
+
+        flux_Ez = self.computeFluxE(Hx, Hy, Ez)
+        rhs_Ez = self.computeCurl(Hx, Hy) + self.computeLift(flux_Ez)
+
+        return {'Ez': rhs_Ez}
+
+    def computeRHSH(self, fields):
+        Hx = fields['Hx']
+        Hy = fields['Hy']
+        Ez = fields['Ez']
+
+        flux_Hx, flux_Hy = self.computeFluxH(Hx, Hy, Ez)
+        rhs_Ezx, rhs_Ezy = self.computeGradient(Ez)
+        rhs_Hx = -rhs_Ezy + self.computeLift(flux_Hx)
+        rhs_Hy =  rhs_Ezx + self.computeLift(flux_Hy)
+
+        return {'Hx': rhs_Hx, 'Hy': rhs_Hy}
+
+    def computeGradient(self, Ez):
+        return grad(self.Dr, self.Ds, Ez, self.rx, self.sx, self.ry, self.sy)
+
+    def computeCurl(self, Hx, Hy):
+        return curl(self.Dr, self.Ds, Hx, Hy, self.rx, self.sx, self.ry, self.sy)
+
+    def computeLift(self, flux):
+        return np.matmul(self.lift, self.f_scale * flux)/2.0
+
+    def getElectricFields(self, fields):
+        return {'Ez': fields['Ez']}
+
+    def getMagneticFields(self, fields):
+        return {'Hx': fields['Hx'], 'Hy': fields['Hy']}
+
+    def dimension(self):
+        return 2
     
     def computeRHSStiffness(self, fields):
         Hx = fields['Hx']
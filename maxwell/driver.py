@@ -11,6 +11,57 @@ from .integrators.LSERK134 import *
 from .integrators.LF2 import *
 from .integrators.LF2V import *
 from .integrators.EULER import *
+from .integrators.CNK import *
+from .integrators.AB2 import *
+from .integrators.AB3 import *
+from .integrators.ABM3 import *
+from .integrators.LF4 import *
+from .integrators.LF6 import *
+from .integrators.LF4BM import *
+from .integrators.JLSRK import *
+from .integrators.ETDRK4 import *
+from .integrators.YEE import *
+
+from .monitors import *
+from .profiler import *
+from .stability import *
+
+TIME_INTEGRATORS = {
+    'EULER': EULER,
+    'LSERK4': LSERK4,
+    'LSERK74': LSERK74,
+    'LSERK134': LSERK134,
+    'LF2': LF2,
+    'LF2V': LF2V,
+    'IBE': IBE,
+    'CN': CN,
+    'DIRK2': DIRK2,
+    'IGLRK4': IGLRK4,
+    'AM2': AM2,
+    'CNK': CNK,
+    'AB2': AB2,
+    'AB3': AB3,
+    'ABM3': ABM3,
+    'LF4': LF4,
+    'LF6': LF6,
+    'LF4BM': LF4BM,
+    'ETDRK4': ETDRK4,
+    'YEE': YEE,
+}
+
+
+def registerTimeIntegrator(name, integrator):
+    '''
+    Makes integrator available to MaxwellDriver as timeIntegratorType=name.
+    '''
+    if name in TIME_INTEGRATORS and TIME_INTEGRATORS[name] is not integrator:
+        raise ValueError('Time integrator ' + name + ' already registered')
+    TIME_INTEGRATORS[name] = integrator
+    return integrator
+
+
+# Integrators advancing TFSF incident fields once per leapfrog half step.
+TFSF_INTEGRATORS = ('LF2', 'YEE')
 
 
 class MaxwellDriver:
@@ -24,7 +75,7 @@ class MaxwellDriver:
         # Compute time step size
         r_min = sp.get_minimum_node_distance()
         if (sp.isStaggered()):
-            self.dt = CFL * r_min / np.sqrt(sp.dimension())
+            self.dt = CFL * sp.get_cfl_factor() * r_min / np.sqrt(sp.dimension())
         else:
             if (sp.get_mesh().dimension == 1):
                 self.dt = CFL * r_min * 2.0 / 3.0
@@ -35,37 +86,36 @@ class MaxwellDriver:
         self.sp.dt = self.dt       
 
         self.fields = sp.buildFields()
+        self.monitors = []
             
         # Init time integrator
-        if timeIntegratorType == 'EULER':
-            self.timeIntegrator = EULER(self.sp, self.fields)   
-        elif timeIntegratorType == 'LSERK4':
-            self.timeIntegrator = LSERK4(self.sp, self.fields)
-        elif timeIntegratorType == 'LSERK74':
-            self.timeIntegrator = LSERK74(self.sp, self.fields)
-        elif timeIntegratorType == 'LSERK134':
-            self.timeIntegrator = LSERK134(self.sp, self.fields)
-        elif timeIntegratorType == 'LF2':
-            self.timeIntegrator = LF2(self.sp, self.fields)
-        elif timeIntegratorType == 'LF2V':
-            self.timeIntegrator = LF2V(self.sp, self.fields)
-        elif timeIntegratorType == 'IBE':
-            self.timeIntegrator = IBE(self.sp, self.fields)
-        elif timeIntegratorType == 'CN':
-            self.timeIntegrator = CN(self.sp, self.fields)
-        elif timeIntegratorType == 'DIRK2':
-            self.timeIntegrator = DIRK2(self.sp, self.fields)
-        elif timeIntegratorType == 'IGLRK4':
-            self.timeIntegrator = IGLRK4(self.sp, self.fields)
-        elif timeIntegratorType == 'AM2':
-            self.timeIntegrator = AM2(self.sp, self.fields)
-        else:
+        if timeIntegratorType not in TIME_INTEGRATORS:
             raise ValueError('Invalid time integrator')
+        self.timeIntegratorType = timeIntegratorType
+        self.checkSources()
+        self.timeIntegrator = TIME_INTEGRATORS[timeIntegratorType](
+            self.sp, self.fields
+        )
+
+    def checkSources(self):
+        if getattr(self.sp, 'tfsf', False) and \
+                self.timeIntegratorType not in TFSF_INTEGRATORS:
+            raise ValueError("TFSF sources are only supported by LF2 and YEE.")
 
     def step(self, dt = 0.0):
         if dt == 0.0:
             dt = self.dt
+        # Mur boundaries and TFSF sources of the FD discretizations use the
+        # dt of the current step.
+        self.sp.dt = dt
+        self.checkSources()
         self.timeIntegrator.step(self.fields, dt)
+        for monitor in self.monitors:
+            monitor.update(self.fields, dt)
+
+    def addMonitor(self, monitor):
+        self.monitors.append(monitor)
+        return monitor
 
     def run(self, final_time):
         for t_step in range(1, np.ceil(final_time/self.dt)):
@@ -76,6 +126,25 @@ class MaxwellDriver:
         for t in timeRange:
             self.step()
 
+    def estimate_max_dt(self, method=None):
+        '''
+        Largest stable time step of the given integrator, by default the
+        one used by this driver, on the spectrum of the semi-discrete
+        operator. Results are cached per spatial discretization.
+        '''
+        if method is None:
+            method = self.timeIntegratorType
+        if method not in TIME_INTEGRATORS:
+            raise ValueError('Invalid time integrator')
+        return maximumStableTimeStep(self.sp, TIME_INTEGRATORS[method])
+
+    def startProfiling(self):
+        '''
+        Attaches and returns a Profiler timing the steps, the integrator
+        and the spatial discretization phases.
+        '''
+        return Profiler().attachDriver(self)
+
     def __getitem__(self, key):
         return self.fields[key]
     
@@ -5,10 +5,27 @@ import numpy as np
 
 from ..spatialDiscretization import *
 from ..dg.mesh1d import Mesh1D
+from .stencils import *
 
 
 class FD1D(SpatialDiscretization):
-    def __init__(self, mesh: Mesh1D):
+    '''
+    Staggered finite differences, E on the mesh nodes and H on the cell
+    centers. With conductivity the two time stepping paths differ:
+    computeRHSE, used by LF2 and the other integrators, takes the
+    conduction current explicitly, -sigma E/epsilon at the old E, while
+    the in place updateE of YEE integrates it semi-implicitly, see
+    prepareYeeUpdate. Both agree in lossless media and differ by
+    O(sigma dt) otherwise, the semi-implicit update being second order
+    and stable for any sigma dt. The updateE fallbacks take the explicit
+    form.
+    '''
+    PROFILED_PHASES = SpatialDiscretization.PROFILED_PHASES + (
+        'computeCurlH', 'computeCurlE', 'applyBoundaryConditionsE',
+        'updateIncidentFieldE', 'updateIncidentFieldH', 'updateE', 'updateH'
+    )
+
+    def __init__(self, mesh: Mesh1D, epsilon=None, mu=None, sigma=None, order=2):
         SpatialDiscretization.__init__(self, mesh)
 
         self.x = mesh.vx
@@ -22,8 +39,89 @@ class FD1D(SpatialDiscretization):
         self.c0 = 1.0
         self.tfsf = False
         self.source = None
-        
+        self.incident = "grid"
+
+        # Spatial order of the staggered differences. The fourth order
+        # stencil needs a uniform grid and extends the fields with their
+        # images across PEC and PMC boundaries.
+        if order not in STENCIL_ORDERS:
+            raise ValueError("Invalid stencil order.")
+        self.order = order
+        if order == 4:
+            if not np.allclose(self.dx, self.dx[0]):
+                raise ValueError("Fourth order stencils require uniform grids.")
+            self.imageSigns = {
+                field: [imageSign(mesh.boundary_label[bdr], field) for bdr in ["LEFT", "RIGHT"]]
+                for field in ["E", "H"]
+            }
+
+        self.setMaterials(epsilon, mu, sigma)
+
+    def setMaterials(self, epsilon=None, mu=None, sigma=None):
+        '''
+        Per cell permittivity, permeability and conductivity, vacuum by
+        default. E nodes take the average of the adjacent cells weighted
+        by their widths. Without materials the updates skip them.
+        '''
+        K = self.mesh.number_of_elements()
+
+        def cellValues(values, default, name):
+            if values is None:
+                return np.full(K, default)
+            values = np.array(values, dtype=float)
+            if values.shape != (K,):
+                raise ValueError("The dimensions of the " + name + " vector must align with the number of cells in the mesh.")
+            return values
+
+        self.epsilon = cellValues(epsilon, 1.0, "permittivity")
+        self.mu = cellValues(mu, 1.0, "permeability")
+        self.sigma = cellValues(sigma, 0.0, "conductivity")
+
+        self.hasMaterials = bool(np.any(self.epsilon != 1.0) or
+                                 np.any(self.mu != 1.0) or
+                                 np.any(self.sigma != 0.0))
+        self.hasConductivity = bool(np.any(self.sigma != 0.0))
+        self.invEpsilonE = 1.0 / self.nodeAverage(self.epsilon)
+        self.sigmaE = self.nodeAverage(self.sigma)
+        self.sigmaOverEpsilonE = self.sigmaE * self.invEpsilonE
+        self.invMu = 1.0 / self.mu
+
+        for bdr, cell in [("LEFT", 0), ("RIGHT", -1)]:
+            if self.mesh.boundary_label[bdr] == "Mur" and (
+                    self.epsilon[cell] != 1.0 or self.mu[cell] != 1.0 or self.sigma[cell] != 0.0):
+                raise ValueError("Mur boundaries require vacuum in the boundary cells.")
+
+        self._yeeDt = None
+        self.operatorChanged()
+
+    def nodeAverage(self, values):
+        v = np.empty(self.x.shape)
+        v[1:-1] = (values[:-1]*self.dx[:-1] + values[1:]*self.dx[1:]) / \
+            (self.dx[:-1] + self.dx[1:])
+        v[0] = values[0]
+        v[-1] = values[-1]
+        if "Periodic" in self.mesh.boundary_label.values():
+            v[0] = (values[0]*self.dx[0] + values[-1]*self.dx[-1]) / \
+                (self.dx[0] + self.dx[-1])
+            v[-1] = v[0]
+        return v
+
     def TFSF_conditions(self, setup):
+        '''
+        Total field/scattered field region between the E nodes nearest to
+        setup "left" and "right", with the right travelling incident wave
+        source(x - t). setup "incident" chooses how it is computed:
+            "grid" (default): on an auxiliary grid as long as this one,
+            "analytic": only at the four values the TF/SF boundaries use,
+            as source(x - v t), at O(1) cost per step. v is the numerical
+            phase velocity of setup "wavenumber" (0 by default, v = 1),
+            the carrier of a modulated source, for the dt of each step.
+            Exact at CFL = 1, where the scheme has no dispersion;
+            otherwise the other wavenumbers leak into the scattered field
+            by their phase velocity error.
+        '''
+        if self.order != 2:
+            raise ValueError("TFSF requires the second order stencil.")
 
         self.tfsf =  True
         self.source = setup["source"]
@@ -32,6 +130,11 @@ class FD1D(SpatialDiscretization):
         if not "source" in setup.keys() or not "left" in setup.keys() or not "right" in setup.keys():
             raise ValueError('Missing TFSF setup variables')
 
+        self.incident = setup.get("incident", "grid")
+        if self.incident not in ["grid", "analytic"]:
+            raise ValueError('Invalid TFSF incident field mode')
+        self.incidentWavenumber = setup.get("wavenumber", 0.0)
+
     def buildFields(self):
         E = np.zeros(self.x.shape)
         H = np.zeros(self.xH.shape)
@@ -42,6 +145,10 @@ class FD1D(SpatialDiscretization):
         return {"E": E, "H": H}
 
     def buildIncidentFields(self):
+        if self.incident == "analytic":
+            self.buildAnalyticIncidentFields()
+            return
+
         self.Einc = np.ndarray(self.x.shape)
         self.Einc[:] = self.source(self.x[:])
 
@@ -51,24 +158,85 @@ class FD1D(SpatialDiscretization):
         self.Hinc[:] = self.source(self.xH[:] - 0.5*self.dt)
         
 
+    def buildAnalyticIncidentFields(self):
+        '''
+        Only the incident E on the TF/SF boundary nodes and H on the cells
+        next to them are stored, left first, with the distances the wave
+        has travelled at their times.
+        '''
+        self._incidentX = self.x[[self.left_TF_limit, self.right_TF_limit]]
+        self._incidentXH = self.xH[[self.left_TF_limit - 1, self.right_TF_limit]]
+        self.incidentVelocityDt = None
+        self.incidentShiftE = 0.0
+        self.incidentShiftH = 0.5*self.dt*self.incidentVelocity()
+        self.setAnalyticIncidentFields()
+
+    def incidentVelocity(self):
+        '''
+        Numerical phase velocity of the incident wavenumber, recomputed
+        when self.dt changes.
+        '''
+        if self.incidentVelocityDt != self.dt:
+            h = self.dx[self.left_TF_limit]
+            self._incidentVelocity = phaseVelocity(
+                self.incidentWavenumber*h, self.c0*self.dt/h
+            )
+            self.incidentVelocityDt = self.dt
+        return self._incidentVelocity
+
+    def setAnalyticIncidentFields(self):
+        self.incidentE = self.source(self._incidentX - self.incidentShiftE)
+        self.incidentH = self.source(self._incidentXH - self.incidentShiftH)
+
+    def incidentBoundaryFields(self):
+        '''
+        Incident E on the TF/SF boundary nodes and H on the cells next to
+        them, left first.
+        '''
+        if self.incident == "analytic":
+            return self.incidentE, self.incidentH
+        return (self.Einc[[self.left_TF_limit, self.right_TF_limit]],
+                self.Hinc[[self.left_TF_limit - 1, self.right_TF_limit]])
+
     def get_minimum_node_distance(self):
         return np.min(self.dx)
 
+    def get_cfl_factor(self):
+        return CFL_FACTORS[self.order]
+
 
 
     def computeRHSE(self, fields):
         H = fields['H']
         E = fields['E']
-        rhsE = np.zeros(fields['E'].shape)
-
-        rhsE[1:-1] = - (1.0/self.dxH) * (H[1:] - H[:-1])
+        rhsE = self.computeCurlH(H)
 
         if self.tfsf == True:
 
             self.updateIncidentFieldE()
-            rhsE[self.left_TF_limit]  +=  (1.0/self.dxH[0]) * self.Hinc[self.left_TF_limit-1]
-            rhsE[self.right_TF_limit] -=  (1.0/self.dxH[0]) * self.Hinc[self.right_TF_limit ]
+            Hinc = self.incidentBoundaryFields()[1]
+            rhsE[self.left_TF_limit]  +=  (1.0/self.dxH[0]) * Hinc[0]
+            rhsE[self.right_TF_limit] -=  (1.0/self.dxH[0]) * Hinc[1]
+
+        self.applyBoundaryConditionsE(rhsE, E, H)
 
+        if self.hasMaterials:
+            rhsE = self.invEpsilonE * rhsE - self.sigmaOverEpsilonE * E
+
+        return rhsE
+
+    def computeCurlH(self, H):
+        if self.order == 4:
+            H = extendWithImages(H, 0, *self.imageSigns["H"], cells=True)
+            return - (1.0/self.dx[0]) * staggeredDifference4(H, 0)
+        rhsE = np.zeros(self.x.shape)
+        rhsE[1:-1] = - (1.0/self.dxH) * (H[1:] - H[:-1])
+        return rhsE
+
+    def applyBoundaryConditionsE(self, rhsE, E, H):
+        # The fourth order curl already accounts for the boundaries.
+        if self.order == 4:
+            return rhsE
         for bdr, label in self.mesh.boundary_label.items():
             
             if bdr == "LEFT":
@@ -113,8 +281,7 @@ class FD1D(SpatialDiscretization):
                     (rhsE[-2] - E[-1])
                     
                     rhsE[-1] -= E[-1]
-                    rhsE[-1] /= self.dt   
-                              
+                    rhsE[-1] /= self.dt
 
 
         # elif self.mesh.boundary_label == "PML":  # [WIP]
@@ -133,22 +300,162 @@ class FD1D(SpatialDiscretization):
 
     def computeRHSH(self, fields):
         E = fields['E']
-        rhsH = - (1.0/self.dx) * (E[1:] - E[:-1])
+        rhsH = self.computeCurlE(E)
 
         if self.tfsf == True:
             self.updateIncidentFieldH()
-            rhsH[self.left_TF_limit - 1] +=  (1.0/self.dx[0]) * self.Einc[self.left_TF_limit]
-            rhsH[self.right_TF_limit]    -=  (1.0/self.dx[0]) * self.Einc[self.right_TF_limit]
+            Einc = self.incidentBoundaryFields()[0]
+            rhsH[self.left_TF_limit - 1] +=  (1.0/self.dx[0]) * Einc[0]
+            rhsH[self.right_TF_limit]    -=  (1.0/self.dx[0]) * Einc[1]
+
+        if self.hasMaterials:
+            rhsH *= self.invMu
 
         return rhsH
 
+    def computeCurlE(self, E):
+        if self.order == 4:
+            E = extendWithImages(E, 0, *self.imageSigns["E"], cells=False)
+            return - (1.0/self.dx[0]) * staggeredDifference4(E, 0)
+        return - (1.0/self.dx) * (E[1:] - E[:-1])
+
     def computeRHS(self, fields):
         rhsE = self.computeRHSE(fields)
         rhsH = self.computeRHSH(fields)
 
         return {'E': rhsE, 'H': rhsH}
 
+    def prepareYeeUpdate(self, dt):
+        '''
+        Update coefficients for the in place updates, recomputed only when
+        dt changes, and work buffers for the curls. With materials the
+        conductivity is integrated semi-implicitly,
+            E <- Ca E - Cb dt/dx curl H,   H <- H - dt/(mu dx) curl E,
+            Ca = (1 - s)/(1 + s),   Cb = 1/(epsilon (1 + s)),
+        s = sigma dt/(2 epsilon), with Cb folded into the curl coefficients.
+        '''
+        if getattr(self, '_yeeDt', None) == dt:
+            return
+        self._yeeDt = dt
+        self._cE = dt/self.dxH
+        self._cH = dt/self.dx
+        self._cELeft = dt/self.dxH[0]
+        self._cERight = dt/self.dxH[0]
+        self._Ca = None
+        if self.hasMaterials:
+            s = 0.5*dt*self.sigmaOverEpsilonE
+            Cb = self.invEpsilonE/(1.0 + s)
+            self._cE = self._cE*Cb[1:-1]
+            self._cH = self._cH*self.invMu
+            self._cELeft = self._cELeft*Cb[0]
+            self._cERight = self._cERight*Cb[-1]
+            if self.hasConductivity:
+                self._Ca = (1.0 - s)/(1.0 + s)
+        self._bufE = np.zeros(self.dxH.shape)
+        self._bufH = np.zeros(self.dx.shape)
+
+    def hasYeeFastPath(self):
+        labels = self.mesh.boundary_label.values()
+        return self.order == 2 and not self.tfsf and \
+            all(l in ["PEC", "PMC", "Periodic"] for l in labels)
+
+    def updateE(self, fields, dt):
+        '''
+        E += dt * computeRHSE(fields), in place and without temporaries.
+        TFSF, Mur boundaries and the fourth order stencil fall back to
+        computeRHSE, with self.dt set to dt.
+        '''
+        if not self.hasYeeFastPath():
+            self.dt = dt
+            addScaledFields(fields['E'], self.computeRHSE(fields), dt)
+            return
+        self.prepareYeeUpdate(dt)
+        self.updateNodesE(fields['E'], fields['H'], 1, len(self.dx))
+        self.updateBoundaryNodesE(fields['E'], fields['H'])
+
+    def updateNodesE(self, E, H, first, last):
+        '''
+        In place update of the inner E nodes first to last - 1.
+        '''
+        buf = self._bufE[first-1:last-1]
+        np.subtract(H[first:last], H[first-1:last-1], out=buf)
+        buf *= self._cE[first-1:last-1]
+        Ca = self._Ca
+        if Ca is not None:
+            E[first:last] *= Ca[first:last]
+        E[first:last] -= buf
+
+    def updateBoundaryNodesE(self, E, H):
+        Ca = self._Ca
+        labels = self.mesh.boundary_label
+        periodic = labels['LEFT'] == "Periodic" or labels['RIGHT'] == "Periodic"
+        if Ca is not None:
+            if labels['LEFT'] == "PMC" or periodic:
+                E[0] *= Ca[0]
+            if labels['RIGHT'] == "PMC" or periodic:
+                E[-1] *= Ca[-1]
+        if labels['LEFT'] == "PMC":
+            E[0] -= self._cELeft * (2 * H[0])
+        if labels['RIGHT'] == "PMC":
+            E[-1] -= self._cERight * (-2 * H[-1])
+        if periodic:
+            dE = self._cELeft * (H[0] - H[-1])
+            E[0] -= dE
+            E[-1] -= dE
+
+    def updateH(self, fields, dt):
+        '''
+        H += dt * computeRHSH(fields), in place and without temporaries.
+        '''
+        if not self.hasYeeFastPath():
+            self.dt = dt
+            addScaledFields(fields['H'], self.computeRHSH(fields), dt)
+            return
+        self.prepareYeeUpdate(dt)
+        self.updateCellsH(fields['E'], fields['H'], 0, len(self.dx))
+
+    def updateCellsH(self, E, H, first, last):
+        '''
+        In place update of the H cells first to last - 1.
+        '''
+        buf = self._bufH[first:last]
+        np.subtract(E[first+1:last+1], E[first:last], out=buf)
+        buf *= self._cH[first:last]
+        H[first:last] -= buf
+
+    def slabs(self):
+        '''
+        Number of H cells, along which SlabDriver splits the grid.
+        '''
+        return len(self.dx)
+
+    def updateSlabE(self, fields, dt, first, last):
+        '''
+        updateE restricted to the E nodes of the H cells first to last - 1,
+        i.e. their left nodes. The first slab also updates both boundary
+        nodes. Reads the H cell first - 1 of the previous slab.
+        '''
+        if not self.hasYeeFastPath():
+            raise ValueError("Slab updates require the second order stencil, PEC, PMC or Periodic boundaries and no TFSF.")
+        self.prepareYeeUpdate(dt)
+        self.updateNodesE(fields['E'], fields['H'], max(first, 1), last)
+        if first == 0:
+            self.updateBoundaryNodesE(fields['E'], fields['H'])
+
+    def updateSlabH(self, fields, dt, first, last):
+        '''
+        updateH restricted to the H cells first to last - 1. Reads the E
+        node last of the next slab.
+        '''
+        self.prepareYeeUpdate(dt)
+        self.updateCellsH(fields['E'], fields['H'], first, last)
+
     def updateIncidentFieldE(self):
+        if self.incident == "analytic":
+            self.incidentShiftE += self.incidentVelocity()*self.dt
+            self.setAnalyticIncidentFields()
+            return
+
         self.Einc[1:-1] = self.Einc[1:-1] - self.dt*(1.0/self.dxH) * (self.Hinc[1:] - self.Hinc[:-1])
             
         self.Einc[0] = \
@@ -166,6 +473,11 @@ class FD1D(SpatialDiscretization):
         self.Eprev[:] = self.Einc[:]
 
     def updateIncidentFieldH(self):
+        if self.incident == "analytic":
+            self.incidentShiftH += self.incidentVelocity()*self.dt
+            self.setAnalyticIncidentFields()
+            return
+
         self.Hinc = self.Hinc - self.dt*(1.0/self.dx) * (self.Einc[1:] - self.Einc[:-1])
 
 #··································································································
@@ -1,11 +1,68 @@
 import numpy as np
 
 from ..spatialDiscretization import *
+from ..dg.mesh1d import Mesh1D
+from .fd1d import FD1D
+from .stencils import *
+
+BOUNDARY_TAGS = ("XL", "XU", "YL", "YU")
+
+CPML_DEFAULTS = {
+    'thickness': 10, 'grading': 3, 'reflection': 1e-6,
+    'kappaMax': 1.0, 'alphaMax': 0.0,
+}
+
 
 class FD2D(SpatialDiscretization):  # TE mode
-    def __init__(self, x_min, x_max, kx_elem, y_min=0.0, y_max=0.0, ky_elem=0, boundary_labels="PEC"):
-        
-        if type(boundary_labels) == str:
+    '''
+    Yee grid with Ex on the horizontal edges, Ey on the vertical ones and
+    H on the cell centers. As in FD1D, with conductivity computeRHSE
+    takes the conduction current explicitly while the in place updateE
+    of YEE integrates it semi-implicitly, see prepareYeeUpdate, the two
+    differing by O(sigma dt). The fourth order updateE fallback takes the
+    explicit form.
+    '''
+    PROFILED_PHASES = SpatialDiscretization.PROFILED_PHASES + (
+        'computeCurlH', 'computeCurlE', 'applyBoundaryConditionsE',
+        'addIncidentE', 'addIncidentH', 'updateE', 'updateH'
+    )
+
+    def __init__(self, x_min, x_max, kx_elem, y_min=0.0, y_max=0.0, ky_elem=0, boundary_labels="PEC",
+                 epsilon=None, mu=None, sigma=None, order=2, **cpml):
+        '''
+        cpml takes the CPML settings of setCPML: thickness, grading,
+        reflection, kappaMax and alphaMax.
+        '''
+        self.setLabelsAndOrder(boundary_labels, order)
+        self.setCPMLSettings(**cpml)
+
+        if y_min == 0.0 and y_max == 0.0 and ky_elem == 0:
+            y_min = x_min
+            y_max = x_max
+            ky_elem = kx_elem
+        elif ky_elem <= 0 or y_max <= y_min:
+            raise ValueError("Invalid values for y grid planes.")
+
+        self.setGrid(
+            np.linspace(x_min, x_max, num=kx_elem+1),
+            np.linspace(y_min, y_max, num=ky_elem+1),
+            epsilon, mu, sigma
+        )
+
+    @classmethod
+    def fromNodes(cls, x, y, boundary_labels="PEC", epsilon=None, mu=None, sigma=None, order=2,
+                  **cpml):
+        '''
+        FD2D on the, possibly graded, grid with E nodes x and y.
+        '''
+        sp = cls.__new__(cls)
+        sp.setLabelsAndOrder(boundary_labels, order)
+        sp.setCPMLSettings(**cpml)
+        sp.setGrid(np.asarray(x, dtype=float), np.asarray(y, dtype=float), epsilon, mu, sigma)
+        return sp
+
+    def setLabelsAndOrder(self, boundary_labels, order):
+        if isinstance(boundary_labels, str):
             self.boundary_labels = dict()
             self.boundary_labels["XL"] = boundary_labels
             self.boundary_labels["XU"] = boundary_labels
@@ -13,83 +70,743 @@ class FD2D(SpatialDiscretization):  # TE mode
             self.boundary_labels["YU"] = boundary_labels
         else:
             self.boundary_labels = boundary_labels
+        if any(bdr not in BOUNDARY_TAGS for bdr in self.boundary_labels):
+            raise ValueError("Invalid boundary tag.")
+        self.pmcBoundaries = [
+            bdr for bdr in BOUNDARY_TAGS if self.boundary_labels.get(bdr) == "PMC"
+        ]
 
-        if y_min == 0.0 and y_max == 0.0 and ky_elem == 0:
-            y_min = x_min
-            y_max = x_max
-            ky_elem = kx_elem
-        else:
-            raise ValueError("Invalid values for y grid planes.")
+        self.tfsf = False
+        self.source = None
+
+        # Spatial order of the staggered differences, as in FD1D.
+        if order not in STENCIL_ORDERS:
+            raise ValueError("Invalid stencil order.")
+        self.order = order
+        if order == 4:
+            self.imageSigns = {
+                field: {
+                    axis: [imageSign(self.boundary_labels[bdr], field) for bdr in bdrs]
+                    for axis, bdrs in [(0, ["YL", "YU"]), (1, ["XL", "XU"])]
+                }
+                for field in ["E", "H"]
+            }
 
-        self.x = np.linspace(x_min, x_max, num=kx_elem+1)
-        self.y = np.linspace(y_min, y_max, num=ky_elem+1)
+    def setGrid(self, x, y, epsilon=None, mu=None, sigma=None):
+        '''
+        Sets the E nodes, the H cell centers and the update coefficients,
+        stored as vectors shaped to broadcast along rows (y) or columns
+        (x) of the fields:
+            cEx, cEy: 1/distance between H centers, for Ey and Ex,
+            cHx, cHy: 1/cell size, for H,
+            cExL, cExU, cEyL, cEyU: 1/cell size at the boundaries, for
+            the images of H across PMC walls.
+        Materials are then set as in setMaterials, the current ones being kept
+        when none are given and they still fit the grid.
+        '''
+        if np.any(np.diff(x) <= 0.0) or np.any(np.diff(y) <= 0.0):
+            raise ValueError("Grid nodes must be strictly increasing.")
+        if self.order == 4 and not (np.allclose(np.diff(x), x[1] - x[0]) and
+                                    np.allclose(np.diff(y), y[1] - y[0])):
+            raise ValueError("Fourth order stencils require uniform grids.")
+
+        self.x = x
+        self.y = y
         self.dx = np.diff(self.x)
         self.dy = np.diff(self.y)
 
         self.xH = (self.x[:-1] + self.x[1:]) / 2.0
         self.yH = (self.y[:-1] + self.y[1:]) / 2.0
 
-        self.cEy = 1.0 / self.dy[0]
-        self.cEx = 1.0 / self.dx[0]
+        self.cEx = (1.0 / np.diff(self.xH)).reshape(1, -1)
+        self.cEy = (1.0 / np.diff(self.yH)).reshape(-1, 1)
+        self.cHx = (1.0 / self.dx).reshape(1, -1)
+        self.cHy = (1.0 / self.dy).reshape(-1, 1)
+        self.cExL = 1.0 / self.dx[0]
+        self.cExU = 1.0 / self.dx[-1]
+        self.cEyL = 1.0 / self.dy[0]
+        self.cEyU = 1.0 / self.dy[-1]
+
+        self._yeeDt = None
+        if "CPML" in self.boundary_labels.values():
+            self.setCPML()
+        else:
+            self.cpmlLayers = []
+
+        # Without new materials the current ones are kept if they still fit
+        # the grid.
+        current = getattr(self, 'epsilon', None)
+        if all(m is None for m in (epsilon, mu, sigma)) and current is not None \
+                and current.shape == (len(self.dy), len(self.dx)):
+            epsilon, mu, sigma = self.epsilon, self.mu, self.sigma
+        self.setMaterials(epsilon, mu, sigma)
+
+    def setMaterials(self, epsilon=None, mu=None, sigma=None):
+        '''
+        Per cell permittivity, permeability and conductivity, shaped as H
+        and vacuum by default. Ex nodes take the average of the cells
+        above and below weighted by their heights, Ey nodes the one of
+        the cells on their sides weighted by their widths. Without
+        materials the updates skip them.
+        '''
+        shape = (len(self.dy), len(self.dx))
+
+        def cellValues(values, default, name):
+            if values is None:
+                return np.full(shape, default)
+            values = np.array(values, dtype=float)
+            if values.shape != shape:
+                raise ValueError("The dimensions of the " + name + " array must align with the number of cells in the grid.")
+            return values
+
+        self.epsilon = cellValues(epsilon, 1.0, "permittivity")
+        self.mu = cellValues(mu, 1.0, "permeability")
+        self.sigma = cellValues(sigma, 0.0, "conductivity")
+
+        self.hasMaterials = bool(np.any(self.epsilon != 1.0) or
+                                 np.any(self.mu != 1.0) or
+                                 np.any(self.sigma != 0.0))
+        self.hasConductivity = bool(np.any(self.sigma != 0.0))
+        self.invEpsilonEx = 1.0 / self.nodeAverage(self.epsilon, 0)
+        self.invEpsilonEy = 1.0 / self.nodeAverage(self.epsilon, 1)
+        self.sigmaEx = self.nodeAverage(self.sigma, 0)
+        self.sigmaEy = self.nodeAverage(self.sigma, 1)
+        self.sigmaOverEpsilonEx = self.sigmaEx * self.invEpsilonEx
+        self.sigmaOverEpsilonEy = self.sigmaEy * self.invEpsilonEy
+        self.invMu = 1.0 / self.mu
+        self._yeeDt = None
+        self.operatorChanged()
+
+    def nodeAverage(self, values, axis):
+        '''
+        Cell values averaged on the E nodes along axis, 0 for Ex and 1
+        for Ey.
+        '''
+        values = np.moveaxis(values, axis, 0)
+        h = (self.dy if axis == 0 else self.dx).reshape(-1, 1)
+        v = np.empty((values.shape[0] + 1, values.shape[1]))
+        v[1:-1] = (values[:-1]*h[:-1] + values[1:]*h[1:]) / (h[:-1] + h[1:])
+        v[0] = values[0]
+        v[-1] = values[-1]
+        return np.moveaxis(v, 0, axis)
+
+    def setCPMLSettings(self, **settings):
+        '''
+        Stores CPML settings, the missing ones keeping their current or
+        default values, for this and later calls to setCPML by setGrid.
+        '''
+        if any(key not in CPML_DEFAULTS for key in settings):
+            raise ValueError("Invalid CPML setting.")
+        current = getattr(self, 'cpmlSettings', CPML_DEFAULTS)
+        self.cpmlSettings = dict(current, **settings)
+
+    def setCPML(self, **settings):
+        '''
+        Convolutional PML in the last thickness cells next to each
+        boundary labelled CPML, terminated by a PEC wall. With d the
+        normalized depth into a layer of width L the profiles are
+            sigma = sigmaMax d^grading, sigmaMax = -(grading+1) ln(R) / (2L),
+            kappa = 1 + (kappaMax - 1) d^grading,
+            alpha = alphaMax (1 - d),
+        R being the normal incidence reflection. The stretched derivative
+        (1/kappa) d/du + psi is applied with psi updated by recursive
+        convolution. psi is only stored in the layers. CPML is only
+        available through the in place updates, i.e. the YEE integrator.
+        The settings are stored, see setCPMLSettings, and reapplied when
+        the grid changes.
+        '''
+        self.setCPMLSettings(**settings)
+        thickness = self.cpmlSettings['thickness']
+        grading = self.cpmlSettings['grading']
+        reflection = self.cpmlSettings['reflection']
+        kappaMax = self.cpmlSettings['kappaMax']
+        alphaMax = self.cpmlSettings['alphaMax']
+
+        self.cpmlLayers = []
+        for bdr, label in self.boundary_labels.items():
+            if label != "CPML":
+                continue
+            axis = 0 if bdr in ["YL", "YU"] else 1
+            nodes, centers = (self.y, self.yH) if axis == 0 else (self.x, self.xH)
+            N = len(centers)
+            if thickness >= N:
+                raise ValueError("CPML thicker than the grid.")
+            if bdr in ["XL", "YL"]:
+                interface, wall = nodes[thickness], nodes[0]
+                eRange = (1, thickness + 1)
+                hRange = (0, thickness)
+            else:
+                interface, wall = nodes[N - thickness], nodes[N]
+                eRange = (N - thickness, N)
+                hRange = (N - thickness, N)
+            L = abs(wall - interface)
+            sigmaMax = -(grading + 1)*np.log(reflection)/(2*L)
+
+            def profiles(coordinates):
+                d = np.abs(coordinates - interface)/L
+                shape = (-1, 1) if axis == 0 else (1, -1)
+                return (
+                    (sigmaMax*d**grading).reshape(shape),
+                    (1.0 + (kappaMax - 1.0)*d**grading).reshape(shape),
+                    (alphaMax*(1.0 - d)).reshape(shape),
+                )
+
+            self.cpmlLayers.append({
+                'axis': axis,
+                # E field and curl buffer slices, H slices.
+                'E': (slice(*eRange), slice(eRange[0] - 1, eRange[1] - 1)),
+                'H': (slice(*hRange), slice(*hRange)),
+                'profiles': {
+                    'E': profiles(nodes[eRange[0]:eRange[1]]),
+                    'H': profiles(centers[hRange[0]:hRange[1]]),
+                },
+            })
+        self._yeeDt = None
+        self.operatorChanged()
+        self.resetCPML()
+
+    def resetCPML(self):
+        for layer in self.cpmlLayers:
+            n = layer['E'][0].stop - layer['E'][0].start
+            if layer['axis'] == 0:
+                shape = (n, len(self.dx))
+            else:
+                shape = (len(self.dy), n)
+            layer['psi'] = {'E': np.zeros(shape), 'H': np.zeros(shape)}
+
+    def applyCPML(self, field, buf, kind, axis, sign):
+        '''
+        Turns the update field += sign*buf, with buf the dt scaled
+        derivative along axis, into the stretched one in the CPML layers.
+        '''
+        for layer in self.cpmlLayers:
+            if layer['axis'] != axis:
+                continue
+            fieldSlice, bufSlice = layer[kind]
+            if axis == 0:
+                f, b = field[fieldSlice, :], buf[bufSlice, :]
+            else:
+                f, b = field[:, fieldSlice], buf[:, bufSlice]
+            psi = layer['psi'][kind]
+            bCoeff, aCoeff, kappaInv = layer['coefficients'][kind]
+
+            psi *= bCoeff
+            psi += aCoeff*b
+            f += sign*((kappaInv - 1.0)*b + psi)
+
+    def TFSF_conditions(self, setup):
+        '''
+        Total field/scattered field rectangle with sides on the E nodes
+        nearest to setup "left", "right", "bottom" and "top", inside which
+        a plane wave travelling along setup "direction", '+x' (default),
+        '-x', '+y' or '-y', is added. setup "source" is its E profile at
+        t = 0 as a function of the coordinate along the direction. E is
+        Ey for waves along x, Ex for waves along y, and H = E.
+
+        The incident fields are advanced on an auxiliary FD1D grid with the
+        spacing and time step of this one, padded with as many cells on
+        each side, so that they match the 2D dispersion exactly. They take
+        one step per leapfrog half step, of the dt passed to updateE and
+        updateH or, through computeRHSE and computeRHSH, of self.dt, which
+        MaxwellDriver sets to the dt of each step. Only LF2 and YEE are
+        supported. The grid must be uniform along the direction and the
+        cells on both sides of the rectangle sides be vacuum, outside CPML
+        layers.
+        '''
+        if not "source" in setup.keys() or not all(k in setup.keys() for k in ["left", "right", "bottom", "top"]):
+            raise ValueError('Missing TFSF setup variables')
+        if self.order != 2:
+            raise ValueError("TFSF requires the second order stencil.")
+        direction = setup.get("direction", "+x")
+        if direction not in ["+x", "-x", "+y", "-y"]:
+            raise ValueError("Invalid TFSF direction.")
+        nodes = self.x if direction[1] == "x" else self.y
+        if not np.allclose(np.diff(nodes), nodes[1] - nodes[0]):
+            raise ValueError("TFSF requires a uniform grid along its direction.")
+
+        self.left_TF_limit = (np.absolute(self.x - setup["left"])).argmin()
+        self.right_TF_limit = (np.absolute(self.x - setup["right"])).argmin()
+        self.bottom_TF_limit = (np.absolute(self.y - setup["bottom"])).argmin()
+        self.top_TF_limit = (np.absolute(self.y - setup["top"])).argmin()
+        if not (0 < self.left_TF_limit < self.right_TF_limit < len(self.dx) and
+                0 < self.bottom_TF_limit < self.top_TF_limit < len(self.dy)):
+            raise ValueError("TFSF rectangle must lie strictly inside the grid.")
+
+        # Cells on both sides of the rectangle sides.
+        l, r = self.left_TF_limit, self.right_TF_limit
+        b, t = self.bottom_TF_limit, self.top_TF_limit
+        sides = np.zeros((len(self.dy), len(self.dx)), dtype=bool)
+        sides[b - 1:t + 1, l - 1:r + 1] = True
+        sides[b + 1:t - 1, l + 1:r - 1] = False
+        layers = np.zeros_like(sides)
+        for layer in self.cpmlLayers:
+            if layer['axis'] == 0:
+                layers[layer['H'][0], :] = True
+            else:
+                layers[:, layer['H'][0]] = True
+        if np.any(sides & layers) or np.any(self.epsilon[sides] != 1.0) \
+                or np.any(self.mu[sides] != 1.0) or np.any(self.sigma[sides] != 0.0):
+            raise ValueError("TFSF rectangle sides must lie in vacuum.")
+
+        self.tfsf = True
+        self.source = setup["source"]
+        self.tfsfDirection = direction
+
+    def buildIncidentFields(self):
+        '''
+        Auxiliary FD1D grid, with Mur ends, along the TFSF direction, and
+        the indices and sign mapping its E nodes and H cells to the ones
+        of this grid. Waves along -x or +y see the 1D E with opposite sign.
+        '''
+        direction = self.tfsfDirection
+        nodes = self.x if direction[1] == "x" else self.y
+        n = len(nodes) - 1
+        h = nodes[1] - nodes[0]
+        padding = n
+        forward = direction[0] == "+"
+        start = (nodes[0] if forward else -nodes[-1]) - padding*h
+
+        aux = FD1D(Mesh1D(start, start + (n + 2*padding)*h, n + 2*padding, boundary_label="Mur"))
+        aux.dt = self.dt
+        aux.source = self.source
+        aux.buildIncidentFields()
+        self.auxiliary = aux
+
+        if forward:
+            self._incidentE = padding + np.arange(n + 1)
+            self._incidentH = padding + np.arange(n)
+        else:
+            self._incidentE = padding + n - np.arange(n + 1)
+            self._incidentH = padding + n - 1 - np.arange(n)
+        self._incidentSign = 1.0 if direction in ["+x", "-y"] else -1.0
+
+    def advanceIncidentE(self, dt):
+        self.auxiliary.dt = dt
+        self.auxiliary.updateIncidentFieldE()
+
+    def advanceIncidentH(self, dt):
+        self.auxiliary.dt = dt
+        self.auxiliary.updateIncidentFieldH()
+
+    def incidentFields(self):
+        '''
+        Incident Ex, Ey and H, shaped to broadcast against the fields;
+        the E component normal to the direction is None.
+        '''
+        aux = self.auxiliary
+        E = self._incidentSign * aux.Einc[self._incidentE]
+        H = aux.Hinc[self._incidentH]
+        if self.tfsfDirection[1] == "x":
+            return None, E.reshape(1, -1), H.reshape(1, -1)
+        return E.reshape(-1, 1), None, H.reshape(-1, 1)
+
+    def addIncidentE(self, Ex, Ey, scale):
+        '''
+        Adds scale times the corrections of the E updates on the sides of
+        the TFSF rectangle, where the curl of H takes H values across it.
+        '''
+        iL, iR = self.left_TF_limit, self.right_TF_limit
+        jB, jT = self.bottom_TF_limit, self.top_TF_limit
+        H = np.broadcast_to(self.incidentFields()[2], (len(self.dy), len(self.dx)))
+
+        Ey[jB:jT, iL] += scale * self.cEx[0, iL-1] * H[jB:jT, iL-1]
+        Ey[jB:jT, iR] -= scale * self.cEx[0, iR-1] * H[jB:jT, iR]
+        Ex[jB, iL:iR] -= scale * self.cEy[jB-1, 0] * H[jB-1, iL:iR]
+        Ex[jT, iL:iR] += scale * self.cEy[jT-1, 0] * H[jT, iL:iR]
+
+    def addIncidentH(self, H, scale):
+        '''
+        Adds scale times the corrections of the H updates next to the
+        sides of the TFSF rectangle, where the curl of E takes the total
+        tangential E on them.
+        '''
+        iL, iR = self.left_TF_limit, self.right_TF_limit
+        jB, jT = self.bottom_TF_limit, self.top_TF_limit
+        Ex, Ey, _ = self.incidentFields()
+
+        if Ey is not None:
+            Ey = np.broadcast_to(Ey, (len(self.dy), len(self.x)))
+            H[jB:jT, iL-1] += scale * self.cHx[0, iL-1] * Ey[jB:jT, iL]
+            H[jB:jT, iR] -= scale * self.cHx[0, iR] * Ey[jB:jT, iR]
+        if Ex is not None:
+            Ex = np.broadcast_to(Ex, (len(self.y), len(self.dx)))
+            H[jB-1, iL:iR] -= scale * self.cHy[jB-1, 0] * Ex[jB, iL:iR]
+            H[jT, iL:iR] += scale * self.cHy[jT, 0] * Ex[jT, iL:iR]
 
     def buildFields(self):
         H = np.zeros((len(self.dy), len(self.dx)))
         Ex = np.zeros((len(self.y),  len(self.dx)))
         Ey = np.zeros((len(self.dy), len(self.x)))
 
+        self.resetCPML()
+        if self.source is not None and self.tfsf:
+            self.buildIncidentFields()
+
         return {
             "E": {"x": Ex, "y": Ey},
             "H": H
         }
 
     def get_minimum_node_distance(self):
-        return np.min(self.dx)
+        return min(np.min(self.dx), np.min(self.dy))
+
+    def get_cfl_factor(self):
+        return CFL_FACTORS[self.order]
 
     def computeRHSE(self, fields):
         H = fields['H']
-        Ex = fields['E']['x']
-        Ey = fields['E']['y']
+        rhsEx, rhsEy = self.computeCurlH(H)
+        if self.tfsf:
+            self.advanceIncidentE(self.dt)
+            self.addIncidentE(rhsEx, rhsEy, 1.0)
+        self.applyBoundaryConditionsE(rhsEx, rhsEy, H)
+
+        if self.hasMaterials:
+            rhsEx = self.invEpsilonEx * rhsEx - self.sigmaOverEpsilonEx * fields['E']['x']
+            rhsEy = self.invEpsilonEy * rhsEy - self.sigmaOverEpsilonEy * fields['E']['y']
+
+        return {'x': rhsEx, 'y': rhsEy}
 
-        rhsEx = np.zeros(Ex.shape)
-        rhsEy = np.zeros(Ey.shape)
+    def computeCurlH(self, H):
+        if self.order == 4:
+            signs = self.imageSigns["H"]
+            rhsEx =   (1.0/self.dy[0]) * staggeredDifference4(
+                extendWithImages(H, 0, *signs[0], cells=True), 0)
+            rhsEy = - (1.0/self.dx[0]) * staggeredDifference4(
+                extendWithImages(H, 1, *signs[1], cells=True), 1)
+            return rhsEx, rhsEy
+
+        rhsEx = np.zeros((len(self.y), len(self.dx)))
+        rhsEy = np.zeros((len(self.dy), len(self.x)))
 
         rhsEx[1:-1, :] =   self.cEy * ( H[1:, :] - H[:-1, :])
         rhsEy[:, 1:-1] = - self.cEx * ( H[:, 1:] - H[:, :-1])
 
+        return rhsEx, rhsEy
+
+    def applyBoundaryConditionsE(self, rhsEx, rhsEy, H):
+        if self.cpmlLayers:
+            raise ValueError("CPML boundaries require the YEE integrator.")
+        # The fourth order curl already accounts for the boundaries.
+        if self.order == 4:
+            return
         for bdr, label in self.boundary_labels.items():
             if bdr == "XL":
                 if label == "PEC":
                     rhsEy[:,  0] = 0.0
                 elif label == "PMC":
-                    rhsEy[:, 0] =  - self.cEx * (2*H[:,0])
+                    rhsEy[:, 0] =  - self.cExL * (2*H[:,0])
             elif bdr == "XU":
                 if label == "PEC":
                     rhsEy[:, -1] = 0.0
                 elif label == "PMC":
-                    rhsEy[:, -1] =  - self.cEx * (-2*H[:,-1])
+                    rhsEy[:, -1] =  - self.cExU * (-2*H[:,-1])
             elif bdr == "YL":
                 if label == "PEC":
                     rhsEx[0, :] = 0.0
                 elif label == "PMC":
-                    rhsEx[0, :] =  self.cEy * (2*H[0,:])
+                    rhsEx[0, :] =  self.cEyL * (2*H[0,:])
             elif bdr == "YU":
                 if label == "PEC":
                     rhsEx[-1, :] = 0.0
                 elif label == "PMC":
-                    rhsEx[-1, :] =  self.cEy * (-2*H[-1,:])
-            else:
-                raise ValueError("Invalid boundary tag.")       
-
-        return {'x': rhsEx, 'y': rhsEy}
+                    rhsEx[-1, :] =  self.cEyU * (-2*H[-1,:])
 
     def computeRHSH(self, fields):
+        rhsH = self.computeCurlE(fields['E']['x'], fields['E']['y'])
+        if self.tfsf:
+            self.advanceIncidentH(self.dt)
+            self.addIncidentH(rhsH, 1.0)
+        if self.hasMaterials:
+            rhsH *= self.invMu
+        return rhsH
+
+    def computeCurlE(self, Ex, Ey):
+        if self.order == 4:
+            signs = self.imageSigns["E"]
+            return (1.0/self.dy[0]) * staggeredDifference4(
+                       extendWithImages(Ex, 0, *signs[0], cells=False), 0) \
+                 - (1.0/self.dx[0]) * staggeredDifference4(
+                       extendWithImages(Ey, 1, *signs[1], cells=False), 1)
+
+        rhsH = + self.cHy*(Ex[1:, :] - Ex[:-1, :]) \
+               - self.cHx*(Ey[:, 1:] - Ey[:, :-1])
+
+        return rhsH
+
+    def prepareYeeUpdate(self, dt):
+        '''
+        Update coefficients dt*c for the in place updates, recomputed
+        only when dt changes. With materials they are folded into per
+        node arrays, the conductivity being integrated semi-implicitly
+        as in FD1D: E <- Ca E + Cb dt curl H, Ca = (1 - s)/(1 + s),
+        Cb = 1/(epsilon (1 + s)), s = sigma dt/(2 epsilon). The boundary
+        coefficients include the factor 2 of the H images across PMC
+        walls.
+        '''
+        if getattr(self, '_yeeDt', None) == dt:
+            return
+        self._yeeDt = dt
+        self._cEx = dt*self.cEx
+        self._cEy = dt*self.cEy
+        self._cHx = dt*self.cHx
+        self._cHy = dt*self.cHy
+        self._cExL = 2*dt*self.cExL
+        self._cExU = 2*dt*self.cExU
+        self._cEyL = 2*dt*self.cEyL
+        self._cEyU = 2*dt*self.cEyU
+        self._CaEx = None
+        self._CaEy = None
+        if self.hasMaterials:
+            sEx = 0.5*dt*self.sigmaOverEpsilonEx
+            sEy = 0.5*dt*self.sigmaOverEpsilonEy
+            CbEx = self.invEpsilonEx/(1.0 + sEx)
+            CbEy = self.invEpsilonEy/(1.0 + sEy)
+            self._cEy = self._cEy*CbEx[1:-1, :]
+            self._cEx = self._cEx*CbEy[:, 1:-1]
+            self._cHx = self._cHx*self.invMu
+            self._cHy = self._cHy*self.invMu
+            self._cExL = self._cExL*CbEy[:, 0]
+            self._cExU = self._cExU*CbEy[:, -1]
+            self._cEyL = self._cEyL*CbEx[0, :]
+            self._cEyU = self._cEyU*CbEx[-1, :]
+            if self.hasConductivity:
+                self._CaEx = (1.0 - sEx)/(1.0 + sEx)
+                self._CaEy = (1.0 - sEy)/(1.0 + sEy)
+        self._yeeBuffers = dict()
+
+        for layer in self.cpmlLayers:
+            layer['coefficients'] = dict()
+            for kind, (sigma, kappa, alpha) in layer['profiles'].items():
+                b = np.exp(-(sigma/kappa + alpha)*dt)
+                denominator = sigma*kappa + kappa**2*alpha
+                a = np.divide(sigma*(b - 1.0), denominator,
+                              out=np.zeros(b.shape), where=denominator > 0.0)
+                layer['coefficients'][kind] = (b, a, 1.0/kappa)
+
+    def yeeBuffers(self, rows):
+        '''
+        Work buffers for the curls of fields with the given number of H
+        rows, allocated once per size, and for the PMC corrections of a
+        column and of a row.
+        '''
+        if rows not in self._yeeBuffers:
+            nx = len(self.dx)
+            self._yeeBuffers[rows] = (
+                np.zeros((rows - 1, nx)),
+                np.zeros((rows, nx - 1)),
+                np.zeros((rows, nx)),
+                np.zeros(rows),
+                np.zeros(nx),
+            )
+        return self._yeeBuffers[rows]
+
+    def updateE(self, fields, dt):
+        '''
+        E += dt * computeRHSE(fields), in place and without temporaries
+        in the bulk. The fourth order stencil falls back to computeRHSE.
+        '''
+        if self.order == 4:
+            addScaledFields(fields['E'], self.computeRHSE(fields), dt)
+            return
+        self.prepareYeeUpdate(dt)
+        self.updateRowsE(fields['H'], fields['E']['x'], fields['E']['y'], True, True)
+        if self.tfsf:
+            self.advanceIncidentE(dt)
+            self.addIncidentE(fields['E']['x'], fields['E']['y'], dt)
+
+    def updateH(self, fields, dt):
+        '''
+        H += dt * computeRHSH(fields), in place and without temporaries.
+        '''
+        if self.order == 4:
+            fields['H'] += dt * self.computeRHSH(fields)
+            return
+        self.prepareYeeUpdate(dt)
+        self.updateRowsH(fields['H'], fields['E']['x'], fields['E']['y'])
+        if self.tfsf:
+            self.advanceIncidentH(dt)
+            self.addIncidentH(fields['H'], dt)
+
+    @staticmethod
+    def rowsOf(c, row, rows):
+        '''
+        Rows of a coefficient for a band, unless it is constant along y.
+        '''
+        if np.ndim(c) == 0 or c.shape[0] == 1:
+            return c
+        return c[row:row+rows]
+
+    def updateRowsE(self, H, Ex, Ey, first, last, row=0):
+        '''
+        updateE on a band of consecutive rows, starting at H row row: H
+        and Ey rows and the Ex rows bounding them. first and last tell
+        whether the band starts or ends at the YL or YU boundaries,
+        otherwise its end Ex rows are left as they are.
+        '''
+        rows = H.shape[0]
+        bufEx, bufEy, _, bufColumn, bufRow = self.yeeBuffers(rows)
+        CaEx = self._CaEx
+        CaEy = self._CaEy
+
+        np.subtract(H[1:, :], H[:-1, :], out=bufEx)
+        bufEx *= self._cEy[row:row+rows-1]
+        if CaEx is not None:
+            Ex[1:-1, :] *= CaEx[row+1:row+rows]
+        Ex[1:-1, :] += bufEx
+        if self.cpmlLayers:
+            self.applyCPML(Ex, bufEx, 'E', 0, 1.0)
+
+        np.subtract(H[:, 1:], H[:, :-1], out=bufEy)
+        bufEy *= self.rowsOf(self._cEx, row, rows)
+        if CaEy is not None:
+            Ey[:, 1:-1] *= CaEy[row:row+rows, 1:-1]
+        Ey[:, 1:-1] -= bufEy
+        if self.cpmlLayers:
+            self.applyCPML(Ey, bufEy, 'E', 1, -1.0)
+
+        for bdr in self.pmcBoundaries:
+            if bdr == "XL":
+                if CaEy is not None:
+                    Ey[:, 0] *= CaEy[row:row+rows, 0]
+                np.multiply(self.rowsOf(self._cExL, row, rows), H[:, 0], out=bufColumn)
+                Ey[:, 0] -= bufColumn
+            elif bdr == "XU":
+                if CaEy is not None:
+                    Ey[:, -1] *= CaEy[row:row+rows, -1]
+                np.multiply(self.rowsOf(self._cExU, row, rows), H[:, -1], out=bufColumn)
+                Ey[:, -1] += bufColumn
+            elif bdr == "YL" and first:
+                if CaEx is not None:
+                    Ex[0, :] *= CaEx[0]
+                np.multiply(self._cEyL, H[0, :], out=bufRow)
+                Ex[0, :] += bufRow
+            elif bdr == "YU" and last:
+                if CaEx is not None:
+                    Ex[-1, :] *= CaEx[-1]
+                np.multiply(self._cEyU, H[-1, :], out=bufRow)
+                Ex[-1, :] -= bufRow
+
+    def updateRowsH(self, H, Ex, Ey, row=0):
+        rows = H.shape[0]
+        bufH = self.yeeBuffers(rows)[2]
+
+        np.subtract(Ex[1:, :], Ex[:-1, :], out=bufH)
+        bufH *= self._cHy[row:row+rows]
+        H += bufH
+        if self.cpmlLayers:
+            self.applyCPML(H, bufH, 'H', 0, 1.0)
+
+        np.subtract(Ey[:, 1:], Ey[:, :-1], out=bufH)
+        bufH *= self.rowsOf(self._cHx, row, rows)
+        H -= bufH
+        if self.cpmlLayers:
+            self.applyCPML(H, bufH, 'H', 1, -1.0)
+
+    def slabs(self):
+        '''
+        Number of H rows, along which SlabDriver splits the grid.
+        '''
+        return len(self.dy)
+
+    def updateSlabE(self, fields, dt, first, last):
+        '''
+        updateE restricted to the H rows first to last - 1: their Ey rows
+        and the Ex rows below them, plus the top Ex row for the last
+        slab. Reads the H row first - 1 of the previous slab.
+        '''
+        if self.cpmlLayers or self.order == 4 or self.tfsf:
+            raise ValueError("Slab updates require the second order stencil and no CPML boundaries or TFSF.")
+        self.prepareYeeUpdate(dt)
+        H = fields['H']
         Ex = fields['E']['x']
         Ey = fields['E']['y']
+        self.updateRowsE(H[first:last], Ex[first:last+1], Ey[first:last],
+                         first == 0, last == H.shape[0], first)
+        if first > 0:
+            bufEx = self.yeeBuffers(2)[0]
+            np.subtract(H[first:first+1, :], H[first-1:first, :], out=bufEx)
+            bufEx *= self._cEy[first-1:first]
+            if self._CaEx is not None:
+                Ex[first:first+1, :] *= self._CaEx[first:first+1]
+            Ex[first:first+1, :] += bufEx
 
-        rhsH = + self.cEy*(Ex[1:, :] - Ex[:-1, :]) \
-               - self.cEx*(Ey[:, 1:] - Ey[:, :-1])
+    def updateSlabH(self, fields, dt, first, last):
+        '''
+        updateH restricted to the H rows first to last - 1. Reads the Ex
+        row last of the next slab.
+        '''
+        if self.cpmlLayers or self.order == 4 or self.tfsf:
+            raise ValueError("Slab updates require the second order stencil and no CPML boundaries or TFSF.")
+        self.prepareYeeUpdate(dt)
+        self.updateRowsH(fields['H'][first:last], fields['E']['x'][first:last+1],
+                         fields['E']['y'][first:last], first)
 
-        return rhsH
+    def stepTiled(self, fields, dt, steps, tileRows=64):
+        '''
+        Advances fields by steps leapfrog steps, as that many updateE and
+        updateH calls, with overlapped temporal tiling. The grid is split
+        in bands of tileRows H rows. Each band is copied to a work buffer
+        together with steps halo rows on each side, advanced all the steps
+        while it stays in cache and its own rows are written back in
+        place. The rows of the lower halo have already been overwritten
+        by then, so their old values are kept from the previous band in
+        a pair of ping-pong buffers. Errors from the band ends travel one
+        row per step and never reach the written rows. Results are bit
+        identical to the untiled updates; the halo rows are computed
+        redundantly, 2*steps/tileRows extra work.
+
+        Fields are advanced directly, outside MaxwellDriver, so neither
+        its time nor its monitors are updated.
+        '''
+        if self.cpmlLayers or self.order == 4 or self.tfsf:
+            raise ValueError("Tiled updates require the second order stencil and no CPML boundaries or TFSF.")
+        self.prepareYeeUpdate(dt)
+        H = fields['H']
+        Ex = fields['E']['x']
+        Ey = fields['E']['y']
+        ny, nx = H.shape
+
+        rows = min(tileRows + 2*steps, ny)
+        h = np.empty((rows, nx))
+        ex = np.empty((rows + 1, nx))
+        ey = np.empty((rows, nx + 1))
+        halos = [
+            (np.empty((steps, nx)), np.empty((steps, nx)), np.empty((steps, nx + 1)))
+            for _ in range(2)
+        ]
+
+        lo = 0
+        for a in range(0, ny, tileRows):
+            b = min(a + tileRows, ny)
+            hi = min(b + steps, ny)
+            n, m = hi - lo, a - lo
+
+            # Old rows lo..a from the previous band, a..hi from the fields.
+            haloH, haloEx, haloEy = halos[0]
+            h[:m] = haloH[:m]
+            h[m:n] = H[a:hi]
+            ex[:m] = haloEx[:m]
+            ex[m:n+1] = Ex[a:hi+1]
+            ey[:m] = haloEy[:m]
+            ey[m:n] = Ey[a:hi]
+
+            nextLo = max(b - steps, 0)
+            haloH, haloEx, haloEy = halos[1]
+            haloH[:b-nextLo] = h[nextLo-lo:b-lo]
+            haloEx[:b-nextLo] = ex[nextLo-lo:b-lo]
+            haloEy[:b-nextLo] = ey[nextLo-lo:b-lo]
+            halos.reverse()
+
+            for _ in range(steps):
+                self.updateRowsE(h[:n], ex[:n+1], ey[:n], lo == 0, hi == ny, lo)
+                self.updateRowsH(h[:n], ex[:n+1], ey[:n], lo)
+
+            H[a:b] = h[m:b-lo]
+            Ey[a:b] = ey[m:b-lo]
+            exEnd = b + 1 if b == ny else b
+            Ex[a:exEnd] = ex[m:exEnd-lo]
+            lo = nextLo
 
     def computeRHS(self, fields):
         rhsE = self.computeRHSE(fields)
@@ -0,0 +1,133 @@
+import numpy as np
+import multiprocessing
+from multiprocessing import shared_memory
+
+from ..driver import *
+
+
+def _sharedFields(fields, blocks):
+    '''
+    Copies of the arrays of a, possibly nested, fields dict in shared
+    memory. The blocks are appended to blocks. Returns the arrays and
+    their layout, the same dict with (block name, shape) leaves.
+    '''
+    arrays, layout = dict(), dict()
+    for key, value in fields.items():
+        if isinstance(value, dict):
+            arrays[key], layout[key] = _sharedFields(value, blocks)
+            continue
+        block = shared_memory.SharedMemory(create=True, size=max(value.nbytes, 1))
+        blocks.append(block)
+        arrays[key] = np.ndarray(value.shape, dtype=float, buffer=block.buf)
+        arrays[key][...] = value
+        layout[key] = (block.name, value.shape)
+    return arrays, layout
+
+
+def _attachFields(layout, blocks):
+    arrays = dict()
+    for key, value in layout.items():
+        if isinstance(value, dict):
+            arrays[key] = _attachFields(value, blocks)
+            continue
+        name, shape = value
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        arrays[key] = np.ndarray(shape, dtype=float, buffer=block.buf)
+    return arrays
+
+
+def _slabWorker(sp, layout, dt, steps, first, last, barrier):
+    blocks = []
+    fields = _attachFields(layout, blocks)
+    try:
+        for _ in range(steps):
+            sp.updateSlabE(fields, dt, first, last)
+            barrier.wait()
+            sp.updateSlabH(fields, dt, first, last)
+            barrier.wait()
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        del fields
+        for block in blocks:
+            block.close()
+
+
+class SlabDriver:
+    '''
+    Leapfrog of the in place updates of FD1D or FD2D on several
+    processes. The grid is split in slabs of consecutive H cells (FD1D)
+    or rows (FD2D), as returned by sp.slabs(), each advanced by its own
+    process on fields kept in shared memory. Processes wait on a barrier
+    after each half step, so that the one cell halos they read from the
+    neighbouring slabs, the H row below in updateSlabE and the E row
+    above in updateSlabH, are up to date. Results are bit identical to
+    the YEE integrator.
+
+    Processes are started by each call to run, whose cost is amortized
+    over its steps. The fields live in shared memory until close is
+    called, SlabDriver is also a context manager.
+    '''
+
+    def __init__(self, sp, processes=None, CFL=1.0):
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if processes < 1 or processes > sp.slabs():
+            raise ValueError("Number of processes must be between 1 and the number of slabs.")
+
+        self.sp = sp
+        self.processes = processes
+        self.dt = MaxwellDriver(sp, timeIntegratorType='YEE', CFL=CFL).dt
+        self.time = 0.0
+
+        # Unsupported boundaries raise here rather than in the processes.
+        sp.updateSlabE(sp.buildFields(), self.dt, 0, sp.slabs())
+
+        bounds = np.linspace(0, sp.slabs(), processes + 1).round().astype(int)
+        self.slabBounds = list(zip(bounds[:-1], bounds[1:]))
+
+        self._blocks = []
+        self.fields, self._layout = _sharedFields(sp.buildFields(), self._blocks)
+
+    def __getitem__(self, key):
+        return self.fields[key]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.fields = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def run(self, steps, dt=None):
+        if dt is None:
+            dt = self.dt
+        context = multiprocessing.get_context()
+        barrier = context.Barrier(self.processes)
+        workers = [
+            context.Process(
+                target=_slabWorker,
+                args=(self.sp, self._layout, dt, steps, first, last, barrier)
+            )
+            for first, last in self.slabBounds
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if any(worker.exitcode != 0 for worker in workers):
+            raise RuntimeError("A slab process failed.")
+        self.time += steps*dt
+
+    def run_until(self, final_time):
+        steps = int(np.ceil((final_time - self.time)/self.dt - 1e-12))
+        if steps > 0:
+            self.run(steps, (final_time - self.time)/steps)
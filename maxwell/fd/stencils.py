@@ -0,0 +1,127 @@
+import numpy as np
+
+STENCIL_ORDERS = (2, 4)
+
+# Leapfrog CFL limit relative to the second order stencil,
+# 1/(9/8 + 1/24) for the fourth order one.
+CFL_FACTORS = {2: 1.0, 4: 6.0/7.0}
+
+
+def imageSign(label, field):
+    '''
+    Sign of the image of field ('E' or 'H') across a boundary, None for
+    periodic ones. Tangential E is odd and H even across PEC walls, the
+    other way round across PMC walls.
+    '''
+    if label == "Periodic":
+        return None
+    if label not in ["PEC", "PMC"]:
+        raise ValueError("Fourth order stencils only support PEC, PMC and Periodic boundaries.")
+    return 1.0 if (label == "PEC") == (field == "H") else -1.0
+
+
+def extendWithImages(f, axis, lowerSign, upperSign, cells):
+    '''
+    f extended along axis by its images across the boundaries, two
+    values per side for cell values (H), reflected across the end faces,
+    one for node values (E), reflected across the end nodes. A sign of
+    None wraps around periodically, the first and last nodes being the
+    same point.
+    '''
+    f = np.moveaxis(f, axis, 0)
+    n = f.shape[0]
+    if cells:
+        lower = f[[n-2, n-1]] if lowerSign is None else lowerSign*f[[1, 0]]
+        upper = f[[0, 1]] if upperSign is None else upperSign*f[[n-1, n-2]]
+    else:
+        lower = f[[n-2]] if lowerSign is None else lowerSign*f[[1]]
+        upper = f[[1]] if upperSign is None else upperSign*f[[n-2]]
+    return np.moveaxis(np.concatenate([lower, f, upper]), 0, axis)
+
+
+def staggeredDifference4(g, axis):
+    '''
+    Fourth order differences, per unit spacing, halfway between the
+    values of g along axis,
+        9/8 (g[i+2] - g[i+1]) - 1/24 (g[i+3] - g[i]),
+    three values shorter than g.
+    '''
+    g = np.moveaxis(g, axis, 0)
+    d = 9.0/8.0*(g[2:-1] - g[1:-2]) - 1.0/24.0*(g[3:] - g[:-3])
+    return np.moveaxis(d, 0, axis)
+
+
+def stencilSymbol(order, u):
+    '''
+    s(u) of the module dispersion relation, such that the staggered
+    difference of exp(i k x) is 2i s(k h)/h exp(i k x).
+    '''
+    if order == 2:
+        return np.sin(u/2)
+    return 9.0/8.0*np.sin(u/2) - 1.0/24.0*np.sin(3*u/2)
+
+
+def phaseVelocity(kh, courant, order=2):
+    '''
+    Phase velocity, relative to c, of a wave with kh radians per cell of
+    the 1D leapfrog Yee scheme with c dt/h = courant. Tends to 1 as kh
+    goes to zero.
+    '''
+    if kh == 0.0:
+        return 1.0
+    omegaDt = 2*np.arcsin(min(courant*stencilSymbol(order, kh), 1.0))
+    return omegaDt/(kh*courant)
+
+
+def dispersionError(order, cellsPerWavelength, CFL=1.0, dimension=2, angles=16):
+    '''
+    Largest relative phase velocity error of the leapfrog Yee scheme with
+    the given stencil order, over propagation angles in 2D, for a wave
+    resolved by cellsPerWavelength cells of a square grid, with the time
+    step MaxwellDriver takes at that CFL. From the discrete dispersion
+    relation, s being the stencilSymbol,
+        sin(w dt/2)^2 = (dt/h)^2 sum_i s(k_i h)^2,
+        s(u) = sin(u/2)                          (second order),
+        s(u) = 9/8 sin(u/2) - 1/24 sin(3u/2)     (fourth order).
+    '''
+    if order not in STENCIL_ORDERS:
+        raise ValueError("Invalid stencil order.")
+    courant = CFL*CFL_FACTORS[order]/np.sqrt(dimension)
+    kh = 2*np.pi/cellsPerWavelength
+
+    thetas = np.linspace(0.0, np.pi/4, angles) if dimension == 2 else np.zeros(1)
+    q2 = stencilSymbol(order, kh*np.cos(thetas))**2
+    if dimension == 2:
+        q2 = q2 + stencilSymbol(order, kh*np.sin(thetas))**2
+    omegaDt = 2*np.arcsin(np.minimum(courant*np.sqrt(q2), 1.0))
+    return np.max(np.abs(omegaDt/(kh*courant) - 1.0))
+
+
+def cellsPerWavelength(order, tolerance, CFL=1.0, dimension=2, maxCells=100000):
+    '''
+    Smallest number of cells per wavelength with a dispersionError below
+    tolerance.
+    '''
+    for n in range(2, maxCells):
+        if dispersionError(order, n, CFL, dimension) <= tolerance:
+            return n
+    raise ValueError("Tolerance not reached with maxCells cells per wavelength.")
+
+
+def dispersionComparison(tolerances=(1e-2, 1e-3, 1e-4), CFL=1.0, dimension=2):
+    '''
+    Cells per wavelength needed by each stencil order for each phase
+    velocity tolerance, with the ratio of cells per dimension and of
+    unknowns of the second order stencil to the fourth order one.
+    '''
+    comparison = []
+    for tolerance in tolerances:
+        cells = {order: cellsPerWavelength(order, tolerance, CFL, dimension)
+                 for order in STENCIL_ORDERS}
+        comparison.append({
+            'tolerance': tolerance,
+            'cellsPerWavelength': cells,
+            'cellRatio': cells[2]/cells[4],
+            'unknownsRatio': (cells[2]/cells[4])**dimension,
+        })
+    return comparison
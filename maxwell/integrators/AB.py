@@ -0,0 +1,90 @@
+import copy
+import numpy as np
+
+from ..spatialDiscretization import *
+from .LSERK4 import *
+#Explicit Adams Bashforth methods
+
+class AB:
+    '''
+    Base class of the explicit Adams-Bashforth family
+        y_{n+1} = y_n + dt * sum_j BETA[j] * f_{n-j}
+    The last ORDER evaluations of the right hand side are kept in a ring
+    buffer of preallocated vectors, so each step costs one evaluation of
+    computeRHS. The history is started, and restarted whenever dt
+    changes, with LSERK4 steps.
+    '''
+    BETA = np.array([1.0])
+
+    def __init__(self, sp: SpatialDiscretization, fields):
+        self.sp = sp
+        self.time = 0.0
+
+        N = self.sp.convertToVector(fields).size
+        self.ORDER = len(self.BETA)
+        self.history = np.zeros((self.ORDER, N))
+        self.head = -1
+        self.count = 0
+        self.dt = None
+
+        self.stageFields = copy.deepcopy(fields)
+        self.evaluations = 0
+
+    def evaluate(self, fields):
+        self.evaluations += 1
+        return self.sp.convertToVector(self.sp.computeRHS(fields))
+
+    def evaluateVector(self, y):
+        self.sp.copyVectorToFields(y, self.stageFields)
+        return self.evaluate(self.stageFields)
+
+    def push(self, f):
+        self.head = (self.head + 1) % self.ORDER
+        self.history[self.head,:] = f
+        self.count = min(self.count + 1, self.ORDER)
+
+    def combination(self, coefficients):
+        ''' sum_j coefficients[j] * f_{n-j} '''
+        weights = np.zeros(self.ORDER)
+        for j, c in enumerate(coefficients):
+            weights[(self.head - j) % self.ORDER] = c
+        return weights.dot(self.history)
+
+    def bootstrap(self, y, dt):
+        ''' LSERK4 step reusing f_n, already in the history, as first stage. '''
+        res = dt*self.history[self.head]
+        y += LSERK4.B[0]*res
+        for s in range(1, LSERK4.N_STAGES):
+            res = LSERK4.A[s]*res + dt*self.evaluateVector(y)
+            y += LSERK4.B[s]*res
+        return y
+
+    def advance(self, y, dt):
+        return y + dt*self.combination(self.BETA)
+
+    def step(self, fields, dt):
+        if dt != self.dt:
+            self.dt = dt
+            self.count = 0
+
+        y = self.sp.convertToVector(fields)
+        self.push(self.evaluate(fields))
+        if self.count < self.ORDER:
+            y = self.bootstrap(y, dt)
+        else:
+            y = self.advance(y, dt)
+
+        self.sp.copyVectorToFields(y, fields)
+        self.time += dt
+
+    @classmethod
+    def amplificationMatrix(cls, z):
+        '''
+        Matrix advancing (y_n, ..., y_{n-ORDER+1}) for y' = z*y.
+        '''
+        k = len(cls.BETA)
+        G = np.zeros((k, k), dtype=complex)
+        G[0,:] = z*cls.BETA
+        G[0,0] += 1.0
+        G[1:,:-1] += np.eye(k-1)
+        return G
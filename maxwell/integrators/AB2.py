@@ -0,0 +1,7 @@
+import numpy as np
+
+from .AB import *
+#Adams Bashforth order 2 method
+
+class AB2(AB):
+    BETA = np.array([3/2, -1/2])
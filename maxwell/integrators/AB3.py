@@ -0,0 +1,7 @@
+import numpy as np
+
+from .AB import *
+#Adams Bashforth order 3 method
+
+class AB3(AB):
+    BETA = np.array([23/12, -16/12, 5/12])
@@ -0,0 +1,26 @@
+import numpy as np
+
+from .AB3 import *
+#Adams Bashforth Moulton order 3 predictor corrector (PECE)
+
+class ABM3(AB3):
+    '''
+    AB3 predictor followed by an order 3 Adams-Moulton corrector
+        y_{n+1} = y_n + dt/12 * (5 f(y*) + 8 f_n - f_{n-1})
+    The evaluation at y_{n+1} is the f_n of the next step, so each step
+    costs two evaluations of computeRHS.
+    '''
+    GAMMA = np.array([5/12, 8/12, -1/12])
+
+    def advance(self, y, dt):
+        fp = self.evaluateVector(y + dt*self.combination(self.BETA))
+        return y + dt*(self.GAMMA[0]*fp + self.combination(self.GAMMA[1:]))
+
+    @classmethod
+    def amplificationMatrix(cls, z):
+        predictor = AB3.amplificationMatrix(z)[0]
+        G = AB3.amplificationMatrix(z)
+        G[0,:] = z*cls.GAMMA[0]*predictor
+        G[0,:2] += z*cls.GAMMA[1:]
+        G[0,0] += 1.0
+        return G
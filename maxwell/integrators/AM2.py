@@ -11,6 +11,14 @@ class AM2:
 
         self.A = sp.buildEvolutionOperator()          
 
+    @classmethod
+    def amplificationMatrix(cls, z):
+        '''
+        Amplification of y' = z*y. As step restarts with yo2 = yo1,
+        R(z) = (1 + 7z/12)/(1 - 5z/12), with |R| > 1 on the imaginary axis.
+        '''
+        return np.array([[(1.0 + 7.0*z/12.0)/(1.0 - 5.0*z/12.0)]])
+
     def adams_moulton_2_residual(self, yp, f, dt, yo1, yo2):
         return yp - yo1 - 1/12*dt*(5*np.matmul(f, yp)+8*np.matmul(f, yo1)-np.matmul(f, yo2))
 
@@ -0,0 +1,95 @@
+import time
+import numpy as np
+import scipy.sparse.linalg as spla
+
+from ..spatialDiscretization import *
+#Crank Nicolson method solved matrix free with preconditioned GMRES
+
+class CNK:
+    def __init__(self, sp: SpatialDiscretization, fields, tol=1e-10, restart=50,
+                 preconditioned=True):
+        self.sp = sp
+        self.time = 0.0
+        self.tol = tol
+        self.restart = restart
+        self.preconditioned = preconditioned
+
+        self.A = sp.as_linear_operator()
+        self.N = self.A.shape[0]
+
+        self.dt = None
+        self.M = None
+        self.blocks = None
+
+        self.steps = 0
+        self.iterations = []
+        self.setupTime = 0.0
+        self.solveTime = 0.0
+
+    def buildPreconditioner(self, dt):
+        '''
+        Block Jacobi preconditioner with the inverses of the element
+        blocks of (I - dt/2 A), inverted all at once.
+        '''
+        if not self.preconditioned or not hasattr(self.sp, 'buildElementBlocks'):
+            return None
+
+        if self.blocks is None:
+            self.blocks = self.sp.buildElementBlocks()
+        K, n, _ = self.blocks.shape
+        Np = self.sp.number_of_nodes_per_element()
+        nFields = n // Np
+
+        P = np.eye(n) - 0.5*dt*self.blocks
+        Pinv = np.linalg.inv(P)
+
+        def apply(v):
+            v = v.reshape(nFields, K, Np).transpose(1, 0, 2).reshape(K, n)
+            w = np.einsum('kij,kj->ki', Pinv, v)
+            return w.reshape(K, nFields, Np).transpose(1, 0, 2).ravel()
+
+        return spla.LinearOperator((self.N, self.N), matvec=apply, dtype=float)
+
+    def step(self, fields, dt):
+        if dt != self.dt:
+            setupTime = time.perf_counter()
+            self.dt = dt
+            self.M = self.buildPreconditioner(dt)
+            self.setupTime += time.perf_counter() - setupTime
+
+        solveTime = time.perf_counter()
+        yo = self.sp.convertToVector(fields)
+        b = yo + 0.5*dt*self.A.matvec(yo)
+
+        lhs = spla.LinearOperator(
+            (self.N, self.N),
+            matvec=lambda v: v - 0.5*dt*self.A.matvec(v),
+            dtype=float
+        )
+        iterations = [0]
+        def count(_):
+            iterations[0] += 1
+
+        yp, info = spla.gmres(
+            lhs, b, x0=yo, rtol=self.tol, atol=0.0,
+            restart=self.restart, M=self.M,
+            callback=count, callback_type='pr_norm'
+        )
+        if info != 0:
+            raise ValueError("GMRES did not converge.")
+        self.solveTime += time.perf_counter() - solveTime
+
+        self.steps += 1
+        self.iterations.append(iterations[0])
+        self.time += dt
+
+        self.sp.copyVectorToFields(yp, fields)
+
+    def statistics(self):
+        return {
+            'steps': self.steps,
+            'iterations': int(np.sum(self.iterations)),
+            'iterationsPerStep': float(np.mean(self.iterations)) if self.steps else 0.0,
+            'setupTime': self.setupTime,
+            'solveTime': self.solveTime,
+        }
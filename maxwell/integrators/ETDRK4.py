@@ -0,0 +1,63 @@
+import numpy as np
+
+from ..spatialDiscretization import *
+#Exponential time differencing Runge Kutta 4 (Cox-Matthews)
+
+def etdCoefficients(z, dt, points=32):
+    '''
+    Coefficients of ETDRK4 for the diagonal linear part z = L*dt,
+    evaluated as mean values over a circle around z (Kassam-Trefethen) to
+    avoid cancellation when z is small.
+    '''
+    z = np.asarray(z, dtype=float)
+    r = z[..., None] + np.exp(1j*np.pi*(np.arange(points) + 0.5)/points*2.0)
+    er = np.exp(r)
+    Q = dt*np.mean((np.exp(r/2) - 1.0)/r, axis=-1).real
+    f1 = dt*np.mean((-4.0 - r + er*(4.0 - 3.0*r + r**2))/r**3, axis=-1).real
+    f2 = dt*np.mean((2.0 + r + er*(-2.0 + r))/r**3, axis=-1).real
+    f3 = dt*np.mean((-4.0 - 3.0*r - r**2 + er*(4.0 - r))/r**3, axis=-1).real
+    return np.exp(z/2), np.exp(z), Q, f1, f2, f3
+
+class ETDRK4:
+    '''
+    Exponential integrator for E' = -sigma/epsilon E + N(E, H), H' = N(E, H)
+    with N the lossless curl and flux terms, which are advanced explicitly.
+    The conductivity term is element-diagonal and is integrated exactly
+    through the ETD coefficients, so highly conductive elements do not
+    restrict the time step and the fields inside them relax to their
+    quasi-static values.
+    '''
+
+    def __init__(self, sp: SpatialDiscretization, fields):
+        self.sp = sp
+        self.time = 0.0
+        self.dt = None
+
+    def updateCoefficients(self, dt):
+        self.dt = dt
+        self.coefficients = {
+            'E': etdCoefficients(-dt*self.sp.conductivityRate(), dt),
+            'H': etdCoefficients(np.zeros(1), dt),
+        }
+
+    def N(self, fields):
+        return self.sp.computeRHS(fields, conductivity=False)
+
+    def step(self, fields, dt):
+        if dt != self.dt:
+            self.updateCoefficients(dt)
+        c = self.coefficients
+
+        Nu = self.N(fields)
+        a = {l: c[l][0]*f + c[l][2]*Nu[l] for l, f in fields.items()}
+        Na = self.N(a)
+        b = {l: c[l][0]*f + c[l][2]*Na[l] for l, f in fields.items()}
+        Nb = self.N(b)
+        cc = {l: c[l][0]*a[l] + c[l][2]*(2.0*Nb[l] - Nu[l]) for l in fields.keys()}
+        Nc = self.N(cc)
+
+        for l, f in fields.items():
+            _, e, _, f1, f2, f3 = c[l]
+            f[...] = e*f + f1*Nu[l] + 2.0*f2*(Na[l] + Nb[l]) + f3*Nc[l]
+
+        self.time += dt
@@ -0,0 +1,58 @@
+import copy
+import numpy as np
+
+from ..spatialDiscretization import *
+#Jameson type low storage Runge Kutta methods
+
+class JLSRK:
+    '''
+    Base class of the Jameson type low storage schemes
+        y_k = y_0 + ALPHA[k] dt f(y_{k-1}),   k = 1, ..., s
+    whose stability polynomial is
+        R(z) = 1 + ALPHA[s] z + ALPHA[s] ALPHA[s-1] z^2 + ...
+    Any polynomial with non zero coefficients is realized exactly for
+    linear autonomous problems, as the Maxwell semi-discretizations are.
+    Only a copy of the fields at the beginning of the step is stored.
+    '''
+    ALPHA = np.array([1.0])
+
+    def __init__(self, sp: SpatialDiscretization, fields):
+        self.sp = sp
+        self.time = 0.0
+        self.N_STAGES = len(self.ALPHA)
+
+        self.fieldsOld = copy.deepcopy(fields)
+
+    @classmethod
+    def fromStabilityPolynomial(cls, coefficients, name='JLSRK'):
+        '''
+        New JLSRK subclass with stability polynomial sum_j coefficients[j] z^j,
+        coefficients[0] must be 1.
+        '''
+        c = np.trim_zeros(np.asarray(coefficients, dtype=float), 'b')
+        if not np.isclose(c[0], 1.0) or np.any(c == 0.0):
+            raise ValueError("Coefficients can not be realized as a JLSRK scheme.")
+        alpha = (c[1:]/c[:-1])[::-1]
+        return type(name, (cls,), {'ALPHA': alpha, 'N_STAGES': len(alpha)})
+
+    def copyFields(self, target, source):
+        for l, f in source.items():
+            if isinstance(f, dict):
+                self.copyFields(target[l], f)
+            else:
+                target[l][...] = f
+
+    def updateStage(self, fields, fieldsOld, rhs, c):
+        for l, f in fields.items():
+            if isinstance(f, dict):
+                self.updateStage(f, fieldsOld[l], rhs[l], c)
+            else:
+                f[...] = fieldsOld[l] + c*rhs[l]
+
+    def step(self, fields, dt):
+        self.copyFields(self.fieldsOld, fields)
+        for a in self.ALPHA:
+            fieldsRHS = self.sp.computeRHS(fields)
+            self.updateStage(fields, self.fieldsOld, fieldsRHS, a*dt)
+
+        self.time += dt
@@ -9,22 +9,10 @@ class LF2:
         self.time = 0.0
 
     def step(self, fields, dt):
-        E = fields['E']
-        H = fields['H'] 
-        
-        if self.sp.dimension() == 1:
-            self.time += dt/2
-            E += dt * self.sp.computeRHSE(fields)
-            self.time += dt/2
-            H += dt * self.sp.computeRHSH(fields)
-        elif self.sp.dimension() == 2:
-            self.time += dt/2
-            rhsE = self.sp.computeRHSE(fields)
-            E['x'][:,:] += dt * rhsE['x'][:,:]
-            E['y'][:,:] += dt * rhsE['y'][:,:]
-            self.time += dt/2
-            H += dt * self.sp.computeRHSH(fields)
-        else:
-            raise ValueError("Invalid dimension")        
-        
-        
\ No newline at end of file
+        E = self.sp.getElectricFields(fields)
+        H = self.sp.getMagneticFields(fields)
+
+        self.time += dt/2
+        addScaledFields(E, self.sp.computeRHSE(fields), dt)
+        self.time += dt/2
+        addScaledFields(H, self.sp.computeRHSH(fields), dt)
@@ -9,8 +9,8 @@ class LF2V:
         self.time = 0.0
 
     def step(self, fields, dt):
-        E = fields['E']
-        H = fields['H']
+        E = self.sp.getElectricFields(fields)
+        H = self.sp.getMagneticFields(fields)
         
         # #Velocity Verlet
         # self.time += dt
@@ -23,11 +23,11 @@ class LF2V:
         
         #Position Verlet
         
-        E += 0.5*dt*self.sp.computeRHSE(fields)
+        addScaledFields(E, self.sp.computeRHSE(fields), 0.5*dt)
         
         self.time += dt
-        H += 0.5*dt*self.sp.computeRHSH(fields)
-        E += 0.5*dt*self.sp.computeRHSE(fields)
+        addScaledFields(H, self.sp.computeRHSH(fields), dt)
+        addScaledFields(E, self.sp.computeRHSE(fields), 0.5*dt)
         
         
         # #Verlet Algorithm
@@ -0,0 +1,9 @@
+import numpy as np
+
+from .PRK import *
+#Forest-Ruth / Yoshida fourth order triple jump composition of leapfrog
+
+class LF4(PRK):
+    W1 = 1.0/(2.0 - 2.0**(1/3))
+    W0 = -2.0**(1/3)/(2.0 - 2.0**(1/3))
+    A, B = PRK.fromComposition([W1, W0, W1])
@@ -0,0 +1,16 @@
+import numpy as np
+
+from .PRK import *
+#Blanes-Moan fourth order, six stage, symplectic partitioned Runge Kutta
+
+class LF4BM(PRK):
+    a1 = 0.0792036964311957
+    a2 = 0.353172906049774
+    a3 = -0.0420650803577195
+    a4 = 1.0 - 2.0*(a1 + a2 + a3)
+    b1 = 0.209515106613362
+    b2 = -0.143851773179818
+    b3 = 0.5 - b1 - b2
+
+    A = np.array([a1, a2, a3, a4, a3, a2, a1])
+    B = np.array([b1, b2, b3, b3, b2, b1])
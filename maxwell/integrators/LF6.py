@@ -0,0 +1,11 @@
+import numpy as np
+
+from .PRK import *
+#Yoshida sixth order composition of leapfrog (solution A)
+
+class LF6(PRK):
+    W1 = -1.17767998417887
+    W2 = 0.235573213359357
+    W3 = 0.784513610477560
+    W0 = 1.0 - 2.0*(W1 + W2 + W3)
+    A, B = PRK.fromComposition([W3, W2, W1, W0, W1, W2, W3])
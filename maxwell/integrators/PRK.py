@@ -0,0 +1,89 @@
+import numpy as np
+
+from ..spatialDiscretization import *
+#Symplectic partitioned Runge Kutta methods
+
+class PRK:
+    '''
+    Base class of the symplectic partitioned Runge-Kutta methods built as
+    compositions of leapfrog substeps
+        E += A[0] dt rhsE, H += B[0] dt rhsH, E += A[1] dt rhsE, ...
+        H += B[s-1] dt rhsH, E += A[s] dt rhsE
+    Consecutive electric half substeps are merged, so a step costs s
+    evaluations of computeRHSH and s+1 of computeRHSE.
+    TFSF sources of FD1D and FD2D advance their incident fields once per
+    leapfrog half step, so they are rejected.
+    '''
+    A = np.array([0.5, 0.5])
+    B = np.array([1.0])
+
+    def __init__(self, sp: SpatialDiscretization, fields):
+        self.sp = sp
+        self.time = 0.0
+        self.checkSources()
+
+    def checkSources(self):
+        if getattr(self.sp, 'tfsf', False):
+            raise ValueError("TFSF sources are only supported by LF2 and YEE.")
+
+    @classmethod
+    def fromComposition(cls, gamma):
+        ''' Coefficients of the composition of position Verlet substeps gamma. '''
+        gamma = np.asarray(gamma)
+        A = np.zeros(len(gamma) + 1)
+        A[:-1] += 0.5*gamma
+        A[1:] += 0.5*gamma
+        return A, gamma.copy()
+
+    def step(self, fields, dt):
+        self.checkSources()
+        E = self.sp.getElectricFields(fields)
+        H = self.sp.getMagneticFields(fields)
+
+        for a, b in zip(self.A[:-1], self.B):
+            addScaledFields(E, self.sp.computeRHSE(fields), a*dt)
+            addScaledFields(H, self.sp.computeRHSH(fields), b*dt)
+        addScaledFields(E, self.sp.computeRHSE(fields), self.A[-1]*dt)
+
+        self.time += dt
+
+    @classmethod
+    def stabilityLimit(cls, resolution=1e-3, iterations=40):
+        '''
+        Largest w such that the oscillator of frequency w, see
+        amplificationMatrix, is stable. Compositions can have instability
+        bands inside their outer stability boundary, so the imaginary axis
+        is scanned from the origin before refining the first unstable point.
+        '''
+        if '_stabilityLimit' in cls.__dict__:
+            return cls._stabilityLimit
+
+        def isStable(w):
+            return abs(np.trace(cls.amplificationMatrix(w))) <= 2.0
+
+        wLow = 0.0
+        while isStable(wLow + resolution):
+            wLow += resolution
+        wHigh = wLow + resolution
+        for _ in range(iterations):
+            wMid = 0.5*(wLow + wHigh)
+            if isStable(wMid):
+                wLow = wMid
+            else:
+                wHigh = wMid
+
+        cls._stabilityLimit = wLow
+        return wLow
+
+    @classmethod
+    def amplificationMatrix(cls, w):
+        '''
+        Matrix advancing (E, H) for the oscillator E' = w H, H' = -w E with
+        dt = 1, the model of a non dissipative mode of frequency w.
+        '''
+        G = np.eye(2)
+        for a, b in zip(cls.A[:-1], cls.B):
+            G = np.array([[1.0, a*w], [0.0, 1.0]]).dot(G)
+            G = np.array([[1.0, 0.0], [-b*w, 1.0]]).dot(G)
+        G = np.array([[1.0, cls.A[-1]*w], [0.0, 1.0]]).dot(G)
+        return G
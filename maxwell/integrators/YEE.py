@@ -0,0 +1,19 @@
+import numpy as np
+
+from ..spatialDiscretization import *
+
+class YEE:
+    '''
+    Leapfrog, as LF2, on the in place updateE/updateH of the FD
+    discretizations, which avoid the RHS temporaries.
+    '''
+
+    def __init__(self, sp: SpatialDiscretization, fields):
+        self.sp = sp
+        self.time = 0.0
+
+    def step(self, fields, dt):
+        self.time += dt/2
+        self.sp.updateE(fields, dt)
+        self.time += dt/2
+        self.sp.updateH(fields, dt)
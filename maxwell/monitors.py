@@ -0,0 +1,266 @@
+import numpy as np
+from scipy.special import hankel2
+
+
+def dft(x, frequencies, time):
+    '''
+    Discrete Fourier transform of a stored time series sampled at
+    arbitrary times:
+        X(f) = sum_n x[n] * exp(-2j*pi*f*time[n])
+    '''
+    x = np.asarray(x)
+    kernel = np.exp(-2j*np.pi*np.outer(frequencies, time))
+    return kernel.dot(x.reshape(len(time), -1)).reshape(
+        (len(frequencies),) + x.shape[1:]
+    )
+
+
+class DFTMonitor:
+    '''
+    Running DFT of a field, or of some of its values, at a fixed list of
+    frequencies. Accumulates
+        X(f) = sum_n x(t_n) * exp(-2j*pi*f*t_n)
+    as the simulation advances, with t_n the time after the n-th step.
+    The kernel is advanced with a precomputed phasor so no exponentials
+    are evaluated while stepping and no time history is stored.
+    '''
+
+    def __init__(self, frequencies, field='E', index=None):
+        '''
+        field: key of the monitored field in the driver fields. A tuple
+               of keys selects nested fields, e.g. ('E', 'x') in FD2D.
+        index: numpy index of the monitored values. None monitors the
+               whole field.
+        '''
+        self.frequencies = np.atleast_1d(np.asarray(frequencies, dtype=float))
+        if isinstance(field, str):
+            self.field = (field,)
+        else:
+            self.field = tuple(field)
+        self.index = index
+
+        self.time = 0.0
+        self.dt = None
+        self.phase = np.ones(self.frequencies.shape, dtype=complex)
+        self.phaseStep = None
+        self.accumulator = None
+
+    def sample(self, fields):
+        f = fields
+        for key in self.field:
+            f = f[key]
+        if self.index is None:
+            return f
+        return f[self.index]
+
+    def update(self, fields, dt):
+        if dt != self.dt:
+            self.dt = dt
+            self.phaseStep = np.exp(-2j*np.pi*self.frequencies*dt)
+
+        self.time += dt
+        self.phase *= self.phaseStep
+
+        x = np.asarray(self.sample(fields))
+        if self.accumulator is None:
+            self.accumulator = np.zeros(
+                self.frequencies.shape + x.shape, dtype=complex
+            )
+        phase = self.phase.reshape(self.phase.shape + (1,)*x.ndim)
+        self.accumulator += phase * x
+
+    def spectrum(self):
+        if self.accumulator is None:
+            raise ValueError("Monitor has not been updated.")
+        return self.accumulator.copy()
+
+    def reset(self):
+        self.time = 0.0
+        self.phase[:] = 1.0
+        self.accumulator = None
+
+
+class TimeMonitor:
+    '''
+    Records the time trace of a field, or of some of its values.
+    '''
+
+    def __init__(self, field='E', index=None):
+        if isinstance(field, str):
+            self.field = (field,)
+        else:
+            self.field = tuple(field)
+        self.index = index
+
+        self.time = 0.0
+        self.times = []
+        self.values = []
+
+    def update(self, fields, dt):
+        f = fields
+        for key in self.field:
+            f = f[key]
+        if self.index is not None:
+            f = f[self.index]
+
+        self.time += dt
+        self.times.append(self.time)
+        self.values.append(np.array(f, copy=True))
+
+    def trace(self):
+        return np.array(self.times), np.array(self.values)
+
+
+class NearToFarFieldMonitor:
+    '''
+    Near to far field transformation of FD2D TE fields. Running DFTs, as
+    in DFTMonitor, of the tangential E and of H on a rectangular contour
+    of E node lines around the sources or scatterers, averaging the H
+    cells on both sides. H is sampled half a time step after E, as
+    left by the leapfrog integrators. The contour stores no history.
+
+    With n the outward normal the equivalent currents are J = n x H and
+    M = -n x E. In units with c = 1 they radiate, for time dependence
+    exp(j w t) and k = 2 pi f,
+        Hz(r) = sum over the contour of
+            (-j k M G0(R) + (Jy (x - x') - Jx (y - y'))/R G0'(R)) dl,
+        G0(R) = H0(k R)/(4j),  G0'(R) = -k H1(k R)/(4j),
+    H0 and H1 being Hankel functions of the second kind. Far from the
+    contour Hz = P(phi) exp(-j k r)/sqrt(r) with the pattern
+        P(phi) = -sqrt(k/(8 pi)) exp(j pi/4) N(phi),
+        N(phi) = sum of (Jy cos(phi) - Jx sin(phi) + M) exp(j k r'.u) dl,
+    u = (cos(phi), sin(phi)). Spectra are sums over the samples, without
+    dt, as in DFTMonitor.
+    '''
+
+    def __init__(self, sp, frequencies, left, right, bottom, top):
+        '''
+        The contour sides are the E node lines nearest to left, right,
+        bottom and top, which must leave at least one cell to the grid
+        boundaries. The cells on both sides of the contour must be vacuum
+        and outside CPML layers.
+        '''
+        self.frequencies = np.atleast_1d(np.asarray(frequencies, dtype=float))
+        iL = np.abs(sp.x - left).argmin()
+        iR = np.abs(sp.x - right).argmin()
+        jB = np.abs(sp.y - bottom).argmin()
+        jT = np.abs(sp.y - top).argmin()
+        nx, ny = len(sp.dx), len(sp.dy)
+        if not (0 < iL < iR < nx and 0 < jB < jT < ny):
+            raise ValueError("Contour must lie strictly inside the grid.")
+
+        # Points on the left, right, bottom and top sides: position,
+        # length, H cells on both sides, E sample and current signs.
+        rows = np.arange(jB, jT)
+        cols = np.arange(iL, iR)
+        sides = [
+            (np.full(len(rows), sp.x[iL]), sp.yH[rows], sp.dy[rows],
+             (rows, iL - 1), (rows, iL), 'y', (rows, iL), (0.0, 1.0, 1.0)),
+            (np.full(len(rows), sp.x[iR]), sp.yH[rows], sp.dy[rows],
+             (rows, iR - 1), (rows, iR), 'y', (rows, iR), (0.0, -1.0, -1.0)),
+            (sp.xH[cols], np.full(len(cols), sp.y[jB]), sp.dx[cols],
+             (jB - 1, cols), (jB, cols), 'x', (jB, cols), (-1.0, 0.0, -1.0)),
+            (sp.xH[cols], np.full(len(cols), sp.y[jT]), sp.dx[cols],
+             (jT - 1, cols), (jT, cols), 'x', (jT, cols), (1.0, 0.0, 1.0)),
+        ]
+        self.xs = np.concatenate([s[0] for s in sides])
+        self.ys = np.concatenate([s[1] for s in sides])
+        self.lengths = np.concatenate([s[2] for s in sides])
+        shapeH = (ny, nx)
+        self._cellsA = np.concatenate([
+            np.ravel_multi_index(np.broadcast_arrays(*s[3]), shapeH) for s in sides])
+        self._cellsB = np.concatenate([
+            np.ravel_multi_index(np.broadcast_arrays(*s[4]), shapeH) for s in sides])
+        shapesE = {'x': (ny + 1, nx), 'y': (ny, nx + 1)}
+        self._nodesE = {
+            c: np.concatenate([
+                np.ravel_multi_index(np.broadcast_arrays(*s[6]), shapesE[c])
+                for s in sides if s[5] == c])
+            for c in ['y', 'x']
+        }
+        for layer in sp.cpmlLayers:
+            first, last = layer['H'][layer['axis']].indices(shapeH[layer['axis']])[:2]
+            lower, upper = (jB - 1, jT) if layer['axis'] == 0 else (iL - 1, iR)
+            if first <= upper and lower < last:
+                raise ValueError("Contour must lie outside CPML layers.")
+        cells = np.concatenate([self._cellsA, self._cellsB])
+        if np.any(sp.epsilon.take(cells) != 1.0) or np.any(sp.mu.take(cells) != 1.0) \
+                or np.any(sp.sigma.take(cells) != 0.0):
+            raise ValueError("Contour must lie in vacuum.")
+
+        signs = np.concatenate([
+            np.tile(s[7], (len(s[0]), 1)) for s in sides])
+        self.signJx, self.signJy, self.signM = signs.T
+
+        self.time = 0.0
+        self.dt = None
+        self.phase = np.ones(self.frequencies.shape, dtype=complex)
+        self.phaseStep = None
+        self.accumulatorE = np.zeros(self.frequencies.shape + self.xs.shape, dtype=complex)
+        self.accumulatorH = np.zeros(self.frequencies.shape + self.xs.shape, dtype=complex)
+
+    def update(self, fields, dt):
+        if dt != self.dt:
+            self.dt = dt
+            self.phaseStep = np.exp(-2j*np.pi*self.frequencies*dt)
+            self.halfStep = np.exp(-1j*np.pi*self.frequencies*dt)
+
+        self.time += dt
+        self.phase *= self.phaseStep
+
+        H = fields['H']
+        h = 0.5*(H.take(self._cellsA) + H.take(self._cellsB))
+        e = np.concatenate([
+            fields['E']['y'].take(self._nodesE['y']),
+            fields['E']['x'].take(self._nodesE['x']),
+        ])
+        self.accumulatorE += np.outer(self.phase, e)
+        self.accumulatorH += np.outer(self.phase*self.halfStep, h)
+
+    def currents(self):
+        '''
+        Spectra of Jx, Jy and M on the contour points.
+        '''
+        return (self.signJx*self.accumulatorH,
+                self.signJy*self.accumulatorH,
+                self.signM*self.accumulatorE)
+
+    def wavenumbers(self):
+        return 2*np.pi*self.frequencies
+
+    def farField(self, angles):
+        '''
+        Pattern P(phi), shaped (frequencies, angles), of the radiated Hz.
+        '''
+        angles = np.atleast_1d(angles)
+        Jx, Jy, M = self.currents()
+        k = self.wavenumbers()[:, None, None]
+        cos = np.cos(angles)[None, :, None]
+        sin = np.sin(angles)[None, :, None]
+        phase = np.exp(1j*k*(self.xs*cos + self.ys*sin))
+        integrand = Jy[:, None, :]*cos - Jx[:, None, :]*sin + M[:, None, :]
+        N = np.sum(integrand*phase*self.lengths, axis=-1)
+        return -np.sqrt(k[:, :, 0]/(8*np.pi))*np.exp(1j*np.pi/4)*N
+
+    def fieldAt(self, x, y):
+        '''
+        Spectrum of Hz radiated by the contour currents at the points
+        (x, y) outside the contour, shaped (frequencies, points).
+        '''
+        x = np.atleast_1d(x)[None, :, None]
+        y = np.atleast_1d(y)[None, :, None]
+        Jx, Jy, M = [c[:, None, :] for c in self.currents()]
+        k = self.wavenumbers()[:, None, None]
+        dx = x - self.xs
+        dy = y - self.ys
+        R = np.sqrt(dx**2 + dy**2)
+        G0 = hankel2(0, k*R)/4j
+        dG0 = -k*hankel2(1, k*R)/4j
+        integrand = -1j*k*M*G0 + (Jy*dx - Jx*dy)/R*dG0
+        return np.sum(integrand*self.lengths, axis=-1)
+
+    def reset(self):
+        self.time = 0.0
+        self.phase[:] = 1.0
+        self.accumulatorE[:] = 0.0
+        self.accumulatorH[:] = 0.0
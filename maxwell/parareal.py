@@ -0,0 +1,159 @@
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from .driver import *
+
+
+_worker = dict()
+
+
+def _initWorker(sp, timeIntegratorType, CFL):
+    _worker['sp'] = sp
+    _worker['timeIntegratorType'] = timeIntegratorType
+    _worker['CFL'] = CFL
+
+
+def _fineWorker(q, duration):
+    return propagate(
+        _worker['sp'], q, duration,
+        _worker['timeIntegratorType'], _worker['CFL']
+    )
+
+
+def propagate(sp, q, duration, timeIntegratorType='LSERK4', CFL=1.0):
+    '''
+    State vector q advanced by duration with a fresh MaxwellDriver. The
+    time step of the driver is reduced so that duration is an integer
+    number of steps. Returns the final state and the elapsed wall time.
+    '''
+    tic = time.perf_counter()
+    driver = MaxwellDriver(sp, timeIntegratorType=timeIntegratorType, CFL=CFL)
+    sp.copyVectorToFields(q, driver.fields)
+    steps = max(int(np.ceil(duration/driver.dt - 1e-12)), 1)
+    dt = duration/steps
+    for _ in range(steps):
+        driver.step(dt)
+    return sp.convertToVector(driver.fields), time.perf_counter() - tic
+
+
+class PararealDriver:
+    '''
+    Parareal time-parallel integration of a 1D discretization (DG1D or
+    FD1D) up to final_time, split into windows of equal duration.
+    Each iteration propagates every window with the fine MaxwellDriver
+    in parallel on a process pool and corrects the window initial states
+    with the serial coarse propagator,
+        U[n+1] = G(U[n]) + F(U_old[n]) - G(U_old[n]).
+    The coarse propagator uses the same discretization with a larger
+    time step, CFL = coarseCFL, and the coarse integrator.
+    Iterations stop when the relative change of the window states is
+    below tolerance. After as many iterations as windows the result
+    equals the serial fine run.
+
+    Discretizations with time dependent sources (FD1D TFSF) keep the
+    source time in their own state and are not supported.
+    '''
+
+    def __init__(self, sp, final_time, windows,
+                 timeIntegratorType='LSERK4', CFL=1.0,
+                 coarseIntegratorType='LSERK4', coarseCFL=None,
+                 tolerance=1e-8, maxIterations=None, processes=None):
+        if getattr(sp, 'source', None) is not None:
+            raise ValueError("Parareal does not support time dependent sources.")
+        if sp.get_mesh().dimension != 1:
+            raise ValueError("Parareal is only available for 1D discretizations.")
+
+        self.sp = sp
+        self.final_time = final_time
+        self.windows = windows
+        self.timeIntegratorType = timeIntegratorType
+        self.CFL = CFL
+        self.coarseIntegratorType = coarseIntegratorType
+        self.tolerance = tolerance
+        self.processes = processes
+        if maxIterations is None:
+            maxIterations = windows
+        self.maxIterations = maxIterations
+
+        # The coarse propagator takes the largest stable step by default.
+        if coarseCFL is None:
+            driver = MaxwellDriver(sp, timeIntegratorType=coarseIntegratorType)
+            coarseCFL = 0.95*driver.estimate_max_dt()/driver.dt
+        self.coarseCFL = coarseCFL
+
+        self.fields = sp.buildFields()
+        self.report = dict()
+
+    def __getitem__(self, key):
+        return self.fields[key]
+
+    def windowDuration(self):
+        return self.final_time/self.windows
+
+    def coarse(self, q):
+        return propagate(
+            self.sp, q, self.windowDuration(),
+            self.coarseIntegratorType, self.coarseCFL
+        )
+
+    def run(self):
+        '''
+        Advances self.fields to final_time. Returns the report with the
+        number of iterations, the last relative correction, wall times and
+        the speedup versus the serial fine run, whose time is estimated as
+        the sum of the fine window times of the first iteration.
+        '''
+        tic = time.perf_counter()
+        N = self.windows
+
+        U = [self.sp.convertToVector(self.fields)]
+        G = []
+        coarseTime = 0.0
+        for n in range(N):
+            g, elapsed = self.coarse(U[n])
+            G.append(g)
+            U.append(g.copy())
+            coarseTime += elapsed
+
+        serialTime = None
+        iterations = 0
+        correction = np.inf
+        with ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=_initWorker,
+            initargs=(self.sp, self.timeIntegratorType, self.CFL)
+        ) as executor:
+            while iterations < self.maxIterations and correction > self.tolerance:
+                # Windows before the iteration count are already exact.
+                k = iterations
+                fine = list(executor.map(
+                    _fineWorker, U[k:N], [self.windowDuration()]*(N - k)
+                ))
+                if serialTime is None:
+                    serialTime = sum(elapsed for _, elapsed in fine)
+                F = [None]*k + [f for f, _ in fine]
+
+                scale = max(max(np.max(np.abs(u)) for u in U), np.finfo(float).tiny)
+                correction = np.max(np.abs(F[k] - U[k+1]))/scale
+                U[k+1] = F[k]
+                for n in range(k + 1, N):
+                    g, elapsed = self.coarse(U[n])
+                    coarseTime += elapsed
+                    new = g + F[n] - G[n]
+                    G[n] = g
+                    correction = max(correction, np.max(np.abs(new - U[n+1]))/scale)
+                    U[n+1] = new
+                iterations += 1
+
+        self.sp.copyVectorToFields(U[N], self.fields)
+        wallTime = time.perf_counter() - tic
+        self.report = {
+            'iterations': iterations,
+            'correction': correction,
+            'wallTime': wallTime,
+            'coarseTime': coarseTime,
+            'serialTime': serialTime,
+            'speedup': serialTime/wallTime,
+        }
+        return self.report
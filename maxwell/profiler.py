@@ -0,0 +1,135 @@
+import json
+import time
+
+
+class Profiler:
+    '''
+    Opt-in per-phase timers. attach wraps the listed methods of an object
+    with timers stored as instance attributes, which shadow the class
+    methods; detach removes them. Nothing is wrapped while the profiler
+    is not attached, so disabled profiling costs nothing.
+
+    Phases nest: a phase time includes the phases it calls and its self
+    time excludes them. The self time of an integrator step is the
+    integrator bookkeeping, the rest being spent in computeRHS.
+    '''
+
+    def __init__(self):
+        self.counts = dict()
+        self.times = dict()
+        self.selfTimes = dict()
+        self.unknowns = 0
+        self.stepPhase = None
+        self._stack = []
+        self._attached = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.detach()
+
+    def _wrap(self, phase, method):
+        def timed(*args, **kwargs):
+            self._stack.append(0.0)
+            tic = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - tic
+                children = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += elapsed
+                self.counts[phase] = self.counts.get(phase, 0) + 1
+                self.times[phase] = self.times.get(phase, 0.0) + elapsed
+                self.selfTimes[phase] = \
+                    self.selfTimes.get(phase, 0.0) + elapsed - children
+        return timed
+
+    def attach(self, obj, phases=None, name=None):
+        '''
+        Times the methods of obj named in phases, by default the ones in
+        its PROFILED_PHASES. Phases are reported as name.method, name
+        defaulting to the class name.
+        '''
+        if phases is None:
+            phases = getattr(obj, 'PROFILED_PHASES', ())
+        if name is None:
+            name = type(obj).__name__
+        for method in phases:
+            if method in vars(obj):
+                raise ValueError(name + '.' + method + ' is already profiled.')
+            setattr(obj, method, self._wrap(name + '.' + method, getattr(obj, method)))
+            self._attached.append((obj, method))
+        return self
+
+    def attachDriver(self, driver):
+        '''
+        Times the steps of a MaxwellDriver, the steps of its integrator
+        and the phases of its spatial discretization.
+        '''
+        self.attach(driver.sp)
+        self.attach(driver.timeIntegrator, ('step',))
+        self.attach(driver, ('step',))
+        self.stepPhase = type(driver).__name__ + '.step'
+        self.unknowns = len(driver.sp.convertToVector(driver.fields))
+        return self
+
+    def detach(self):
+        for obj, method in reversed(self._attached):
+            delattr(obj, method)
+        self._attached = []
+
+    def reset(self):
+        self.counts.clear()
+        self.times.clear()
+        self.selfTimes.clear()
+
+    def steps(self):
+        return self.counts.get(self.stepPhase, 0)
+
+    def dofUpdatesPerSecond(self):
+        '''
+        Unknowns advanced per second of driver step time.
+        '''
+        elapsed = self.times.get(self.stepPhase, 0.0)
+        if elapsed == 0.0:
+            return 0.0
+        return self.steps()*self.unknowns/elapsed
+
+    def asDict(self):
+        return {
+            'phases': {
+                phase: {
+                    'count': self.counts[phase],
+                    'time': self.times[phase],
+                    'selfTime': self.selfTimes[phase],
+                }
+                for phase in self.counts
+            },
+            'steps': self.steps(),
+            'unknowns': self.unknowns,
+            'dofUpdatesPerSecond': self.dofUpdatesPerSecond(),
+        }
+
+    def toJSONLines(self, file=None):
+        '''
+        One JSON record per phase followed by a summary record. Returns
+        the lines and, if given a path or a file object, appends them.
+        '''
+        report = self.asDict()
+        records = [dict(phase=phase, **values)
+                   for phase, values in report['phases'].items()]
+        records.append({
+            'steps': report['steps'],
+            'unknowns': report['unknowns'],
+            'dofUpdatesPerSecond': report['dofUpdatesPerSecond'],
+        })
+        lines = ''.join(json.dumps(r) + '\n' for r in records)
+
+        if isinstance(file, str):
+            with open(file, 'a') as f:
+                f.write(lines)
+        elif file is not None:
+            file.write(lines)
+        return lines
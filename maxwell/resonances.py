@@ -0,0 +1,67 @@
+import numpy as np
+
+
+def matrixPencil(signal, dt, order=None, tolerance=1e-8, pencil=None):
+    '''
+    Harmonic inversion of a uniformly sampled trace with the matrix pencil
+    method. Fits
+        signal[n] = sum_m amplitudes[m] * exp(s_m * n * dt)
+    with s_m = -decayRates[m] + 2j*pi*frequencies[m].
+    order:     number of poles. If None, it is chosen from the singular
+               values larger than tolerance times the largest one.
+    pencil:    pencil parameter, defaults to a third of the samples.
+    Returns frequencies, decayRates and amplitudes sorted by frequency.
+    '''
+    y = np.asarray(signal)
+    N = len(y)
+    if pencil is None:
+        pencil = N // 3
+    if pencil < 1 or pencil >= N - 1:
+        raise ValueError("Invalid pencil parameter.")
+
+    rows = N - pencil
+    Y = np.array([y[i:i + pencil + 1] for i in range(rows)])
+
+    _, s, Vh = np.linalg.svd(Y, full_matrices=False)
+    if order is None:
+        order = int(np.sum(s > tolerance*s[0]))
+    order = max(1, min(order, pencil))
+
+    V = Vh[:order, :].conj().T
+    V1 = V[:-1, :]
+    V2 = V[1:, :]
+    z = np.linalg.eigvals(np.linalg.pinv(V1).dot(V2))
+
+    Z = np.power.outer(z, np.arange(N)).T
+    amplitudes = np.linalg.lstsq(Z, y, rcond=None)[0]
+
+    s_poles = np.log(z.astype(complex)) / dt
+    frequencies = np.imag(s_poles) / (2.0*np.pi)
+    decayRates = -np.real(s_poles)
+
+    sorting = np.argsort(frequencies)
+    return frequencies[sorting], decayRates[sorting], amplitudes[sorting]
+
+
+def extractResonances(times, values, order=None, tolerance=1e-8,
+                      minimumAmplitude=0.0):
+    '''
+    Resonances of a probe trace, e.g. the one recorded by a TimeMonitor.
+    Only poles with non-negative frequency and an amplitude larger than
+    minimumAmplitude are returned.
+    '''
+    times = np.asarray(times)
+    dt = times[1] - times[0]
+    if not np.allclose(np.diff(times), dt):
+        raise ValueError("Probe trace must be uniformly sampled.")
+
+    frequencies, decayRates, amplitudes = matrixPencil(
+        values, dt, order=order, tolerance=tolerance
+    )
+    # Refer amplitudes to t = 0 instead of to the first sample.
+    amplitudes = amplitudes * np.exp(
+        -(-decayRates + 2j*np.pi*frequencies)*times[0]
+    )
+
+    keep = (frequencies >= 0.0) & (np.abs(amplitudes) > minimumAmplitude)
+    return frequencies[keep], decayRates[keep], amplitudes[keep]
@@ -0,0 +1,174 @@
+import hashlib
+import numpy as np
+from collections import OrderedDict
+
+from .driver import *
+from .dg.dg1d import DG1D
+from .fd.fd1d import FD1D
+
+
+class SParameterExtractor:
+    '''
+    Extracts the complex S11 and S21 of a 1D device (DG1D or FD1D) from
+    time domain runs. A right travelling pulse is launched from the left
+    of the device. The device run and an incident-only normalization run
+    on the same mesh are stepped together and probed with DFT monitors:
+        - at the left port, where the reflected wave is the difference
+          between both runs,
+        - at the right port, where the device run only contains the
+          transmitted wave,
+        - at the left reference plane, where the normalization run gives
+          the incident wave.
+    Results are de-embedded to the reference planes, which default to the
+    port positions. Normalization spectra are cached and reused for the
+    same mesh, pulse, frequencies and time integration, keeping the last
+    NORMALIZATION_CACHE_SIZE of them.
+
+    Frequencies are given in units of speedOfLight per mesh length unit,
+    e.g. Hz with speedOfLight = 299792458 for meshes in meters.
+    '''
+
+    NORMALIZATION_CACHE_SIZE = 8
+    _normalizationCache = OrderedDict()
+
+    def __init__(self, sp, pulse, ports, frequencies, final_time,
+                 referencePlanes=None,
+                 timeIntegratorType='LSERK4', CFL=1.0, speedOfLight=1.0):
+        if not isinstance(sp, (DG1D, FD1D)):
+            raise ValueError("S-parameters can only be extracted from DG1D or FD1D.")
+
+        self.sp = sp
+        self.pulse = pulse
+        self.frequencies = np.asarray(frequencies, dtype=float)
+        self.final_time = final_time
+        self.timeIntegratorType = timeIntegratorType
+        self.CFL = CFL
+        self.speedOfLight = speedOfLight
+
+        if referencePlanes is None:
+            referencePlanes = ports
+
+        self.ports = [self.nodeIndex(x) for x in ports]
+        self.referencePlane = self.nodeIndex(referencePlanes[0])
+        self.referencePlanes = (
+            sp.x[self.referencePlane], referencePlanes[1]
+        )
+        if not self.referencePlanes[0] <= self.referencePlanes[1]:
+            raise ValueError("Reference planes must be ordered from left to right.")
+
+        self.s11 = None
+        self.s21 = None
+
+    def nodeIndex(self, x):
+        return np.unravel_index(
+            np.argmin(np.abs(self.sp.x - x)), self.sp.x.shape
+        )
+
+    def buildReference(self):
+        if isinstance(self.sp, DG1D):
+            return DG1D(self.sp.n_order, self.sp.mesh, self.sp.fluxType)
+        else:
+            return FD1D(self.sp.mesh, order=self.sp.order)
+
+    def initializePulse(self, driver):
+        sp = driver.sp
+        driver['E'][:] = self.pulse(sp.x)
+        if sp.isStaggered():
+            driver['H'][:] = self.pulse(sp.xH - 0.5*driver.dt)
+        else:
+            driver['H'][:] = self.pulse(sp.x)
+
+    def probeIndex(self, indices):
+        return tuple(np.array(i) for i in zip(*indices))
+
+    def normalizationKey(self, driver):
+        '''
+        Key of the normalization run, with the mesh, pulse samples and
+        frequencies hashed rather than copied.
+        '''
+        sp = self.sp
+        digest = hashlib.sha1()
+        for a in [sp.mesh.vx, driver['E'], driver['H'], self.frequencies]:
+            digest.update(np.ascontiguousarray(a).tobytes())
+        return (
+            type(sp).__name__,
+            getattr(sp, 'n_order', None),
+            getattr(sp, 'order', None),
+            getattr(sp, 'fluxType', None),
+            tuple(sorted(sp.mesh.boundary_label.items())),
+            digest.hexdigest(),
+            self.speedOfLight,
+            self.final_time,
+            self.timeIntegratorType,
+            self.CFL,
+            self.ports[0],
+            self.referencePlane,
+        )
+
+    def run(self):
+        freq = self.frequencies / self.speedOfLight
+
+        device = MaxwellDriver(self.sp, self.timeIntegratorType, self.CFL)
+        self.initializePulse(device)
+        steps = int(np.ceil(self.final_time/device.dt))
+
+        probes = self.probeIndex(self.ports)
+        deviceMonitor = device.addMonitor(DFTMonitor(freq, 'E', probes))
+
+        key = self.normalizationKey(device)
+        cached = key in self._normalizationCache
+        if not cached:
+            reference = MaxwellDriver(
+                self.buildReference(), self.timeIntegratorType, self.CFL
+            )
+            self.initializePulse(reference)
+            referenceMonitor = reference.addMonitor(DFTMonitor(
+                freq, 'E', self.probeIndex([self.ports[0], self.referencePlane])
+            ))
+
+        for _ in range(steps):
+            device.step()
+            if not cached:
+                reference.step()
+
+        cache = self._normalizationCache
+        if not cached:
+            cache[key] = referenceMonitor.spectrum()
+            while len(cache) > self.NORMALIZATION_CACHE_SIZE:
+                cache.popitem(last=False)
+        cache.move_to_end(key)
+        normalization = cache[key]
+
+        deviceSpectrum = deviceMonitor.spectrum()
+        reflected = deviceSpectrum[:, 0] - normalization[:, 0]
+        transmitted = deviceSpectrum[:, 1]
+        incident = normalization[:, 1]
+
+        k = 2.0*np.pi*freq
+        xL = self.sp.x[self.ports[0]]
+        xR = self.sp.x[self.ports[1]]
+        a, b = self.referencePlanes
+        self.s11 = reflected / incident * np.exp(1j*k*(a - xL))
+        self.s21 = transmitted / incident * np.exp(1j*k*(xR - b))
+
+        return self.s11, self.s21
+
+    def toNetwork(self, name=None):
+        '''
+        Builds a two-port skrf Network. The reverse parameters are filled
+        assuming a reciprocal and symmetric device.
+        '''
+        from skrf import Frequency, Network
+
+        if self.s11 is None:
+            self.run()
+
+        s = np.zeros((len(self.frequencies), 2, 2), dtype=complex)
+        s[:, 0, 0] = self.s11
+        s[:, 1, 0] = self.s21
+        s[:, 0, 1] = self.s21
+        s[:, 1, 1] = self.s11
+
+        return Network(
+            frequency=Frequency.from_f(self.frequencies, 'Hz'), s=s, name=name
+        )
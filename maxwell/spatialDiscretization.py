@@ -1,6 +1,21 @@
 import numpy as np
+import scipy.sparse.linalg as spla
+
+def addScaledFields(fields, rhs, c):
+    '''
+    fields += c * rhs, in place, for fields stored as arrays or as, possibly
+    nested, dicts. Only the entries present in rhs are updated.
+    '''
+    if isinstance(rhs, dict):
+        for l in rhs.keys():
+            addScaledFields(fields[l], rhs[l], c)
+    else:
+        fields += c * rhs
 
 class SpatialDiscretization():
+    # Methods timed by a Profiler attached to the discretization.
+    PROFILED_PHASES = ('computeRHS', 'computeRHSE', 'computeRHSH')
+
     def __init__(self, mesh):
         self.mesh = mesh
 
@@ -11,6 +26,13 @@ class SpatialDiscretization():
     
     def isStaggered(self):
         return False
+
+    def get_cfl_factor(self):
+        '''
+        Time step of staggered discretizations relative to the one of the
+        second order Yee stencil at the same CFL.
+        '''
+        return 1.0
     
     def dimension(self):
         return 1
@@ -36,3 +58,78 @@ class SpatialDiscretization():
     def number_of_unknowns(self):
         return len(self.buildStateVector())
 
+    def convertToVector(self, fields):
+        if isinstance(fields, dict):
+            return np.concatenate(
+                [self.convertToVector(f) for f in fields.values()]
+            )
+        return fields.ravel(order='F')
+
+    def copyVectorToFields(self, vec, fields):
+        offset = 0
+        for f in fields.values():
+            if isinstance(f, dict):
+                n = self.copyVectorToFields(vec[offset:], f)
+            else:
+                n = f.size
+                f[...] = vec[offset:offset+n].reshape(f.shape, order='F')
+            offset += n
+        return offset
+
+    def getElectricFields(self, fields):
+        '''
+        Electric part of fields, updated in place with computeRHSE.
+        '''
+        return fields['E']
+
+    def getMagneticFields(self, fields):
+        '''
+        Magnetic part of fields, updated in place with computeRHSH.
+        '''
+        return fields['H']
+
+    def operatorChanged(self):
+        '''
+        Marks the semi-discrete operator as changed, e.g. by new materials,
+        so that results cached for it are recomputed.
+        '''
+        self.operatorVersion = self.getOperatorVersion() + 1
+
+    def getOperatorVersion(self):
+        return getattr(self, 'operatorVersion', 0)
+
+    def hasAdjoint(self):
+        return False
+
+    def computeAdjointRHS(self, fields):
+        raise ValueError("Adjoint operator not available.")
+
+    def as_linear_operator(self):
+        '''
+        Matrix free view of the semi-discrete operator as a scipy
+        LinearOperator acting on vectors ordered as in convertToVector.
+        The transpose is available when hasAdjoint() is True.
+        '''
+        fields = self.buildFields()
+        N = len(self.convertToVector(fields))
+
+        def apply(computeRHS, v):
+            v = np.ravel(v)
+            self.copyVectorToFields(np.real(v), fields)
+            re = self.convertToVector(computeRHS(fields))
+            if np.iscomplexobj(v):
+                self.copyVectorToFields(np.imag(v), fields)
+                return re + 1j*self.convertToVector(computeRHS(fields))
+            return re
+
+        rmatvec = None
+        if self.hasAdjoint():
+            def rmatvec(v):
+                return apply(self.computeAdjointRHS, v)
+
+        return spla.LinearOperator(
+            (N, N),
+            matvec=lambda v: apply(self.computeRHS, v),
+            rmatvec=rmatvec,
+            dtype=float
+        )
@@ -0,0 +1,298 @@
+import weakref
+import numpy as np
+import scipy.sparse.linalg as spla
+from scipy.optimize import minimize
+from numpy.polynomial import Polynomial
+
+from .integrators.LSERK4 import *
+from .integrators.LSERK74 import *
+from .integrators.LSERK134 import *
+from .integrators.EULER import *
+from .integrators.LF2 import *
+from .integrators.LF2V import *
+from .integrators.IBE import *
+from .integrators.CN import *
+from .integrators.DIRK2 import *
+from .integrators.IGLRK4 import *
+from .integrators.AM2 import *
+from .integrators.CNK import *
+from .integrators.AB import *
+from .integrators.PRK import *
+from .integrators.JLSRK import *
+from .integrators.YEE import *
+
+# Integrators whose stability region contains the whole left half plane.
+UNCONDITIONALLY_STABLE = (IBE, CN, DIRK2, IGLRK4, CNK)
+
+# Integrators that leapfrog the E and H updates. They are stable for
+# spectra on the imaginary axis with |dt * lambda| <= 2.
+LEAPFROG = (LF2, LF2V, YEE)
+
+_cache = weakref.WeakKeyDictionary()
+
+
+def lowStorageStabilityPolynomial(A, B):
+    '''
+    Stability polynomial R(z) of a 2N-storage Runge-Kutta scheme, obtained
+    by applying its stages to y' = z*y with y(0) = 1 and dt = 1.
+    '''
+    y = Polynomial([1.0])
+    res = Polynomial([0.0])
+    z = Polynomial([0.0, 1.0])
+    for a, b in zip(A, B):
+        res = a*res + z*y
+        y = y + b*res
+    return y
+
+
+def stabilityPolynomial(integrator):
+    if integrator is EULER:
+        return Polynomial([1.0, 1.0])
+    if hasattr(integrator, 'ALPHA'):
+        y = Polynomial([1.0])
+        z = Polynomial([0.0, 1.0])
+        for a in integrator.ALPHA:
+            y = 1.0 + a*z*y
+        return y
+    if hasattr(integrator, 'A') and hasattr(integrator, 'B'):
+        return lowStorageStabilityPolynomial(integrator.A, integrator.B)
+    raise ValueError("Stability polynomial unknown for " + integrator.__name__)
+
+
+def isStable(integrator, z, tol=1e-8):
+    '''
+    True if all the dt-scaled eigenvalues z lie in the stability region.
+    '''
+    if integrator in UNCONDITIONALLY_STABLE:
+        return bool(np.all(np.real(z) <= tol))
+    if integrator in LEAPFROG:
+        return bool(np.all(np.abs(z) <= 2.0) and np.all(np.abs(np.real(z)) <= tol))
+    if issubclass(integrator, PRK):
+        return bool(np.all(np.abs(np.imag(z)) <= integrator.stabilityLimit()) and
+                    np.all(np.abs(np.real(z)) <= tol))
+    if hasattr(integrator, 'amplificationMatrix'):
+        rho = [np.max(np.abs(np.linalg.eigvals(integrator.amplificationMatrix(zi))))
+               for zi in np.atleast_1d(z)]
+        return bool(np.all(np.array(rho) <= 1.0 + tol))
+    R = stabilityPolynomial(integrator)
+    return bool(np.all(np.abs(R(z)) <= 1.0 + tol))
+
+
+def cacheOf(sp):
+    '''
+    Results cached for sp, dropped when its operator version changes.
+    '''
+    version = sp.getOperatorVersion()
+    if sp not in _cache or _cache[sp]['version'] != version:
+        _cache[sp] = {'version': version}
+    return _cache[sp]
+
+
+def estimateSpectrum(sp, k=20):
+    '''
+    Eigenvalues of largest magnitude of the semi-discrete operator,
+    computed matrix free with Arnoldi iterations on computeRHS. Small
+    operators are assembled and fully diagonalized instead.
+    '''
+    cache = cacheOf(sp)
+    if 'spectrum' in cache:
+        return cache['spectrum']
+
+    A = sp.as_linear_operator()
+    N = A.shape[0]
+    if N <= 2*k + 2:
+        eigs = np.linalg.eigvals(A.matmat(np.eye(N)))
+    else:
+        eigs = spla.eigs(A, k=k, which='LM', return_eigenvectors=False)
+
+    cache['spectrum'] = eigs
+    return eigs
+
+
+def maximumStableTimeStep(sp, integrator, tol=1e-8, iterations=60):
+    '''
+    Largest dt such that dt times the extreme eigenvalues of the
+    semi-discrete operator lie in the stability region of the integrator.
+    Returns np.inf for unconditionally stable integrators.
+    '''
+    cache = cacheOf(sp)
+    if integrator in cache:
+        return cache[integrator]
+
+    eigs = estimateSpectrum(sp)
+    if integrator in UNCONDITIONALLY_STABLE and isStable(integrator, eigs, tol):
+        cache[integrator] = np.inf
+        return np.inf
+
+    rho = np.max(np.abs(eigs))
+    if rho == 0.0:
+        cache[integrator] = np.inf
+        return np.inf
+
+    dtLow = 0.0
+    dtHigh = 1.0/rho
+    while isStable(integrator, dtHigh*eigs, tol):
+        dtLow = dtHigh
+        dtHigh *= 2.0
+    for _ in range(iterations):
+        dtMid = 0.5*(dtLow + dtHigh)
+        if isStable(integrator, dtMid*eigs, tol):
+            dtLow = dtMid
+        else:
+            dtHigh = dtMid
+
+    cache[integrator] = dtLow
+    return dtLow
+
+
+def spectrumFootprint(sp, maxDense=2000, k=100):
+    '''
+    Eigenvalues of the semi-discrete operator with non negative imaginary
+    part, the spectrum being symmetric. Operators with up to maxDense
+    unknowns are assembled and fully diagonalized, larger ones are
+    represented by the k eigenvalues of largest magnitude.
+    '''
+    A = sp.as_linear_operator()
+    N = A.shape[0]
+    if N <= maxDense:
+        eigs = np.linalg.eigvals(A.matmat(np.eye(N)))
+    else:
+        eigs = spla.eigs(A, k=min(k, N-2), which='LM', return_eigenvectors=False)
+    return eigs[np.imag(eigs) >= 0.0]
+
+
+def _taylorCoefficients(order):
+    return np.array([1.0/np.prod(np.arange(1, j+1)) for j in range(order + 1)])
+
+
+def _minimizeMaximumModulus(z, free0, order):
+    '''
+    Free coefficients, beyond the given order, of the polynomial matching
+    exp(z) up to that order with the smallest max |P(z)|. The problem is
+    convex; it is solved with SLSQP on |P(z)|^2 with the coefficients
+    scaled by the spectral radius to keep it well conditioned.
+    '''
+    scale = np.max(np.abs(z))
+    degrees = np.arange(order + 1, order + 1 + len(free0))
+    fixed = np.polynomial.polynomial.polyval(z, _taylorCoefficients(order))
+    powers = np.stack([(z/scale)**j for j in degrees], axis=-1)
+
+    def values(x):
+        return fixed + powers.dot(x)
+
+    def constraint(y):
+        return y[-1] - np.abs(values(y[:-1]))**2
+
+    def constraintJacobian(y):
+        dx = -2.0*np.real(np.conj(values(y[:-1]))[:, None]*powers)
+        return np.hstack([dx, np.ones((len(z), 1))])
+
+    x0 = free0*scale**degrees
+    y0 = np.append(x0, np.max(np.abs(values(x0)))**2)
+    res = minimize(
+        lambda y: y[-1], y0, jac=lambda y: np.eye(len(y))[-1],
+        constraints=[{'type': 'ineq', 'fun': constraint, 'jac': constraintJacobian}],
+        method='SLSQP', options={'maxiter': 200, 'ftol': 1e-14}
+    )
+    return res.x[:-1]/scale**degrees
+
+
+def _firstUnstableScaling(coefficients, z, tol, samples=1000):
+    '''
+    Smallest s in (0, 1] such that s*z leaves the stability region, None if
+    there is none. Optimized polynomials may have instability bands that
+    the eigenvalues avoid at the optimized dt but not at smaller ones.
+    Rays towards the extreme eigenvalues, where the bands are found, are
+    sampled more finely.
+    '''
+    first = None
+    for points, n in [(z, samples), (_extremeEigenvalues(z), 20*samples)]:
+        scalings = np.linspace(0.0, 1.0, n + 1)[1:]
+        R = np.polynomial.polynomial.polyval(np.outer(scalings, points), coefficients)
+        unstable = np.max(np.abs(R), axis=1) > 1.0 + tol
+        if np.any(unstable):
+            s = scalings[np.argmax(unstable)]
+            first = s if first is None else min(first, s)
+    return first
+
+
+def _extremeEigenvalues(eigs, sectors=32):
+    '''
+    Eigenvalue of largest modulus in each angular sector.
+    '''
+    sector = np.floor(np.angle(eigs)/np.pi*sectors).astype(int)
+    extreme = []
+    for k in np.unique(sector):
+        inSector = eigs[sector == k]
+        extreme.append(inSector[np.argmax(np.abs(inSector))])
+    return np.array(extreme)
+
+
+def _stablePolynomial(eigs, dt, order, free0, tol, cuts=50, samples=100):
+    '''
+    Coefficients of a polynomial, matching exp(z) up to the given order,
+    stable on dt'*eigs for every dt' <= dt, or None if none is found.
+    Rays towards the extreme eigenvalues are sampled from the start, and
+    scalings of the spectrum falling in instability bands are added as
+    constraints until there are none left.
+    '''
+    z = dt*eigs
+    scalings = np.linspace(0.0, 1.0, samples + 1)[1:]
+    points = np.concatenate([z, np.outer(scalings, dt*_extremeEigenvalues(eigs)).ravel()])
+    for _ in range(cuts):
+        free = _minimizeMaximumModulus(points, free0, order)
+        coefficients = np.concatenate([_taylorCoefficients(order), free])
+        R = np.polynomial.polynomial.polyval(points, coefficients)
+        if np.max(np.abs(R)) > 1.0 + tol:
+            return None
+        scaling = _firstUnstableScaling(coefficients, z, tol)
+        if scaling is None:
+            return coefficients
+        points = np.concatenate([points, scaling*z])
+        free0 = free
+    return None
+
+
+def optimizeStabilityPolynomial(eigs, stages, order, iterations=40, tol=1e-9):
+    '''
+    Coefficients of the polynomial of degree stages, matching exp(z) up to
+    the given order, with the largest dt such that dt'*eigs lies in its
+    stability region for all dt' <= dt. Bisection on dt of convex
+    feasibility problems. Returns the coefficients and that dt.
+    '''
+    if stages <= order:
+        raise ValueError("Number of stages must exceed the order.")
+    eigs = np.asarray(eigs)
+    rho = np.max(np.abs(eigs))
+
+    dtLow, best = 0.0, None
+    dtHigh = 2.0*stages**2/rho
+    free0 = np.zeros(stages - order)
+    for _ in range(iterations):
+        dtMid = 0.5*(dtLow + dtHigh)
+        coefficients = _stablePolynomial(eigs, dtMid, order, free0, tol)
+        if coefficients is None:
+            dtHigh = dtMid
+        else:
+            dtLow, best = dtMid, coefficients
+            free0 = coefficients[order + 1:]
+
+    if best is None:
+        raise ValueError("No stable polynomial found.")
+    return best, dtLow
+
+
+def optimizedLowStorageRK(sp, stages, order=4, name=None, **kwargs):
+    '''
+    JLSRK integrator whose stability polynomial is optimized for the
+    spectrum footprint of sp. Register it in the driver with
+    registerTimeIntegrator to use it by name.
+    '''
+    eigs = spectrumFootprint(sp)
+    coefficients, dt = optimizeStabilityPolynomial(eigs, stages, order, **kwargs)
+    if name is None:
+        name = 'JLSRK%d%d' % (stages, order)
+    integrator = JLSRK.fromStabilityPolynomial(coefficients, name)
+    integrator.COEFFICIENTS = coefficients
+    integrator.MAX_DT = dt
+    return integrator
@@ -0,0 +1,175 @@
+import time
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from .driver import *
+from .dg.mesh1d import Mesh1D
+from .dg.dg1d import DG1D
+from .fd.fd1d import FD1D
+
+
+# Leapfrogs storing H half a step ahead of E. LF2V and the PRK
+# compositions start and end their steps with E and H at the same time.
+HALF_STEP_H_INTEGRATORS = (LF2, YEE)
+
+
+class AnalyticProblem:
+    '''
+    1D problem with a known solution E(x, t), H(x, t) of
+        dE/dt = - dH/dx,   dH/dt = - dE/dx.
+    '''
+
+    def __init__(self, xmin, xmax, boundary_label, E, H, final_time):
+        self.xmin = xmin
+        self.xmax = xmax
+        self.boundary_label = boundary_label
+        self.E = E
+        self.H = H
+        self.final_time = final_time
+
+
+PROBLEMS = {
+    # Right travelling sine of unit wavelength, back to its initial
+    # position at t = 1.
+    'periodic': AnalyticProblem(
+        -1.0, 1.0, 'Periodic',
+        lambda x, t: np.sin(2*np.pi*(x - t)),
+        lambda x, t: np.sin(2*np.pi*(x - t)),
+        final_time=1.0
+    ),
+    # Fundamental mode of a PEC cavity.
+    'cavity': AnalyticProblem(
+        0.0, 1.0, 'PEC',
+        lambda x, t: np.sin(np.pi*x)*np.cos(np.pi*t),
+        lambda x, t: -np.cos(np.pi*x)*np.sin(np.pi*t),
+        final_time=1.0
+    ),
+}
+
+
+def buildDiscretization(problem, discretization, K, N=None, fluxType='Upwind'):
+    '''
+    N is the polynomial order of DG and the stencil order of FD, 2 by
+    default.
+    '''
+    mesh = Mesh1D(problem.xmin, problem.xmax, K, boundary_label=problem.boundary_label)
+    if discretization == 'DG':
+        return DG1D(N, mesh, fluxType)
+    if discretization == 'FD':
+        return FD1D(mesh, order=2 if N is None else N)
+    raise ValueError('Invalid discretization ' + str(discretization))
+
+
+def l2Error(sp, E, exact):
+    '''
+    L2 norm of E - exact over the domain: with the mass matrix in DG1D
+    and the trapezoidal rule on the E nodes of FD1D.
+    '''
+    error = E - exact
+    if isinstance(sp, DG1D):
+        return np.sqrt(sp.getEnergy(error))
+    e2 = error**2
+    return np.sqrt(np.sum(0.5*(e2[1:] + e2[:-1])*sp.dx))
+
+
+def runConfiguration(configuration):
+    '''
+    Runs the problem of a configuration dict, with keys problem,
+    discretization ('DG' or 'FD'), timeIntegratorType, CFL, N, K and
+    fluxType, up to its final time. The time step is reduced so that the
+    final time is reached exactly. Returns the configuration with the L2
+    error of E, the wall time of the time stepping, the number of steps
+    and of unknowns.
+    '''
+    c = configuration
+    problem = PROBLEMS[c['problem']]
+    sp = buildDiscretization(problem, c['discretization'], c['K'], c.get('N'),
+                             c.get('fluxType', 'Upwind'))
+    driver = MaxwellDriver(sp, timeIntegratorType=c['timeIntegratorType'], CFL=c['CFL'])
+
+    T = problem.final_time
+    steps = int(np.ceil(T/driver.dt - 1e-12))
+    dt = T/steps
+
+    if isinstance(driver.timeIntegrator, HALF_STEP_H_INTEGRATORS):
+        tH = 0.5*dt
+    else:
+        tH = 0.0
+    xH = sp.xH if sp.isStaggered() else sp.x
+    driver['E'][:] = problem.E(sp.x, 0.0)
+    driver['H'][:] = problem.H(xH, tH)
+
+    tic = time.perf_counter()
+    with np.errstate(all='ignore'):
+        for _ in range(steps):
+            driver.step(dt)
+    wallTime = time.perf_counter() - tic
+
+    with np.errstate(all='ignore'):
+        error = l2Error(sp, driver['E'], problem.E(sp.x, T))
+    if not np.isfinite(error):
+        error = np.inf
+
+    result = dict(configuration)
+    result.update({
+        'error': float(error),
+        'wallTime': wallTime,
+        'steps': steps,
+        'unknowns': len(sp.convertToVector(driver.fields)),
+    })
+    return result
+
+
+def configurationGrid(problem='periodic', discretizations=('DG',),
+                      integrators=('LSERK4',), CFLs=(1.0,),
+                      orders=(1, 2, 3), elements=(10, 20, 40),
+                      fluxType='Upwind'):
+    '''
+    All combinations of the given parameters. Orders only apply to DG.
+    '''
+    grid = []
+    for d, name, CFL, K in itertools.product(discretizations, integrators, CFLs, elements):
+        for N in (orders if d == 'DG' else (None,)):
+            grid.append({
+                'problem': problem, 'discretization': d,
+                'timeIntegratorType': name, 'CFL': CFL,
+                'N': N, 'K': K, 'fluxType': fluxType
+            })
+    return grid
+
+
+def workPrecision(configurations, processes=None):
+    '''
+    Runs the configurations on a process pool, or serially with
+    processes = 1. Wall times are measured within each run, concurrent
+    runs share the machine so use processes = 1 for reference timings.
+    '''
+    if processes == 1:
+        return [runConfiguration(c) for c in configurations]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(runConfiguration, configurations))
+
+
+def paretoFront(results):
+    '''
+    Results not dominated by another one both in wall time and in error,
+    sorted by increasing wall time.
+    '''
+    front = []
+    for r in sorted(results, key=lambda r: (r['wallTime'], r['error'])):
+        if not np.isfinite(r['error']):
+            continue
+        if not front or r['error'] < front[-1]['error']:
+            front.append(r)
+    return front
+
+
+def cheapestConfiguration(results, tolerance):
+    '''
+    Fastest result with an error below tolerance, None if there is none.
+    '''
+    accurate = [r for r in results if r['error'] <= tolerance]
+    if not accurate:
+        return None
+    return min(accurate, key=lambda r: r['wallTime'])
@@ -18,18 +18,6 @@ from skrf import Frequency
 from skrf.media import Freespace
 
 
-
-def dft(x,freq,time):
-    X=[]
-    for f in range(len(freq)):
-        summatory=0.
-        for t in range(len(time)):
-            summatory=summatory + x[t] * np.exp(-2j*np.pi*freq[f]*time[t])
-        X.append(summatory)
-    return X
-
-
-
 def test_TFG_ep50_rho1_slab_1cm():
 
     # Material distribution
@@ -73,30 +61,20 @@ def test_TFG_ep50_rho1_slab_1cm():
     # Driver operates
     driver['E'][:] = initialFieldE[:]
     driver['H'][:] = initialFieldH[:]
-    E_vector_R = []
-    E_vector_T = []
-    E_vector_0 = []
 
     # DFT calculations
-    time_vector_coeffs = np.linspace(0.0, final_time, steps)
-
-    driver['E'][:] = initialFieldE[:]
-    driver['H'][:] = initialFieldH[:]
+    monitor_R = driver.addMonitor(DFTMonitor(freq_vector/299792458, 'E', (3, 5)))
+    monitor_T = driver.addMonitor(DFTMonitor(freq_vector/299792458, 'E', (3, 60)))
 
     for _ in range(steps):
         driver.step()
-        E_vector_R.append(driver['E'][3][5])
-        E_vector_T.append(driver['E'][3][60])
-
-    for t in time_vector_coeffs:
-        E_vector_0.append(np.exp(-(t-x0)**2.0/(2.0*s0**2.0)))
-
 
-    time_vector_coeffs_corrected = time_vector_coeffs / 299792458
+    time_vector = driver.dt*np.arange(1, steps+1)
+    E_vector_0 = np.exp(-(time_vector-x0)**2.0/(2.0*s0**2.0))
 
-    dft_E_R=dft(E_vector_R,freq_vector,time_vector_coeffs_corrected)
-    dft_E_T=dft(E_vector_T,freq_vector,time_vector_coeffs_corrected)
-    dft_0=dft(E_vector_0,freq_vector,time_vector_coeffs_corrected)
+    dft_E_R = monitor_R.spectrum()
+    dft_E_T = monitor_T.spectrum()
+    dft_0 = dft(E_vector_0, freq_vector, time_vector/299792458)
 
     # Transmission and reflection coefficients
     T = np.abs(dft_E_T) / np.abs(dft_0)
@@ -178,30 +156,20 @@ def test_TFG_ep20_rho5_slab_1cm():
     # Driver operates
     driver['E'][:] = initialFieldE[:]
     driver['H'][:] = initialFieldH[:]
-    E_vector_R = []
-    E_vector_T = []
-    E_vector_0 = []
 
     # DFT calculations
-    time_vector_coeffs = np.linspace(0.0, final_time, steps)
+    monitor_R = driver.addMonitor(DFTMonitor(freq_vector/299792458, 'E', (3, 5)))
+    monitor_T = driver.addMonitor(DFTMonitor(freq_vector/299792458, 'E', (3, 60)))
 
-    driver['E'][:] = initialFieldE[:]
-    driver['H'][:] = initialFieldH[:]
-    
     for _ in range(steps):
         driver.step()
-        E_vector_R.append(driver['E'][3][5])
-        E_vector_T.append(driver['E'][3][60])
 
-    for t in time_vector_coeffs:
-        E_vector_0.append(np.exp(-(t-x0)**2.0/(2.0*s0**2.0)))
+    time_vector = driver.dt*np.arange(1, steps+1)
+    E_vector_0 = np.exp(-(time_vector-x0)**2.0/(2.0*s0**2.0))
 
-
-    time_vector_coeffs_corrected = time_vector_coeffs / 299792458
-
-    dft_E_R=dft(E_vector_R,freq_vector,time_vector_coeffs_corrected)
-    dft_E_T=dft(E_vector_T,freq_vector,time_vector_coeffs_corrected)
-    dft_0=dft(E_vector_0,freq_vector,time_vector_coeffs_corrected)
+    dft_E_R = monitor_R.spectrum()
+    dft_E_T = monitor_T.spectrum()
+    dft_0 = dft(E_vector_0, freq_vector, time_vector/299792458)
 
     # Transmission and reflection coefficients
     T = np.abs(dft_E_T) / np.abs(dft_0)
@@ -282,30 +250,20 @@ def test_TFG_ep20_rho5_slab_6cm():
     # Driver operates
     driver['E'][:] = initialFieldE[:]
     driver['H'][:] = initialFieldH[:]
-    E_vector_R = []
-    E_vector_T = []
-    E_vector_0 = []
 
     # DFT calculations
-    time_vector_coeffs = np.linspace(0.0, final_time, steps)
+    monitor_R = driver.addMonitor(DFTMonitor(freq_vector/299792458, 'E', (3, 5)))
+    monitor_T = driver.addMonitor(DFTMonitor(freq_vector/299792458, 'E', (3, 60)))
 
-    driver['E'][:] = initialFieldE[:]
-    driver['H'][:] = initialFieldH[:]
-    
     for _ in range(steps):
         driver.step()
-        E_vector_R.append(driver['E'][3][5])
-        E_vector_T.append(driver['E'][3][60])
-
-    for t in time_vector_coeffs:
-        E_vector_0.append(np.exp(-(t-x0)**2.0/(2.0*s0**2.0)))
 
+    time_vector = driver.dt*np.arange(1, steps+1)
+    E_vector_0 = np.exp(-(time_vector-x0)**2.0/(2.0*s0**2.0))
 
-    time_vector_coeffs_corrected = time_vector_coeffs / 299792458
-
-    dft_E_R=dft(E_vector_R,freq_vector,time_vector_coeffs_corrected)
-    dft_E_T=dft(E_vector_T,freq_vector,time_vector_coeffs_corrected)
-    dft_0=dft(E_vector_0,freq_vector,time_vector_coeffs_corrected)
+    dft_E_R = monitor_R.spectrum()
+    dft_E_T = monitor_T.spectrum()
+    dft_0 = dft(E_vector_0, freq_vector, time_vector/299792458)
 
     # Transmission and reflection coefficients
     T = np.abs(dft_E_T) / np.abs(dft_0)
@@ -386,30 +344,20 @@ def test_TFG_ep6_rho8_slab_6cm():
     # Driver operates
     driver['E'][:] = initialFieldE[:]
     driver['H'][:] = initialFieldH[:]
-    E_vector_R = []
-    E_vector_T = []
-    E_vector_0 = []
 
     # DFT calculations
-    time_vector_coeffs = np.linspace(0.0, final_time, steps)
+    monitor_R = driver.addMonitor(DFTMonitor(freq_vector/299792458, 'E', (3, 5)))
+    monitor_T = driver.addMonitor(DFTMonitor(freq_vector/299792458, 'E', (3, 60)))
 
-    driver['E'][:] = initialFieldE[:]
-    driver['H'][:] = initialFieldH[:]
-    
     for _ in range(steps):
         driver.step()
-        E_vector_R.append(driver['E'][3][5])
-        E_vector_T.append(driver['E'][3][60])
-
-    for t in time_vector_coeffs:
-        E_vector_0.append(np.exp(-(t-x0)**2.0/(2.0*s0**2.0)))
-
 
-    time_vector_coeffs_corrected = time_vector_coeffs / 299792458
+    time_vector = driver.dt*np.arange(1, steps+1)
+    E_vector_0 = np.exp(-(time_vector-x0)**2.0/(2.0*s0**2.0))
 
-    dft_E_R=dft(E_vector_R,freq_vector,time_vector_coeffs_corrected)
-    dft_E_T=dft(E_vector_T,freq_vector,time_vector_coeffs_corrected)
-    dft_0=dft(E_vector_0,freq_vector,time_vector_coeffs_corrected)
+    dft_E_R = monitor_R.spectrum()
+    dft_E_T = monitor_T.spectrum()
+    dft_0 = dft(E_vector_0, freq_vector, time_vector/299792458)
 
     # Transmission and reflection coefficients
     T = np.abs(dft_E_T) / np.abs(dft_0)
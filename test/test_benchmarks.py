@@ -0,0 +1,37 @@
+import json
+
+from benchmarks.run_benchmarks import *
+
+
+def test_compare_with_baseline_flags_regressions():
+    baseline = {'results': [
+        {'name': 'a', 'seconds': 1.0},
+        {'name': 'b', 'seconds': 1.0},
+        {'name': 'c', 'seconds': 1.0},
+    ]}
+    results = {'results': [
+        {'name': 'a', 'seconds': 1.1},
+        {'name': 'b', 'seconds': 1.5},
+        {'name': 'c', 'seconds': None},
+        {'name': 'd', 'seconds': 9.0},
+    ]}
+
+    comparison, regressions = compareWithBaseline(results, baseline, threshold=0.2)
+
+    assert [name for name, _ in comparison] == ['a', 'b']
+    assert regressions == [('b', 1.5)]
+
+
+def test_benchmarks_quick_run_and_baseline(tmp_path):
+    output = str(tmp_path / 'results.json')
+    baseline = str(tmp_path / 'baseline.json')
+    args = ['--quick', '--groups', 'fd-update', '--output', output, '--baseline', baseline]
+
+    assert main(args + ['--save-baseline']) == 0
+    with open(output) as f:
+        results = json.load(f)
+    names = [r['name'] for r in results['results']]
+    assert names == ['update/FD1D/K=100', 'update/FD2D/K=20']
+    assert all(r['seconds'] > 0.0 for r in results['results'])
+
+    assert main(args + ['--threshold', '1e6']) == 0
@@ -0,0 +1,98 @@
+import numpy as np
+
+from maxwell.driver import *
+from maxwell.dg.mesh1d import *
+from maxwell.dg.dg1d import *
+from maxwell.dg.mesh2d import *
+from maxwell.dg.dg2d import *
+
+TEST_DATA_FOLDER = 'testData/'
+
+
+def resonant_cavity_ez_field(x, y, t):
+    w = np.pi * np.sqrt(2)
+    return np.sin(np.pi*x)*np.sin(np.pi*y)*np.cos(w*t)
+
+
+def test_element_blocks_match_evolution_operator():
+    sp = Maxwell2D(2, readFromGambitFile(TEST_DATA_FOLDER + 'Maxwell2D_K8.neu'), 'Upwind')
+    A = sp.buildEvolutionOperator()
+    blocks = sp.buildElementBlocks()
+
+    Np = sp.number_of_nodes_per_element()
+    K = sp.mesh.number_of_elements()
+    for k in range(K):
+        idx = np.concatenate([f*Np*K + k*Np + np.arange(Np) for f in range(3)])
+        assert np.allclose(blocks[k], A[np.ix_(idx, idx)])
+
+    EToE, _ = sp.mesh.connectivityMatrices()
+    colors = sp.colorElements()
+    for k in range(K):
+        neighbors = EToE[k][EToE[k] != k]
+        assert np.all(colors[neighbors] != colors[k])
+
+
+def test_cnk_step_equals_crank_nicolson():
+    sp = Maxwell2D(2, readFromGambitFile(TEST_DATA_FOLDER + 'Maxwell2D_K8.neu'), 'Centered')
+    driver = MaxwellDriver(sp, timeIntegratorType='CNK', CFL=5)
+    driver['Ez'][:] = np.random.default_rng(0).random(driver['Ez'].shape)
+    q0 = sp.convertToVector(driver.fields)
+
+    driver.step()
+
+    A = sp.buildEvolutionOperator()
+    I = np.eye(A.shape[0])
+    expected = np.linalg.solve(I - 0.5*driver.dt*A, (I + 0.5*driver.dt*A).dot(q0))
+    assert np.allclose(sp.convertToVector(driver.fields), expected, atol=1e-8)
+
+
+def test_cnk_dg1d_without_element_blocks():
+    sp = DG1D(2, Mesh1D(-1.0, 1.0, 10, boundary_label='PEC'), 'Upwind')
+    driver = MaxwellDriver(sp, timeIntegratorType='CNK', CFL=3)
+    driver['E'][:] = np.exp(-sp.x**2/(2*0.25**2))
+    q0 = sp.convertToVector(driver.fields)
+
+    driver.step()
+
+    A = sp.buildEvolutionOperator()
+    I = np.eye(A.shape[0])
+    expected = np.linalg.solve(I - 0.5*driver.dt*A, (I + 0.5*driver.dt*A).dot(q0))
+    assert np.allclose(sp.convertToVector(driver.fields), expected, atol=1e-8)
+
+
+def test_block_jacobi_preconditioner_inverts_element_blocks():
+    sp = Maxwell2D(2, readFromGambitFile(TEST_DATA_FOLDER + 'Maxwell2D_K8.neu'), 'Upwind')
+    driver = MaxwellDriver(sp, timeIntegratorType='CNK', CFL=2)
+    M = driver.timeIntegrator.buildPreconditioner(driver.dt)
+
+    A = sp.buildEvolutionOperator()
+    Np = sp.number_of_nodes_per_element()
+    K = sp.mesh.number_of_elements()
+    D = np.zeros(A.shape)
+    for k in range(K):
+        idx = np.concatenate([f*Np*K + k*Np + np.arange(Np) for f in range(3)])
+        D[np.ix_(idx, idx)] = A[np.ix_(idx, idx)]
+
+    P = np.eye(A.shape[0]) - 0.5*driver.dt*D
+    v = np.random.default_rng(1).random(A.shape[0])
+    assert np.allclose(M.matvec(P.dot(v)), v)
+
+
+def test_cnk_pec_cavity_large_time_step():
+    sp = Maxwell2D(2, readFromGambitFile(TEST_DATA_FOLDER + 'Maxwell2D_K146.neu'), 'Centered')
+
+    for preconditioned in [True, False]:
+        driver = MaxwellDriver(sp, CFL=4)
+        driver.timeIntegrator = CNK(sp, driver.fields, preconditioned=preconditioned)
+        driver['Ez'][:] = resonant_cavity_ez_field(sp.x, sp.y, 0)
+
+        driver.run_until(0.5)
+
+        ez_expected = resonant_cavity_ez_field(sp.x, sp.y, driver.timeIntegrator.time)
+        R = np.corrcoef(ez_expected.ravel(), driver['Ez'].ravel())
+        assert R[0, 1] > 0.999
+
+        stats = driver.timeIntegrator.statistics()
+        assert stats['steps'] == len(driver.timeIntegrator.iterations)
+        assert stats['iterationsPerStep'] > 0
+        assert stats['solveTime'] > 0
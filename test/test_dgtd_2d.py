@@ -39,4 +39,38 @@ def test_pec():
 
     ez_expected = resonant_cavity_ez_field(sp.x, sp.y, driver.timeIntegrator.time)
     R = np.corrcoef(ez_expected, driver['Ez'])
-    assert R[0,1] > 0.9
\ No newline at end of file
+    assert R[0,1] > 0.9
+
+def test_split_rhs():
+    for fluxType in ['Centered', 'Upwind']:
+        sp = Maxwell2D(2, readFromGambitFile(TEST_DATA_FOLDER + 'Maxwell2D_K8.neu'), fluxType)
+        fields = sp.buildFields()
+        rng = np.random.default_rng(0)
+        for f in fields.values():
+            f[:] = rng.random(f.shape)
+
+        rhs = sp.computeRHS(fields)
+        rhsE = sp.computeRHSE(fields)
+        rhsH = sp.computeRHSH(fields)
+
+        assert list(rhsE.keys()) == ['Ez']
+        assert np.allclose(rhsE['Ez'], rhs['Ez'])
+        assert np.allclose(rhsH['Hx'], rhs['Hx'])
+        assert np.allclose(rhsH['Hy'], rhs['Hy'])
+
+
+def test_pec_leapfrog():
+    msh = readFromGambitFile(TEST_DATA_FOLDER + 'Maxwell2D_K146.neu')
+    sp = Maxwell2D(2, msh, 'Centered')
+
+    for integrator in ['LF2', 'LF2V']:
+        driver = MaxwellDriver(sp, timeIntegratorType=integrator, CFL=0.6)
+        assert driver.dt < driver.estimate_max_dt()
+        driver['Ez'][:] = resonant_cavity_ez_field(sp.x, sp.y, 0)
+
+        for _ in range(60):
+            driver.step()
+
+        ez_expected = resonant_cavity_ez_field(sp.x, sp.y, driver.timeIntegrator.time)
+        R = np.corrcoef(ez_expected.ravel(), driver['Ez'].ravel())
+        assert R[0, 1] > 0.999
@@ -0,0 +1,83 @@
+import numpy as np
+
+from maxwell.driver import *
+from maxwell.dg.mesh1d import *
+from maxwell.dg.dg1d import *
+
+
+def conductive_slab(sigma=1e4):
+    K = 50
+    sigmas = np.zeros(K)
+    sigmas[24:26] = sigma
+    return DG1D(2, Mesh1D(0.0, 1.0, K, boundary_label='SMA'), 'Upwind', sigma=sigmas)
+
+
+def test_etd_coefficients_limits():
+    dt = 0.1
+    _, e, Q, f1, f2, f3 = etdCoefficients(np.array([0.0, -1e-8]), dt)
+    assert np.allclose(e, 1.0)
+    assert np.allclose(Q, dt/2)
+    assert np.allclose([f1, f2, f3], dt/6)
+
+    z = -60.0
+    _, e, Q, f1, f2, f3 = etdCoefficients(np.array([z]), dt)
+    assert np.isclose(Q[0], dt*(np.exp(z/2) - 1)/z)
+    assert np.isclose(f1[0], dt*(-4 - z + np.exp(z)*(4 - 3*z + z**2))/z**3)
+
+
+def test_etdrk4_lossless_equals_rk4():
+    sp = DG1D(2, Mesh1D(-1.0, 1.0, 10, boundary_label='PEC'), 'Upwind')
+    driver = MaxwellDriver(sp, timeIntegratorType='ETDRK4')
+    driver['E'][:] = np.exp(-sp.x**2/(2*0.25**2))
+    q0 = sp.convertToVector(driver.fields)
+
+    driver.step()
+
+    A = driver.dt*sp.buildEvolutionOperator()
+    expected = q0.copy()
+    term = q0.copy()
+    for j in range(1, 5):
+        term = A.dot(term)/j
+        expected += term
+    assert np.allclose(sp.convertToVector(driver.fields), expected)
+
+
+def test_etdrk4_exact_decay():
+    sigma = 50.0
+    sp = DG1D(2, Mesh1D(-1.0, 1.0, 10, boundary_label='Periodic'), 'Upwind',
+              sigma=sigma*np.ones(10))
+    driver = MaxwellDriver(sp, timeIntegratorType='ETDRK4')
+    driver['E'][:] = 1.0
+
+    for _ in range(10):
+        driver.step()
+
+    assert np.allclose(driver['E'], np.exp(-sigma*10*driver.dt))
+    assert np.allclose(driver['H'], 0.0)
+
+
+def test_etdrk4_conductive_slab_at_lossless_cfl():
+    sp = conductive_slab()
+    initialField = np.exp(-(sp.x - 0.25)**2/(2*0.05**2))
+    final_time = 0.5
+
+    reference = MaxwellDriver(sp)
+    reference['E'][:] = initialField
+    reference['H'][:] = initialField
+    steps = 10000
+    for _ in range(steps):
+        reference.step(final_time/steps)
+
+    for integrator in ['ETDRK4', 'LSERK4']:
+        driver = MaxwellDriver(sp, timeIntegratorType=integrator, CFL=0.8)
+        driver['E'][:] = initialField
+        driver['H'][:] = initialField
+        steps = int(np.ceil(final_time/driver.dt))
+        for _ in range(steps):
+            driver.step(final_time/steps)
+
+        error = np.max(np.abs(driver['E'] - reference['E']))
+        if integrator == 'ETDRK4':
+            assert error < 1e-3
+        else:
+            assert not error < 1e-3
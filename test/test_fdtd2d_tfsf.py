@@ -1,6 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
+import pytest
 
 from maxwell.dg.mesh2d import *
 from maxwell.dg.dg2d import *
@@ -25,3 +26,136 @@ def plot(sp, driver):
         plt.cla()
         
 #······················································
+
+def tfsfSetup(direction, source):
+    return {
+        "left": -0.5, "right": 0.5, "bottom": -0.4, "top": 0.6,
+        "direction": direction, "source": source,
+    }
+
+
+def test_fdtd2d_tfsf_null_scattered_field():
+    source = lambda s: np.exp(-(s + 1.6)**2/(2*0.1**2))
+    for direction in ["+x", "-x", "+y", "-y"]:
+        for integrator in ["LF2", "YEE"]:
+            sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=60)
+            sp.TFSF_conditions(tfsfSetup(direction, source))
+            driver = MaxwellDriver(sp, timeIntegratorType=integrator)
+            xH, yH = np.meshgrid(sp.xH, sp.yH)
+            inside = (np.abs(xH) < 0.5) & (yH > -0.4) & (yH < 0.6)
+
+            peak = 0.0
+            for _ in range(200):
+                driver.step()
+                H = driver['H']
+                incidentH = np.broadcast_to(sp.incidentFields()[2], H.shape)
+                assert np.allclose(H[inside], incidentH[inside], atol=1e-9)
+                assert np.allclose(H[~inside], 0.0, atol=1e-9)
+                peak = max(peak, np.max(np.abs(H)))
+            assert peak > 0.99
+
+
+def test_fdtd2d_tfsf_plane_wave():
+    source = gaussian(0.1)
+    for direction, sign in [("+x", 1.0), ("-y", -1.0)]:
+        sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=100)
+        setup = tfsfSetup(direction, lambda s: source(s + 1.5))
+        sp.TFSF_conditions(setup)
+        driver = MaxwellDriver(sp, timeIntegratorType='YEE', CFL=0.9)
+        final_time = 1.5
+        steps = int(np.ceil(final_time/driver.dt))
+        for _ in range(steps):
+            driver.step(final_time/steps)
+
+        xH, yH = np.meshgrid(sp.xH, sp.yH)
+        s = sign*(xH if direction[1] == "x" else yH)
+        # H lags E by half a time step.
+        expected = source(s + 1.5 - final_time - 0.5*final_time/steps)
+        inside = (np.abs(xH) < 0.45) & (yH > -0.35) & (yH < 0.55)
+        assert np.allclose(driver['H'][inside], expected[inside], atol=0.03)
+        outside = (np.abs(xH) > 0.5) | (yH < -0.4) | (yH > 0.6)
+        assert np.allclose(driver['H'][outside], 0.0, atol=1e-9)
+
+
+def test_fdtd2d_tfsf_shortened_step():
+    source = lambda s: np.exp(-(s + 1.6)**2/(2*0.1**2))
+    for integrator in ["LF2", "YEE"]:
+        sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=60)
+        sp.TFSF_conditions(tfsfSetup("+x", source))
+        driver = MaxwellDriver(sp, timeIntegratorType=integrator)
+        xH, yH = np.meshgrid(sp.xH, sp.yH)
+        outside = (np.abs(xH) > 0.5) | (yH < -0.4) | (yH > 0.6)
+
+        peak = 0.0
+        for _ in range(200):
+            driver.step(0.9*driver.dt)
+            assert np.allclose(driver['H'][outside], 0.0, atol=1e-9)
+            peak = max(peak, np.max(np.abs(driver['H'])))
+        assert peak > 0.99
+
+
+def test_fdtd2d_tfsf_unsupported_integrators():
+    sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=20)
+    sp.TFSF_conditions(tfsfSetup("+x", gaussian(0.1)))
+    for integrator in ["LF2V", "LSERK4"]:
+        with pytest.raises(ValueError):
+            MaxwellDriver(sp, timeIntegratorType=integrator)
+
+
+def test_fdtd2d_tfsf_dielectric_scatterer():
+    K = 60
+    sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=K, boundary_labels="CPML")
+    xC, yC = np.meshgrid(sp.xH, sp.yH)
+    epsilon = np.where((np.abs(xC) < 0.15) & (np.abs(yC) < 0.15), 4.0, 1.0)
+    sp.setMaterials(epsilon=epsilon)
+    sp.TFSF_conditions(tfsfSetup("+x", lambda s: np.exp(-(s + 1.2)**2/(2*0.1**2))))
+    driver = MaxwellDriver(sp, timeIntegratorType='YEE')
+
+    xH, yH = np.meshgrid(sp.xH, sp.yH)
+    outside = (np.abs(xH) > 0.5) | (yH < -0.4) | (yH > 0.6)
+    scattered = 0.0
+    for _ in range(150):
+        driver.step()
+        scattered = max(scattered, np.max(np.abs(driver['H'][outside])))
+    assert scattered > 0.05
+
+
+def test_fdtd2d_tfsf_invalid():
+    source = gaussian(0.1)
+    sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=20)
+    with pytest.raises(ValueError):
+        sp.TFSF_conditions({"left": -0.5, "right": 0.5, "source": source})
+    with pytest.raises(ValueError):
+        sp.TFSF_conditions(tfsfSetup("+z", source))
+    with pytest.raises(ValueError):
+        sp.TFSF_conditions(dict(tfsfSetup("+x", source), left=-1.0))
+    with pytest.raises(ValueError):
+        FD2D(x_min=-1.0, x_max=1.0, kx_elem=20, order=4).TFSF_conditions(tfsfSetup("+x", source))
+
+    sp.TFSF_conditions(tfsfSetup("+x", source))
+    driver = MaxwellDriver(sp, timeIntegratorType='YEE')
+    with pytest.raises(ValueError):
+        sp.stepTiled(driver.fields, driver.dt, 2)
+
+
+def test_fdtd2d_tfsf_sides_in_vacuum():
+    source = gaussian(0.1)
+    sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=20)
+    xC, yC = np.meshgrid(sp.xH, sp.yH)
+
+    # Material across the left side, fully inside and across the right side.
+    for region, valid in [(np.abs(xC + 0.5) < 0.1, False),
+                          ((np.abs(xC) < 0.2) & (np.abs(yC) < 0.2), True),
+                          (np.abs(xC - 0.5) < 0.1, False)]:
+        for name, value in [("epsilon", 4.0), ("mu", 2.0), ("sigma", 1.0)]:
+            default = 0.0 if name == "sigma" else 1.0
+            sp.setMaterials(**{name: np.where(region, value, default)})
+            if valid:
+                sp.TFSF_conditions(tfsfSetup("+x", source))
+            else:
+                with pytest.raises(ValueError):
+                    sp.TFSF_conditions(tfsfSetup("+x", source))
+
+    cpml = FD2D(x_min=-1.0, x_max=1.0, kx_elem=20, boundary_labels="CPML", thickness=6)
+    with pytest.raises(ValueError):
+        cpml.TFSF_conditions(tfsfSetup("+x", source))
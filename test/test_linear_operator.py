@@ -0,0 +1,93 @@
+import numpy as np
+import scipy.sparse.linalg as spla
+from scipy.linalg import expm
+
+from maxwell.driver import *
+from maxwell.dg.mesh1d import *
+from maxwell.dg.dg1d import *
+from maxwell.fd.fd1d import *
+from maxwell.fd.fd2d import *
+from maxwell.dg.mesh2d import *
+from maxwell.dg.dg2d import *
+
+TEST_DATA_FOLDER = 'testData/'
+
+
+def test_dg1d_linear_operator_equals_evolution_operator():
+    epsilons = np.ones(6)
+    epsilons[2:4] = 2.0
+    sigmas = np.zeros(6)
+    sigmas[4] = 1.5
+    sp = DG1D(2, Mesh1D(0.0, 1.0, 6, boundary_label='PEC'), "Upwind",
+              epsilon=epsilons, sigma=sigmas)
+    A = sp.buildEvolutionOperator()
+    op = sp.as_linear_operator()
+    q = np.random.default_rng(0).random(A.shape[0])
+
+    assert op.shape == A.shape
+    assert np.allclose(op.matvec(q), A.dot(q))
+    assert np.allclose(op.rmatvec(q), A.T.dot(q))
+
+
+def test_dg1d_adjoint_boundaries():
+    for label in ["PEC", "PMC", "SMA", "Periodic"]:
+        for fluxType in ["Centered", "Upwind"]:
+            sp = DG1D(2, Mesh1D(0.0, 1.0, 5, boundary_label=label), fluxType)
+            assert sp.hasAdjoint()
+
+            A = sp.buildEvolutionOperator()
+            q = np.random.default_rng(1).random(A.shape[0])
+            assert np.allclose(sp.as_linear_operator().rmatvec(q), A.T.dot(q))
+
+
+def test_maxwell2d_linear_operator_equals_evolution_operator():
+    for fluxType in ["Centered", "Upwind"]:
+        sp = Maxwell2D(2, readFromGambitFile(TEST_DATA_FOLDER + 'Maxwell2D_K8.neu'), fluxType)
+        A = sp.buildEvolutionOperator()
+        op = sp.as_linear_operator()
+        q = np.random.default_rng(2).random(A.shape[0])
+
+        assert np.allclose(op.matvec(q), A.dot(q))
+        assert np.allclose(op.rmatvec(q), A.T.dot(q))
+
+
+def test_fd1d_linear_operator():
+    sp = FD1D(Mesh1D(0.0, 1.0, 10, boundary_label='PEC'))
+    op = sp.as_linear_operator()
+
+    fields = sp.buildFields()
+    rng = np.random.default_rng(3)
+    fields['E'][1:-1] = rng.random(fields['E'].size - 2)
+    fields['H'][:] = rng.random(fields['H'].size)
+    q = sp.convertToVector(fields)
+
+    expected = sp.convertToVector(sp.computeRHS(fields))
+    assert np.allclose(op.matvec(q), expected)
+    assert not sp.hasAdjoint()
+
+
+def test_fd2d_linear_operator_eigenvalues():
+    sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=20)
+    MaxwellDriver(sp, timeIntegratorType='LF2')
+    op = sp.as_linear_operator()
+
+    fields = sp.buildFields()
+    fields['H'][:, :] = np.random.default_rng(4).random(fields['H'].shape)
+    q = sp.convertToVector(fields)
+    assert np.allclose(op.matvec(q), sp.convertToVector(sp.computeRHS(fields)))
+
+    # PEC cavity resonances are on the imaginary axis.
+    eigs = spla.eigs(op, k=6, which='LM', return_eigenvectors=False)
+    assert np.allclose(np.real(eigs), 0.0, atol=1e-8)
+
+
+def test_expm_multiply_matches_dense_exponential():
+    sp = DG1D(2, Mesh1D(-1.0, 1.0, 8, boundary_label='Periodic'), "Centered")
+    fields = sp.buildFields()
+    fields['E'][:] = np.exp(-sp.x**2/(2*0.25**2))
+    q0 = sp.convertToVector(fields)
+
+    q = spla.expm_multiply(sp.as_linear_operator(), q0, start=0.0, stop=0.5,
+                           num=2, endpoint=True)[-1]
+
+    assert np.allclose(q, expm(0.5*sp.buildEvolutionOperator()).dot(q0))
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from maxwell.driver import *
+from maxwell.dg.mesh1d import *
+from maxwell.dg.dg1d import *
+from maxwell.fd.fd1d import *
+from maxwell.fd.fd2d import *
+
+
+def test_dft_equals_fft():
+    x = np.exp(-np.linspace(-5, 5, 100)**2/(2*0.5**2))
+    N = len(x)
+    freq = np.arange(N)/N
+    time = np.arange(N)
+
+    assert np.allclose(dft(x, freq, time), np.fft.fft(x))
+
+
+def test_dft_monitor_equals_stored_dft():
+    sp = DG1D(
+        n_order=2,
+        mesh=Mesh1D(-1.0, 1.0, 10, boundary_label="PEC"),
+    )
+    driver = MaxwellDriver(sp)
+    driver['E'][:] = np.exp(-sp.x**2/(2*0.25**2))
+
+    freq = np.linspace(0.1, 2.0, 15)
+    point = driver.addMonitor(DFTMonitor(freq, 'E', (1, 3)))
+    whole = driver.addMonitor(DFTMonitor(freq, 'H'))
+
+    E_history = []
+    H_history = []
+    for _ in range(200):
+        driver.step()
+        E_history.append(driver['E'][1, 3])
+        H_history.append(driver['H'].copy())
+    time = driver.dt*np.arange(1, 201)
+
+    assert np.allclose(point.spectrum(), dft(E_history, freq, time))
+    assert np.allclose(whole.spectrum(), dft(np.array(H_history), freq, time))
+    assert whole.spectrum().shape == (len(freq),) + driver['H'].shape
+
+
+def test_dft_monitor_nested_field():
+    sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=20)
+    driver = MaxwellDriver(sp, timeIntegratorType='LF2')
+    xH, yH = np.meshgrid(sp.xH, sp.yH)
+    driver['H'][:, :] = np.exp(-(xH**2 + yH**2)/(2*0.25**2))
+
+    freq = np.array([0.5, 1.0])
+    monitor = driver.addMonitor(DFTMonitor(freq, ('E', 'x'), (5, 10)))
+
+    Ex_history = []
+    for _ in range(50):
+        driver.step()
+        Ex_history.append(driver['E']['x'][5, 10])
+    time = driver.dt*np.arange(1, 51)
+
+    assert np.allclose(monitor.spectrum(), dft(Ex_history, freq, time))
+
+
+def test_near_to_far_field_monitor_matches_direct_dft():
+    sp = FD2D(x_min=-1.5, x_max=1.5, kx_elem=150, boundary_labels="CPML")
+    driver = MaxwellDriver(sp, timeIntegratorType='YEE')
+    xH, yH = np.meshgrid(sp.xH, sp.yH)
+    driver['H'][:, :] = np.exp(-((xH - 0.1)**2 + (yH + 0.05)**2)/(2*0.05**2))
+
+    freq = np.array([0.5, 1.0, 2.0])
+    ntff = driver.addMonitor(NearToFarFieldMonitor(sp, freq, -0.4, 0.4, -0.4, 0.4))
+    j, i = np.abs(sp.yH - 0.3).argmin(), np.abs(sp.xH - 1.0).argmin()
+    point = driver.addMonitor(DFTMonitor(freq, 'H', (j, i)))
+    driver.run_until(5.0)
+
+    # The point monitor samples H half a step after its time stamps.
+    direct = point.spectrum()*np.exp(-1j*np.pi*freq*driver.dt)
+    assert np.allclose(ntff.fieldAt(sp.xH[i], sp.yH[j])[:, 0], direct, rtol=2e-2)
+
+    angles = np.linspace(0.0, 2*np.pi, 9)
+    R = 300.0
+    far = ntff.farField(angles)*np.exp(-2j*np.pi*freq[:, None]*R)/np.sqrt(R)
+    assert np.allclose(far, ntff.fieldAt(R*np.cos(angles), R*np.sin(angles)), rtol=1e-3)
+
+    # Nearly isotropic pattern of a nearly centered pulse.
+    pattern = np.abs(ntff.farField(angles))
+    assert np.allclose(pattern, pattern.mean(axis=1, keepdims=True), rtol=2e-2)
+
+
+def test_near_to_far_field_monitor_source_outside_contour():
+    sp = FD2D(x_min=-1.5, x_max=1.5, kx_elem=100, boundary_labels="CPML")
+    driver = MaxwellDriver(sp, timeIntegratorType='YEE')
+    xH, yH = np.meshgrid(sp.xH, sp.yH)
+    driver['H'][:, :] = np.exp(-((xH - 0.8)**2 + yH**2)/(2*0.06**2))
+
+    ntff = driver.addMonitor(
+        NearToFarFieldMonitor(sp, [0.5, 1.0], -0.4, 0.4, -0.4, 0.4))
+    driver.run_until(5.0)
+
+    assert np.abs(ntff.accumulatorH).max() > 0.1
+    assert np.abs(ntff.farField(np.linspace(0.0, 2*np.pi, 8))).max() < 1e-2
+
+
+def test_near_to_far_field_monitor_invalid_contour():
+    sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=20)
+    with pytest.raises(ValueError):
+        NearToFarFieldMonitor(sp, [1.0], -1.0, 0.5, -0.5, 0.5)
+    with pytest.raises(ValueError):
+        NearToFarFieldMonitor(sp, [1.0], 0.5, -0.5, -0.5, 0.5)
+
+    xH, yH = np.meshgrid(sp.xH, sp.yH)
+    sp.setMaterials(epsilon=np.where((np.abs(xH) < 0.55) & (np.abs(yH) < 0.3), 4.0, 1.0))
+    with pytest.raises(ValueError):
+        NearToFarFieldMonitor(sp, [1.0], -0.5, 0.5, -0.5, 0.5)
+    NearToFarFieldMonitor(sp, [1.0], -0.7, 0.7, -0.5, 0.5)
+
+    sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=40,
+              boundary_labels={"XL": "PEC", "XU": "PEC", "YL": "PEC", "YU": "CPML"})
+    with pytest.raises(ValueError):
+        NearToFarFieldMonitor(sp, [1.0], -0.5, 0.5, -0.5, 0.55)
+    NearToFarFieldMonitor(sp, [1.0], -0.5, 0.5, -0.5, 0.4)
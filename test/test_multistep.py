@@ -0,0 +1,88 @@
+import numpy as np
+
+from maxwell.driver import *
+from maxwell.dg.mesh1d import *
+from maxwell.dg.dg1d import *
+from maxwell.fd.fd1d import *
+
+
+def gaussian_pulse_errors(integrator, cfls, final_time=1.0):
+    sp = DG1D(3, Mesh1D(-1.0, 1.0, 10, boundary_label='PEC'), 'Upwind')
+    initialField = np.exp(-sp.x**2/(2*0.25**2))
+
+    reference = MaxwellDriver(sp, CFL=0.05)
+    reference['E'][:] = initialField
+    for _ in range(2000):
+        reference.step(final_time/2000)
+
+    errors = []
+    for cfl in cfls:
+        driver = MaxwellDriver(sp, timeIntegratorType=integrator, CFL=cfl)
+        driver['E'][:] = initialField
+        steps = int(np.round(final_time/driver.dt))
+        for _ in range(steps):
+            driver.step(final_time/steps)
+        errors.append(np.max(np.abs(driver['E'] - reference['E'])))
+    return np.array(errors), driver.timeIntegrator.evaluations/steps
+
+
+def test_adams_bashforth_convergence_order():
+    for integrator, order in [('AB2', 2), ('AB3', 3), ('ABM3', 3)]:
+        errors, _ = gaussian_pulse_errors(integrator, [0.05, 0.025])
+        assert np.log2(errors[0]/errors[1]) > order - 0.3
+
+
+def test_adams_bashforth_rhs_evaluations_per_step():
+    _, evaluationsAB3 = gaussian_pulse_errors('AB3', [0.025])
+    _, evaluationsABM3 = gaussian_pulse_errors('ABM3', [0.025])
+
+    assert evaluationsAB3 < 1.02
+    assert evaluationsABM3 < 2.02
+
+
+def test_ring_buffer_holds_last_evaluations():
+    sp = DG1D(2, Mesh1D(-1.0, 1.0, 5, boundary_label='Periodic'), 'Centered')
+    driver = MaxwellDriver(sp, timeIntegratorType='AB3')
+    driver['E'][:] = np.exp(-sp.x**2/(2*0.25**2))
+    integrator = driver.timeIntegrator
+
+    rhs = []
+    for _ in range(5):
+        rhs.append(sp.convertToVector(sp.computeRHS(driver.fields)))
+        driver.step()
+
+    assert integrator.history.shape[0] == 3
+    for j in range(3):
+        f = integrator.history[(integrator.head - j) % 3]
+        assert np.allclose(f, rhs[-1-j])
+
+
+def test_adams_bashforth_restarts_when_dt_changes():
+    sp = FD1D(Mesh1D(-1.0, 1.0, 50, boundary_label='PEC'))
+    driver = MaxwellDriver(sp, timeIntegratorType='AB2', CFL=0.2)
+    driver['E'][:] = np.exp(-sp.x**2/(2*0.25**2))
+
+    for _ in range(4):
+        driver.step()
+    assert driver.timeIntegrator.count == 2
+
+    driver.step(0.5*driver.dt)
+    assert driver.timeIntegrator.count == 1
+
+
+def test_adams_bashforth_estimated_max_dt():
+    sp = DG1D(2, Mesh1D(-1.0, 1.0, 10, boundary_label='PEC'), 'Upwind')
+    initialField = np.exp(-sp.x**2/(2*0.25**2))
+    dt = MaxwellDriver(sp, timeIntegratorType='AB3').estimate_max_dt()
+
+    driver = MaxwellDriver(sp, timeIntegratorType='AB3')
+    driver['E'][:] = initialField
+    for _ in range(2000):
+        driver.step(0.95*dt)
+    assert np.max(np.abs(driver['E'])) < 1.0
+
+    driver = MaxwellDriver(sp, timeIntegratorType='AB3')
+    driver['E'][:] = initialField
+    for _ in range(2000):
+        driver.step(1.2*dt)
+    assert not np.max(np.abs(driver['E'])) < 1.0
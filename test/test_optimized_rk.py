@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from scipy.linalg import expm
+
+from maxwell.driver import *
+from maxwell.dg.mesh1d import *
+from maxwell.dg.dg1d import *
+
+
+def small_dg1d(fluxType):
+    return DG1D(2, Mesh1D(-1.0, 1.0, 10, boundary_label="Periodic"), fluxType)
+
+
+def maximum_dt(R, eigs):
+    ''' Largest dt with R stable on dt'*eigs for all dt' <= dt. '''
+    scalings = np.linspace(0.0, 1.0, 4001)[1:]
+    dtLow, dtHigh = 0.0, 10.0
+    for _ in range(50):
+        dt = 0.5*(dtLow + dtHigh)
+        if np.max(np.abs(R(np.outer(scalings, dt*eigs)))) <= 1.0 + 1e-8:
+            dtLow = dt
+        else:
+            dtHigh = dt
+    return dtLow
+
+
+def test_jlsrk_realizes_stability_polynomial():
+    coefficients = [1.0, 1.0, 0.5, 1/6, 1/24, 0.003, 1e-4]
+    integrator = JLSRK.fromStabilityPolynomial(coefficients)
+
+    assert integrator.N_STAGES == 6
+    assert np.allclose(stabilityPolynomial(integrator).coef, coefficients)
+
+    with pytest.raises(ValueError):
+        JLSRK.fromStabilityPolynomial([1.0, 1.0, 0.0, 0.1])
+
+
+def test_jlsrk_step_is_exact_for_linear_problems():
+    sp = small_dg1d("Upwind")
+    integrator = JLSRK.fromStabilityPolynomial([1.0, 1.0, 0.5, 1/6, 1/24, 0.003])
+    driver = MaxwellDriver(sp)
+    driver.timeIntegrator = integrator(sp, driver.fields)
+    driver['E'][:] = np.exp(-sp.x**2/(2*0.25**2))
+    q0 = sp.convertToVector(driver.fields)
+
+    driver.step()
+
+    A = driver.dt*sp.buildEvolutionOperator()
+    R = stabilityPolynomial(integrator)
+    expected = sum(c*np.linalg.matrix_power(A, j).dot(q0) for j, c in enumerate(R.coef))
+    assert np.allclose(sp.convertToVector(driver.fields), expected)
+
+
+def test_optimized_polynomial_increases_dt_per_stage():
+    for fluxType in ["Upwind", "Centered"]:
+        sp = small_dg1d(fluxType)
+        eigs = np.linalg.eigvals(sp.buildEvolutionOperator())
+
+        integrator = optimizedLowStorageRK(sp, stages=7, order=4)
+        dtPerStage = maximum_dt(stabilityPolynomial(integrator), eigs)/integrator.N_STAGES
+        dtPerStageLSERK4 = maximum_dt(stabilityPolynomial(LSERK4), eigs)/LSERK4.N_STAGES
+
+        assert maximum_dt(stabilityPolynomial(integrator), eigs) >= \
+            (1.0 - 1e-6)*integrator.MAX_DT
+        assert dtPerStage > 1.1*dtPerStageLSERK4
+
+
+@pytest.fixture
+def registered_optimized_integrator():
+    sp = small_dg1d("Upwind")
+    integrator = registerTimeIntegrator(
+        'JLSRK74_UPWIND', optimizedLowStorageRK(sp, stages=7, order=4)
+    )
+    yield sp, integrator
+    TIME_INTEGRATORS.pop('JLSRK74_UPWIND')
+
+
+def test_registered_optimized_integrator(registered_optimized_integrator):
+    sp, integrator = registered_optimized_integrator
+    with pytest.raises(ValueError):
+        registerTimeIntegrator('JLSRK74_UPWIND', LSERK4)
+
+    driver = MaxwellDriver(sp, timeIntegratorType='JLSRK74_UPWIND')
+    driver['E'][:] = np.exp(-sp.x**2/(2*0.25**2))
+    q0 = sp.convertToVector(driver.fields)
+
+    dt = 0.99*integrator.MAX_DT
+    steps = int(2.0/dt)
+    for _ in range(steps):
+        driver.step(dt)
+
+    q = sp.convertToVector(driver.fields)
+    expected = expm(steps*dt*sp.buildEvolutionOperator()).dot(q0)
+    assert np.max(np.abs(q - expected)) < 1e-2
+    assert np.isclose(driver.estimate_max_dt(), integrator.MAX_DT, rtol=1e-3)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from maxwell.parareal import *
+from maxwell.dg.mesh1d import *
+from maxwell.dg.dg1d import *
+from maxwell.fd.fd1d import *
+
+
+def serialRun(sp, q, final_time, windows, timeIntegratorType, CFL):
+    for _ in range(windows):
+        q, _ = propagate(sp, q, final_time/windows, timeIntegratorType, CFL)
+    return q
+
+
+def test_parareal_dg1d_converges_to_serial_run():
+    sp = DG1D(3, Mesh1D(-1.0, 1.0, 20, boundary_label='Periodic'), 'Upwind')
+    driver = PararealDriver(sp, 4.0, 8, CFL=0.5, tolerance=1e-8, processes=2)
+    driver['E'][:] = np.exp(-sp.x**2/(2*0.2**2))
+    q0 = sp.convertToVector(driver.fields)
+
+    report = driver.run()
+
+    expected = serialRun(sp, q0, 4.0, 8, 'LSERK4', 0.5)
+    assert report['iterations'] < 8
+    assert report['correction'] <= 1e-8
+    assert report['speedup'] > 0.0
+    assert np.allclose(sp.convertToVector(driver.fields), expected, atol=1e-6)
+
+
+def test_parareal_is_exact_after_as_many_iterations_as_windows():
+    sp = FD1D(Mesh1D(-1.0, 1.0, 100, boundary_label='PEC'))
+    driver = PararealDriver(sp, 1.0, 4,
+                            timeIntegratorType='LF2', CFL=0.5,
+                            coarseIntegratorType='LF2', coarseCFL=1.0,
+                            tolerance=0.0, processes=2)
+    driver['E'][:] = np.exp(-sp.x**2/(2*0.1**2))
+    q0 = sp.convertToVector(driver.fields)
+
+    report = driver.run()
+
+    assert report['iterations'] == 4
+    expected = serialRun(sp, q0, 1.0, 4, 'LF2', 0.5)
+    assert np.allclose(sp.convertToVector(driver.fields), expected, rtol=0, atol=1e-12)
+
+
+def test_parareal_rejects_time_dependent_sources():
+    sp = FD1D(Mesh1D(-1.0, 1.0, 100, boundary_label='PEC'))
+    sp.TFSF_conditions({
+        'source': lambda x: np.exp(-x**2),
+        'left': -0.5,
+        'right': 0.5
+    })
+    with pytest.raises(ValueError):
+        PararealDriver(sp, 1.0, 4)
@@ -0,0 +1,85 @@
+import io
+import json
+import numpy as np
+
+from maxwell.driver import *
+from maxwell.dg.mesh1d import *
+from maxwell.dg.dg1d import *
+from maxwell.fd.fd1d import *
+from maxwell.fd.fd2d import *
+from maxwell.dg.mesh2d import *
+from maxwell.dg.dg2d import *
+
+TEST_DATA_FOLDER = 'testData/'
+
+
+def test_profiler_dg1d_phases():
+    sp = DG1D(2, Mesh1D(-1.0, 1.0, 10, boundary_label='PEC'), 'Upwind')
+    driver = MaxwellDriver(sp)
+    driver['E'][:] = np.exp(-sp.x**2/(2*0.25**2))
+
+    with driver.startProfiling() as profiler:
+        for _ in range(10):
+            driver.step()
+
+    report = profiler.asDict()
+    phases = report['phases']
+    assert report['steps'] == 10
+    assert report['unknowns'] == 2*3*10
+    assert report['dofUpdatesPerSecond'] > 0.0
+    assert phases['LSERK4.step']['count'] == 10
+    assert phases['DG1D.computeRHS']['count'] == 10*LSERK4.N_STAGES
+    assert phases['DG1D.computeJumps']['count'] == 2*10*LSERK4.N_STAGES
+    assert phases['DG1D.computeLift']['count'] == 2*10*LSERK4.N_STAGES
+    for p in phases.values():
+        assert 0.0 <= p['selfTime'] <= p['time']
+    assert phases['MaxwellDriver.step']['time'] >= phases['LSERK4.step']['time']
+
+    # Detached on exit: methods are the class ones again.
+    assert 'computeRHS' not in vars(sp)
+    assert 'step' not in vars(driver)
+
+
+def test_profiler_does_not_change_results():
+    sp = Maxwell2D(2, readFromGambitFile(TEST_DATA_FOLDER + 'Maxwell2D_K8.neu'), 'Centered')
+    q0 = np.random.default_rng(0).random(sp.number_of_unknowns())
+
+    results = []
+    for profile in [False, True]:
+        driver = MaxwellDriver(sp, timeIntegratorType='LF2')
+        sp.copyVectorToFields(q0, driver.fields)
+        if profile:
+            profiler = driver.startProfiling()
+        for _ in range(5):
+            driver.step()
+        results.append(sp.convertToVector(driver.fields))
+    profiler.detach()
+
+    assert np.array_equal(results[0], results[1])
+    phases = profiler.asDict()['phases']
+    assert phases['Maxwell2D.computeRHSE']['count'] == 5
+    assert phases['Maxwell2D.computeCurl']['count'] == 5
+    assert phases['Maxwell2D.computeFluxE']['count'] == 5
+    assert phases['Maxwell2D.computeFluxH']['count'] == 5
+    assert phases['Maxwell2D.computeJump']['count'] == 15
+
+
+def test_profiler_fd_json_lines():
+    for sp in [FD1D(Mesh1D(-1.0, 1.0, 50, boundary_label='PEC')),
+               FD2D(x_min=0.0, x_max=1.0, kx_elem=10)]:
+        driver = MaxwellDriver(sp, timeIntegratorType='LF2')
+        profiler = driver.startProfiling()
+        for _ in range(3):
+            driver.step()
+        profiler.detach()
+
+        out = io.StringIO()
+        lines = profiler.toJSONLines(out)
+        records = [json.loads(l) for l in out.getvalue().splitlines()]
+
+        assert out.getvalue() == lines
+        name = type(sp).__name__
+        byPhase = {r['phase']: r for r in records if 'phase' in r}
+        assert byPhase[name + '.computeCurlE']['count'] == 3
+        assert byPhase[name + '.applyBoundaryConditionsE']['count'] == 3
+        assert records[-1]['steps'] == 3
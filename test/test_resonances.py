@@ -0,0 +1,59 @@
+import numpy as np
+
+from maxwell.driver import *
+from maxwell.resonances import *
+from maxwell.dg.mesh1d import *
+from maxwell.dg.dg1d import *
+
+
+def test_matrix_pencil_damped_sinusoids():
+    dt = 0.01
+    t = dt*np.arange(200)
+    signal = 2.0*np.exp(-0.3*t)*np.cos(2*np.pi*1.5*t) \
+           + 0.5*np.exp(-0.1*t)*np.cos(2*np.pi*4.0*t)
+
+    f, d, a = extractResonances(t, signal, minimumAmplitude=1e-6)
+
+    assert np.allclose(f, [1.5, 4.0])
+    assert np.allclose(d, [0.3, 0.1])
+    assert np.allclose(np.abs(a), [1.0, 0.25])
+
+
+def test_resonances_match_evolution_operator_pec():
+    sp = DG1D(2, Mesh1D(0.0, 1.0, 5, boundary_label='PEC'), 'Centered')
+    eigs = np.linalg.eigvals(sp.buildEvolutionOperator())
+    expected = np.abs(np.imag(eigs))/(2*np.pi)
+
+    driver = MaxwellDriver(sp, CFL=0.1)
+    rng = np.random.default_rng(0)
+    driver['E'][:] = rng.random(driver['E'].shape)
+    driver['H'][:] = rng.random(driver['H'].shape)
+    probe = driver.addMonitor(TimeMonitor('E', (1, 2)))
+
+    # A single period of the lowest non static mode.
+    driver.run_until(2.0)
+
+    f, d, a = extractResonances(*probe.trace(), minimumAmplitude=1e-3)
+
+    assert len(f) > 5
+    for fi in f:
+        assert np.min(np.abs(expected - fi)) < 1e-4*(1.0 + fi)
+    assert np.allclose(d, 0.0, atol=1e-3)
+
+
+def test_resonances_match_evolution_operator_periodic():
+    sp = DG1D(1, Mesh1D(0.0, 1.0, 6, boundary_label='Periodic'), 'Centered')
+    eigs = np.linalg.eigvals(sp.buildEvolutionOperator())
+    expected = np.abs(np.imag(eigs))/(2*np.pi)
+
+    driver = MaxwellDriver(sp, CFL=0.1)
+    driver['E'][:] = np.exp(-(sp.x - 0.3)**2/(2*0.1**2))
+    probe = driver.addMonitor(TimeMonitor('H', (0, 1)))
+
+    driver.run_until(1.0)
+
+    f, d, a = extractResonances(*probe.trace(), minimumAmplitude=1e-3)
+
+    assert len(f) > 2
+    for fi in f:
+        assert np.min(np.abs(expected - fi)) < 1e-4*(1.0 + fi)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from maxwell.driver import *
+from maxwell.dg.mesh1d import *
+from maxwell.fd.fd1d import *
+from maxwell.fd.fd2d import *
+from maxwell.fd.slabs import *
+
+
+def test_slabs_fd1d_are_bit_identical_to_yee():
+    K = 60
+    rng = np.random.default_rng(0)
+    for label in ["PMC", "Periodic"]:
+        sp = FD1D(Mesh1D(-1.0, 1.0, K, boundary_label=label),
+                  epsilon=1.0 + rng.random(K), sigma=rng.random(K))
+        initialFieldE = np.exp(-(sp.x - 0.3)**2/(2*0.1**2))
+
+        driver = MaxwellDriver(sp, timeIntegratorType='YEE')
+        driver['E'][:] = initialFieldE
+        for _ in range(40):
+            driver.step()
+
+        with SlabDriver(sp, processes=3) as slabs:
+            slabs['E'][:] = initialFieldE
+            slabs.run(25)
+            slabs.run(15)
+            assert np.isclose(slabs.time, driver.timeIntegrator.time)
+            assert np.array_equal(slabs['E'], driver['E'])
+            assert np.array_equal(slabs['H'], driver['H'])
+
+
+def test_slabs_fd2d_are_bit_identical_to_yee():
+    rng = np.random.default_rng(1)
+    shape = (23, 30)
+    bdrs = {"XL": "PEC", "XU": "PMC", "YL": "PMC", "YU": "PMC"}
+    sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=30, y_min=0.0, y_max=0.8, ky_elem=23,
+              boundary_labels=bdrs, epsilon=1.0 + rng.random(shape),
+              mu=1.0 + rng.random(shape), sigma=rng.random(shape))
+    xH, yH = np.meshgrid(sp.xH, sp.yH)
+    initialFieldH = np.exp(-((xH - 0.5)**2 + (yH - 0.4)**2)/(2*0.1**2))
+
+    driver = MaxwellDriver(sp, timeIntegratorType='YEE')
+    driver['H'][:,:] = initialFieldH
+    for _ in range(30):
+        driver.step()
+
+    with SlabDriver(sp, processes=4) as slabs:
+        assert slabs.slabBounds[0] == (0, 6) and slabs.slabBounds[-1][1] == 23
+        slabs['H'][:,:] = initialFieldH
+        slabs.run_until(30*driver.dt)
+        assert np.array_equal(slabs['H'], driver['H'])
+        assert np.array_equal(slabs['E']['x'], driver['E']['x'])
+        assert np.array_equal(slabs['E']['y'], driver['E']['y'])
+
+
+def test_slabs_unsupported():
+    with pytest.raises(ValueError):
+        SlabDriver(FD2D(x_min=0.0, x_max=1.0, kx_elem=30, boundary_labels="CPML"), processes=2)
+    with pytest.raises(ValueError):
+        SlabDriver(FD1D(Mesh1D(-1.0, 1.0, 10, boundary_label="Mur")), processes=2)
+    with pytest.raises(ValueError):
+        SlabDriver(FD1D(Mesh1D(-1.0, 1.0, 10, boundary_label="PEC")), processes=11)
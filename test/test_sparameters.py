@@ -0,0 +1,99 @@
+import numpy as np
+
+from maxwell.sparameters import *
+from maxwell.dg.mesh1d import *
+
+from skrf import Frequency
+from skrf.media import Freespace
+
+
+def gaussian(x0, s0):
+    return lambda x: np.exp(-(x - x0)**2/(2*s0**2))
+
+
+def test_dg1d_slab_against_skrf():
+    mu_0 = 4.0*np.pi*1e-7
+    eps_0 = 8.854187817e-12
+    Z_0 = np.sqrt(mu_0/eps_0)
+
+    epsilon_r_material = 20.0
+    rho_material = 5.0
+
+    elements = 100
+    epsilons = np.ones(elements)
+    epsilons[49] = epsilon_r_material
+    sigmas = np.zeros(elements)
+    sigmas[49] = Z_0/rho_material
+
+    sp = DG1D(
+        n_order=3,
+        mesh=Mesh1D(0.0, 1.0, elements, boundary_label="SMA"),
+        epsilon=epsilons,
+        sigma=sigmas
+    )
+
+    freq_vector = np.linspace(1e8, 1e9, 31)
+    extractor = SParameterExtractor(
+        sp, gaussian(0.25, 0.025),
+        ports=(0.05, 0.6),
+        referencePlanes=(0.49, 0.50),
+        frequencies=freq_vector,
+        final_time=4.0,
+        speedOfLight=299792458
+    )
+    s11, s21 = extractor.run()
+
+    freq_ref = Frequency.from_f(freq_vector, 'Hz')
+    air = Freespace(freq_ref)
+    mat = Freespace(freq_ref, ep_r=epsilon_r_material, rho=rho_material)
+    slab = air.thru() ** mat.line(1, unit='cm') ** air.thru()
+
+    assert np.allclose(s11, slab.s[:, 0, 0], atol=1e-4)
+    assert np.allclose(s21, slab.s[:, 1, 0], atol=1e-4)
+
+    network = extractor.toNetwork()
+    assert np.allclose(network.s[:, 1, 0], slab.s[:, 1, 0], atol=1e-4)
+
+
+def test_normalization_is_cached():
+    sp = DG1D(2, Mesh1D(0.0, 1.0, 40, boundary_label="SMA"))
+    freq_vector = np.linspace(0.5, 3.0, 6)
+
+    extractor = SParameterExtractor(
+        sp, gaussian(0.25, 0.05), (0.4, 0.8), freq_vector, 1.5
+    )
+    s11, s21 = extractor.run()
+    cacheSize = len(SParameterExtractor._normalizationCache)
+
+    s11_cached, s21_cached = extractor.run()
+    assert len(SParameterExtractor._normalizationCache) == cacheSize
+    assert np.allclose(s11, s11_cached)
+    assert np.allclose(s21, s21_cached)
+
+
+def test_normalization_cache_is_bounded():
+    sp = DG1D(1, Mesh1D(0.0, 1.0, 20, boundary_label="SMA"))
+    size = SParameterExtractor.NORMALIZATION_CACHE_SIZE
+    for i in range(size + 2):
+        SParameterExtractor(
+            sp, gaussian(0.2 + 0.01*i, 0.05), (0.4, 0.8), [1.0, 2.0], 0.2
+        ).run()
+    assert len(SParameterExtractor._normalizationCache) == size
+
+
+def test_fd1d_vacuum_is_transparent():
+    freq_vector = np.linspace(0.5, 3.0, 6)
+    # Fourth order stencils do not support Mur boundaries, the PEC walls
+    # are far enough not to be reached by the pulse.
+    for order, mesh in [(2, Mesh1D(0.0, 1.0, 200, boundary_label="Mur")),
+                        (4, Mesh1D(-1.0, 2.0, 600, boundary_label="PEC"))]:
+        sp = FD1D(mesh, order=order)
+
+        extractor = SParameterExtractor(
+            sp, gaussian(0.25, 0.05), (0.4, 0.8), freq_vector, 1.5,
+            timeIntegratorType='LF2'
+        )
+        s11, s21 = extractor.run()
+
+        assert np.allclose(s11, 0.0, atol=1e-6)
+        assert np.allclose(s21, np.exp(-2j*np.pi*freq_vector*0.4), atol=1e-2)
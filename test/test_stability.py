@@ -0,0 +1,110 @@
+import numpy as np
+
+from maxwell.driver import *
+from maxwell.dg.mesh1d import *
+from maxwell.dg.dg1d import *
+from maxwell.fd.fd1d import *
+from maxwell.fd.fd2d import *
+from maxwell.dg.mesh2d import *
+from maxwell.dg.dg2d import *
+
+from nodepy import runge_kutta_method as rk
+
+TEST_DATA_FOLDER = 'testData/'
+
+
+def test_lserk4_stability_polynomial():
+    R = stabilityPolynomial(LSERK4)
+
+    assert R.degree() == LSERK4.N_STAGES
+    assert np.allclose(R.coef[:5], [1.0, 1.0, 1/2, 1/6, 1/24])
+
+
+def test_stability_polynomial_matches_nodepy():
+    p, q = rk.loadRKM('FE').stability_function(mode='float')
+    z = np.linspace(-2.5, 0.5, 7) + 1j*np.linspace(-2.5, 2.5, 7)
+
+    assert np.allclose(stabilityPolynomial(EULER)(z), p(z)/q(z))
+
+
+def test_estimated_spectrum_matches_dense():
+    sp = DG1D(
+        n_order=3,
+        mesh=Mesh1D(-1.0, 1.0, 20, boundary_label="Periodic"),
+        fluxType="Centered"
+    )
+    eigs = np.linalg.eigvals(sp.buildEvolutionOperator())
+
+    assert np.isclose(np.max(np.abs(estimateSpectrum(sp))),
+                      np.max(np.abs(eigs)))
+
+
+def test_estimate_max_dt_dg1d_centered():
+    sp = DG1D(
+        n_order=3,
+        mesh=Mesh1D(-1.0, 1.0, 20, boundary_label="Periodic"),
+        fluxType="Centered"
+    )
+    driver = MaxwellDriver(sp, timeIntegratorType='LSERK4')
+    dt = driver.estimate_max_dt()
+
+    eigs = np.linalg.eigvals(sp.buildEvolutionOperator())
+    R = stabilityPolynomial(LSERK4)
+    assert np.max(np.abs(R(0.999*dt*eigs))) <= 1.0 + 1e-8
+    assert np.max(np.abs(R(1.01*dt*eigs))) > 1.0
+
+    assert driver.estimate_max_dt('LSERK134') > dt
+    assert driver.estimate_max_dt('CN') == np.inf
+    assert driver.estimate_max_dt('AM2') < 1e-3*dt
+
+
+def test_estimate_max_dt_is_stable():
+    sp = DG1D(
+        n_order=2,
+        mesh=Mesh1D(-1.0, 1.0, 10, boundary_label="PEC"),
+        fluxType="Upwind"
+    )
+    initialField = np.exp(-sp.x**2/(2*0.25**2))
+    dt = MaxwellDriver(sp).estimate_max_dt()
+
+    driver = MaxwellDriver(sp)
+    driver['E'][:] = initialField
+    for _ in range(2000):
+        driver.step(0.99*dt)
+    assert np.max(np.abs(driver['E'])) < 1.0
+
+    driver = MaxwellDriver(sp)
+    driver['E'][:] = initialField
+    for _ in range(2000):
+        driver.step(1.2*dt)
+    assert not np.max(np.abs(driver['E'])) < 1.0
+
+
+def test_estimate_max_dt_fd1d_leapfrog():
+    sp = FD1D(Mesh1D(-1.0, 1.0, 100, boundary_label="PEC"))
+    driver = MaxwellDriver(sp, timeIntegratorType='LF2')
+
+    assert np.isclose(driver.estimate_max_dt(), sp.dx[0], rtol=1e-3)
+
+
+def test_estimate_max_dt_maxwell2d():
+    sp = Maxwell2D(2, readFromGambitFile(TEST_DATA_FOLDER + 'Maxwell2D_K8.neu'), 'Centered')
+    driver = MaxwellDriver(sp)
+    dt = driver.estimate_max_dt()
+
+    eigs = np.linalg.eigvals(sp.buildEvolutionOperator())
+    R = stabilityPolynomial(LSERK4)
+    assert np.max(np.abs(R(0.999*dt*eigs))) <= 1.0 + 1e-8
+
+
+def test_estimate_max_dt_follows_material_changes():
+    sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=8)
+    dt = MaxwellDriver(sp, timeIntegratorType='LF2').estimate_max_dt('LSERK4')
+
+    sp.setMaterials(epsilon=0.25*np.ones((8, 8)))
+    changed = MaxwellDriver(sp, timeIntegratorType='LF2').estimate_max_dt('LSERK4')
+
+    fresh = FD2D(x_min=0.0, x_max=1.0, kx_elem=8, epsilon=0.25*np.ones((8, 8)))
+    expected = MaxwellDriver(fresh, timeIntegratorType='LF2').estimate_max_dt('LSERK4')
+    assert np.isclose(changed, expected)
+    assert np.isclose(changed, 0.5*dt, rtol=1e-3)
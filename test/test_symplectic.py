@@ -0,0 +1,171 @@
+import numpy as np
+import pytest
+from scipy.linalg import expm
+
+from maxwell.driver import *
+from maxwell.dg.mesh1d import *
+from maxwell.dg.dg1d import *
+from maxwell.fd.fd1d import *
+from maxwell.fd.fd2d import *
+
+
+def periodic_dg1d():
+    return DG1D(
+        n_order=3,
+        mesh=Mesh1D(-1.0, 1.0, 20, boundary_label="Periodic"),
+        fluxType="Centered"
+    )
+
+
+def exact_time_integration(sp, fields, final_time):
+    q0 = sp.convertToVector(fields)
+    A = sp.as_linear_operator().matmat(np.eye(q0.size))
+    q = expm(final_time*A).dot(q0)
+    exact = sp.buildFields()
+    sp.copyVectorToFields(q, exact)
+    return exact
+
+
+def errors_dg1d(integrator, steps, final_time=1.0):
+    sp = periodic_dg1d()
+    initialField = np.sin(2*np.pi*sp.x)
+
+    errors = []
+    for n in steps:
+        driver = MaxwellDriver(sp, timeIntegratorType=integrator)
+        driver['E'][:] = initialField
+        driver['H'][:] = initialField
+        if n == steps[0]:
+            exact = exact_time_integration(sp, driver.fields, final_time)
+        for _ in range(n):
+            driver.step(final_time/n)
+        errors.append(np.max(np.abs(driver['E'] - exact['E'])))
+    return np.array(errors)
+
+
+def rhs_cost(integrator):
+    ''' Evaluations of computeRHS per step, counting E and H halves. '''
+    if issubclass(integrator, PRK):
+        return 0.5*(len(integrator.A) + len(integrator.B))
+    return integrator.N_STAGES
+
+
+def test_composition_coefficients_are_consistent():
+    for integrator in [LF4, LF6, LF4BM]:
+        assert np.isclose(np.sum(integrator.A), 1.0)
+        assert np.isclose(np.sum(integrator.B), 1.0)
+        assert np.allclose(integrator.A, integrator.A[::-1])
+        assert np.allclose(integrator.B, integrator.B[::-1])
+
+
+def test_lf2v_convergence_order_dg1d():
+    # Fails if the H substep is scaled by dt/2 instead of dt.
+    errors = errors_dg1d('LF2V', [100, 200])
+    assert errors[1] < 1e-3
+    assert np.log2(errors[0]/errors[1]) > 1.8
+
+
+def test_composition_convergence_order_dg1d():
+    for integrator, order in [('LF4', 4), ('LF6', 6), ('LF4BM', 4)]:
+        errors = errors_dg1d(integrator, [100, 200])
+        assert np.log2(errors[0]/errors[1]) > order - 0.4
+
+
+def test_composition_convergence_order_fd1d():
+    sp = FD1D(Mesh1D(-1.0, 1.0, 40, boundary_label="Periodic"))
+    fields = sp.buildFields()
+    fields['E'][:] = np.sin(np.pi*sp.x)
+    exact = exact_time_integration(sp, fields, 0.5)
+
+    errors = []
+    for n in [40, 80]:
+        driver = MaxwellDriver(sp, timeIntegratorType='LF4BM')
+        driver['E'][:] = np.sin(np.pi*sp.x)
+        for _ in range(n):
+            driver.step(0.5/n)
+        errors.append(np.max(np.abs(driver['E'] - exact['E'])))
+
+    assert np.log2(errors[0]/errors[1]) > 3.6
+
+
+def test_composition_convergence_order_fd2d():
+    sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=10)
+    driver = MaxwellDriver(sp, timeIntegratorType='LF4')
+    fields = sp.buildFields()
+    fields['H'][:, :] = np.random.default_rng(0).random(fields['H'].shape)
+    q0 = sp.convertToVector(fields)
+    exact = sp.convertToVector(exact_time_integration(sp, fields, 0.2))
+
+    errors = []
+    for n in [20, 40]:
+        driver = MaxwellDriver(sp, timeIntegratorType='LF4')
+        sp.copyVectorToFields(q0, driver.fields)
+        for _ in range(n):
+            driver.step(0.2/n)
+        errors.append(np.max(np.abs(sp.convertToVector(driver.fields) - exact)))
+
+    assert np.log2(errors[0]/errors[1]) > 3.6
+
+
+def test_composition_conserves_energy():
+    sp = periodic_dg1d()
+    initialField = np.sin(2*np.pi*sp.x)
+
+    drift = {}
+    for integrator in ['LSERK4', 'LF4BM']:
+        driver = MaxwellDriver(sp, timeIntegratorType=integrator)
+        driver['E'][:] = initialField
+        driver['H'][:] = initialField
+        initialEnergy = sp.getEnergy(driver['E']) + sp.getEnergy(driver['H'])
+
+        dt = 0.8*driver.estimate_max_dt()
+        for _ in range(int(20.0/dt)):
+            driver.step(dt)
+
+        energy = sp.getEnergy(driver['E']) + sp.getEnergy(driver['H'])
+        drift[integrator] = np.abs(energy - initialEnergy)/initialEnergy
+
+    assert drift['LF4BM'] < 1e-6
+    assert drift['LF4BM'] < 1e-3*drift['LSERK4']
+
+
+def test_work_precision_against_lserk4():
+    stepsLSERK4 = 100
+    stepsLF4BM = int(stepsLSERK4*rhs_cost(LSERK4)/rhs_cost(LF4BM))
+
+    errorLSERK4 = errors_dg1d('LSERK4', [stepsLSERK4])[0]
+    errorLF4BM = errors_dg1d('LF4BM', [stepsLF4BM])[0]
+
+    assert errorLF4BM < 0.1*errorLSERK4
+
+
+def test_composition_estimated_max_dt():
+    sp = periodic_dg1d()
+    eigs = np.linalg.eigvals(sp.buildEvolutionOperator())
+    rho = np.max(np.abs(eigs))
+
+    driver = MaxwellDriver(sp, timeIntegratorType='LF2V')
+    assert np.isclose(driver.estimate_max_dt(), 2.0/rho, rtol=1e-3)
+
+    for integrator in ['LF4', 'LF6', 'LF4BM']:
+        dt = driver.estimate_max_dt(integrator)
+        w = dt*rho
+        G = TIME_INTEGRATORS[integrator].amplificationMatrix(0.999*w)
+        assert np.max(np.abs(np.linalg.eigvals(G))) <= 1.0 + 1e-8
+        G = TIME_INTEGRATORS[integrator].amplificationMatrix(1.0001*w)
+        assert np.max(np.abs(np.linalg.eigvals(G))) > 1.0 + 1e-8
+
+
+def test_prk_rejects_tfsf_sources():
+    source = lambda s: np.exp(-(s + 0.5)**2/(2*0.1**2))
+    sp = FD1D(Mesh1D(-1.0, 1.0, 40, boundary_label="Mur"))
+    sp.TFSF_conditions({"left": -0.5, "right": 0.5, "source": source})
+    with pytest.raises(ValueError):
+        MaxwellDriver(sp, timeIntegratorType='LF4')
+
+    sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=20)
+    driver = MaxwellDriver(sp, timeIntegratorType='LF4BM')
+    sp.TFSF_conditions({"left": -0.5, "right": 0.5, "bottom": -0.5, "top": 0.5,
+                        "source": source, "direction": "+x"})
+    with pytest.raises(ValueError):
+        driver.step()
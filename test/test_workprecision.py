@@ -0,0 +1,51 @@
+import numpy as np
+
+from maxwell.workprecision import *
+
+
+def test_fd1d_lf2_converges_on_cavity():
+    grid = configurationGrid('cavity', discretizations=('FD',), integrators=('LF2',),
+                             CFLs=(0.5,), elements=(10, 20, 40))
+    results = workPrecision(grid, processes=1)
+
+    errors = [r['error'] for r in results]
+    assert np.all(np.log2(np.array(errors[:-1])/errors[1:]) > 1.9)
+
+
+def test_dg1d_error_decreases_with_order_on_periodic_sine():
+    grid = configurationGrid('periodic', integrators=('LSERK4',), CFLs=(0.5,),
+                             orders=(1, 2, 3), elements=(10,))
+    results = workPrecision(grid, processes=2)
+
+    assert [r['N'] for r in results] == [1, 2, 3]
+    errors = [r['error'] for r in results]
+    assert errors[0] > errors[1] > errors[2]
+    assert all(r['wallTime'] > 0.0 for r in results)
+
+
+def test_pareto_front_and_cheapest_configuration():
+    results = [
+        {'name': 'a', 'wallTime': 1.0, 'error': 1e-2},
+        {'name': 'b', 'wallTime': 2.0, 'error': 1e-1},
+        {'name': 'c', 'wallTime': 3.0, 'error': 1e-4},
+        {'name': 'd', 'wallTime': 0.5, 'error': np.inf},
+        {'name': 'e', 'wallTime': 4.0, 'error': 1e-6},
+    ]
+
+    assert [r['name'] for r in paretoFront(results)] == ['a', 'c', 'e']
+    assert cheapestConfiguration(results, 1e-3)['name'] == 'c'
+    assert cheapestConfiguration(results, 1e-8) is None
+
+
+def test_yee_and_lf2_start_from_the_same_staggered_fields():
+    configuration = {'problem': 'periodic', 'discretization': 'FD', 'CFL': 0.5, 'K': 40}
+    errors = [runConfiguration(dict(configuration, timeIntegratorType=t))['error']
+              for t in ['LF2', 'YEE']]
+    assert np.isclose(errors[0], errors[1], rtol=1e-10)
+
+
+def test_fd_stencil_order():
+    configuration = {'problem': 'periodic', 'discretization': 'FD', 'CFL': 0.5, 'K': 20,
+                     'timeIntegratorType': 'LSERK4'}
+    errors = [runConfiguration(dict(configuration, N=N))['error'] for N in [2, 4]]
+    assert errors[1] < errors[0]/5
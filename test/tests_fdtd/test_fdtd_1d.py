@@ -1,3 +1,4 @@
+import pytest
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -5,6 +6,7 @@ from maxwell.driver import *
 from maxwell.dg.mesh1d import *
 from maxwell.dg.dg1d import *
 from maxwell.fd.fd1d import *
+from maxwell.fd.stencils import *
 
 # ······················································
 
@@ -243,3 +245,225 @@ def test_tfsf_null_field():
 
     finalFieldE = driver['E'][:]
     assert np.allclose(finalFieldE, 0.0, atol=1e-3)
+
+
+def test_fdtd_yee_matches_lf2():
+    bdrs = [
+        "PEC", "PMC", "Periodic", "Mur",
+        {"LEFT": "PMC", "RIGHT": "PEC"},
+        {"LEFT": "Mur", "RIGHT": "PEC"},
+    ]
+    for label in bdrs:
+        sp = FD1D(Mesh1D(-1.0, 1.0, 100, boundary_label=label))
+        initialFieldE = np.exp(-(sp.x - 0.3)**2/(2*0.1**2))
+
+        drivers = [MaxwellDriver(sp, timeIntegratorType=t, CFL=0.8) for t in ['LF2', 'YEE']]
+        for driver in drivers:
+            driver['E'][:] = initialFieldE[:]
+            for _ in range(150):
+                driver.step()
+
+        assert np.allclose(drivers[0]['E'], drivers[1]['E'], rtol=0, atol=1e-12)
+        assert np.allclose(drivers[0]['H'], drivers[1]['H'], rtol=0, atol=1e-12)
+
+
+def test_fdtd_dielectric_interface_reflection():
+    K = 400
+    mesh = Mesh1D(-1.0, 1.0, K, boundary_label="PEC")
+    xC = (mesh.vx[:-1] + mesh.vx[1:])/2.0
+    sp = FD1D(mesh, epsilon=np.where(xC > 0.0, 4.0, 1.0))
+
+    driver = MaxwellDriver(sp, timeIntegratorType='YEE', CFL=0.9)
+    driver['E'][:] = np.exp(-(sp.x + 0.5)**2/(2*0.05**2))
+    driver['H'][:] = np.exp(-(sp.xH + 0.5 - 0.5*driver.dt)**2/(2*0.05**2))
+    driver.run_until(0.8)
+
+    # Impedances 1 and 1/2.
+    assert np.isclose(np.min(driver['E'][sp.x < 0.0]), -1.0/3.0, atol=0.02)
+    assert np.isclose(np.max(driver['E'][sp.x > 0.0]), 2.0/3.0, atol=0.02)
+    assert np.isclose(sp.x[np.argmax(driver['E'])], 0.15, atol=0.01)
+
+
+def test_fdtd_lossy_decay():
+    K = 50
+    mesh = Mesh1D(-1.0, 1.0, K, boundary_label="Periodic")
+    sp = FD1D(mesh, epsilon=2.0*np.ones(K), sigma=np.ones(K))
+    driver = MaxwellDriver(sp, timeIntegratorType='YEE')
+    driver['E'][:] = 1.0
+    driver.run_until(1.0)
+
+    assert np.allclose(driver['E'], np.exp(-driver.timeIntegrator.time/2.0), rtol=1e-3)
+    assert np.allclose(driver['H'], 0.0)
+
+
+def test_fdtd_materials_yee_matches_lf2():
+    K = 100
+    rng = np.random.default_rng(0)
+    for label in ["PEC", "PMC", "Periodic"]:
+        sp = FD1D(Mesh1D(-1.0, 1.0, K, boundary_label=label),
+                  epsilon=1.0 + rng.random(K), mu=1.0 + rng.random(K))
+        drivers = [MaxwellDriver(sp, timeIntegratorType=t, CFL=0.8) for t in ['LF2', 'YEE']]
+        for driver in drivers:
+            driver['E'][:] = np.exp(-(sp.x - 0.3)**2/(2*0.1**2))
+            for _ in range(150):
+                driver.step()
+
+        assert np.allclose(drivers[0]['E'], drivers[1]['E'], rtol=0, atol=1e-12)
+        assert np.allclose(drivers[0]['H'], drivers[1]['H'], rtol=0, atol=1e-12)
+
+
+def test_fdtd_conductivity_yee_and_lf2_differ_by_first_order():
+    # LF2 takes the conduction current explicitly, YEE semi-implicitly.
+    K = 100
+    sp = FD1D(Mesh1D(-1.0, 1.0, K, boundary_label="PEC"), sigma=2.0*np.ones(K))
+    differences = []
+    for CFL in [0.8, 0.4]:
+        fields = []
+        for t in ['LF2', 'YEE']:
+            driver = MaxwellDriver(sp, timeIntegratorType=t, CFL=CFL)
+            driver['E'][:] = np.exp(-sp.x**2/(2*0.1**2))
+            steps = int(np.ceil(0.5/driver.dt))
+            for _ in range(steps):
+                driver.step(0.5/steps)
+            fields.append(driver['E'].copy())
+        differences.append(np.max(np.abs(fields[0] - fields[1])))
+
+    assert differences[0] > 1e-3
+    assert np.isclose(differences[0]/differences[1], 2.0, rtol=0.1)
+
+
+def test_fdtd_invalid_materials():
+    sp = FD1D(Mesh1D(-1.0, 1.0, 10, boundary_label="PEC"), epsilon=np.ones(10))
+    assert not sp.hasMaterials
+    with pytest.raises(ValueError):
+        FD1D(Mesh1D(-1.0, 1.0, 10, boundary_label="PEC"), epsilon=np.ones(9))
+    with pytest.raises(ValueError):
+        FD1D(Mesh1D(-1.0, 1.0, 10, boundary_label="Mur"), epsilon=2.0*np.ones(10))
+
+
+def test_fdtd_fourth_order_cavity():
+    def cavityError(order, K):
+        sp = FD1D(Mesh1D(0.0, 1.0, K, boundary_label="PEC"), order=order)
+        driver = MaxwellDriver(sp, timeIntegratorType='YEE', CFL=0.5)
+        driver['E'][:] = np.sin(np.pi*sp.x)
+        final_time = 2.0
+        steps = int(np.ceil(final_time/driver.dt))
+        for _ in range(steps):
+            driver.step(final_time/steps)
+        return np.max(np.abs(driver['E'] - np.sin(np.pi*sp.x)))
+
+    assert cavityError(4, 10) < cavityError(2, 10)/5
+    assert cavityError(4, 20) < cavityError(2, 20)/5
+
+
+def test_fdtd_fourth_order_cfl():
+    for label in ["PEC", "PMC", "Periodic"]:
+        sp = FD1D(Mesh1D(-1.0, 1.0, 40, boundary_label=label), order=4)
+        driver = MaxwellDriver(sp, timeIntegratorType='LF2')
+        assert np.isclose(driver.dt, 6.0/7.0*0.05)
+        assert np.isclose(driver.estimate_max_dt(), driver.dt, rtol=2e-3)
+
+
+def test_fdtd_fourth_order_phase_velocity():
+    k = 2*np.pi
+    for order in [2, 4]:
+        for N in [16, 24]:
+            sp = FD1D(Mesh1D(0.0, 1.0, N, boundary_label="Periodic"), order=order)
+            driver = MaxwellDriver(sp, timeIntegratorType='LF2', CFL=0.5)
+            driver['E'][:] = np.sin(k*sp.x)
+            driver['H'][:] = np.sin(k*(sp.xH - 0.5*driver.dt))
+            steps = 10
+            for _ in range(steps):
+                driver.step()
+
+            x = sp.x[:-1]
+            phase = np.arctan2(-np.sum(driver['E'][:-1]*np.cos(k*x)),
+                               np.sum(driver['E'][:-1]*np.sin(k*x)))
+            error = abs(phase/(k*steps*driver.dt) - 1.0)
+            assert np.isclose(error, dispersionError(order, N, CFL=0.5, dimension=1), rtol=0.1)
+
+
+def test_fdtd_dispersion_comparison():
+    comparison = dispersionComparison(tolerances=(1e-3,), CFL=0.5)[0]
+    assert comparison['cellsPerWavelength'][4] < comparison['cellsPerWavelength'][2]/2
+    assert comparison['unknownsRatio'] > 4.0
+
+
+def test_fdtd_fourth_order_invalid():
+    with pytest.raises(ValueError):
+        FD1D(Mesh1D(-1.0, 1.0, 10, boundary_label="Mur"), order=4)
+    with pytest.raises(ValueError):
+        FD1D(Mesh1D(-1.0, 1.0, 10, boundary_label="PEC"), order=3)
+    sp = FD1D(Mesh1D(-1.0, 1.0, 10, boundary_label="PEC"), order=4)
+    with pytest.raises(ValueError):
+        sp.TFSF_conditions({"source": lambda x: 0.0*x, "left": -0.5, "right": 0.5})
+
+
+def test_tfsf_analytic_incident_field():
+    source = lambda x: np.exp(-(x + 1.5)**2/(2*0.1**2))
+
+    def run(incident):
+        sp = FD1D(mesh=Mesh1D(-2.0, 1.0, 300, boundary_label="Mur"))
+        sp.TFSF_conditions({"left": -0.8, "right": 0.6, "source": source, "incident": incident})
+        driver = MaxwellDriver(sp, timeIntegratorType='LF2', CFL=1.0)
+        history = []
+        for _ in range(300):
+            driver.step()
+            history.append(driver['E'].copy())
+        return sp, np.array(history)
+
+    _, grid = run("grid")
+    sp, analytic = run("analytic")
+    # Up to the tail of the source cut by the ends of the grid.
+    assert np.allclose(analytic, grid, atol=1e-5)
+
+    # Incident values are only computed and stored at the TF/SF boundaries.
+    assert not hasattr(sp, "Einc") and not hasattr(sp, "Hinc")
+    assert sp.incidentE.shape == (2,) and sp.incidentH.shape == (2,)
+    assert np.max(np.abs(analytic)) > 0.99
+    assert np.allclose(analytic[-1], 0.0, atol=1e-6)
+
+
+def test_tfsf_analytic_dispersion_correction():
+    k0 = 40*np.pi
+    source = lambda x: np.exp(-(x + 1.6)**2/(2*0.15**2))*np.sin(k0*x)
+
+    def leakage(wavenumber):
+        sp = FD1D(mesh=Mesh1D(-1.0, 1.0, 400, boundary_label="PEC"))
+        sp.TFSF_conditions({"left": -0.8, "right": 0.8, "source": source,
+                            "incident": "analytic", "wavenumber": wavenumber})
+        driver = MaxwellDriver(sp, timeIntegratorType='LF2', CFL=0.5)
+        scattered = np.abs(sp.x) > 0.81
+        leak = 0.0
+        for _ in range(int(4.0/driver.dt)):
+            driver.step()
+            leak = max(leak, np.max(np.abs(driver['E'][scattered])))
+        return leak
+
+    assert leakage(k0) < leakage(0.0)/5
+
+
+def test_tfsf_analytic_variable_time_step():
+    k0 = 40*np.pi
+    source = lambda x: np.exp(-(x + 1.6)**2/(2*0.15**2))*np.sin(k0*x)
+    sp = FD1D(mesh=Mesh1D(-1.0, 1.0, 400, boundary_label="PEC"))
+    sp.TFSF_conditions({"left": -0.8, "right": 0.8, "source": source,
+                        "incident": "analytic", "wavenumber": k0})
+    driver = MaxwellDriver(sp, timeIntegratorType='LF2', CFL=0.5)
+
+    # The wave travels at the phase velocity of the dt of each step.
+    h = sp.dx[0]
+    shift = 0.0
+    steps = int(1.0/driver.dt)
+    for n in range(2*steps):
+        dt = driver.dt if n < steps else 0.5*driver.dt
+        driver.step(dt)
+        shift += dt*phaseVelocity(k0*h, dt/h)
+    assert np.isclose(sp.incidentShiftE, shift)
+    assert np.allclose(sp.incidentE, source(sp.x[[sp.left_TF_limit, sp.right_TF_limit]] - shift))
+
+
+def test_tfsf_invalid_incident_mode():
+    sp = FD1D(mesh=Mesh1D(-1.0, 1.0, 20, boundary_label="Mur"))
+    with pytest.raises(ValueError):
+        sp.TFSF_conditions({"left": -0.5, "right": 0.5, "source": np.sin, "incident": "local"})
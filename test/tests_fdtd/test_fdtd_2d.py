@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+import pytest
 
 from maxwell.dg.mesh2d import *
 from maxwell.dg.dg2d import *
@@ -108,3 +109,316 @@ def test_fdtd2d_te_pmc_y():
     finalFieldH = driver['H']
     R = np.corrcoef(initialFieldH.ravel(), -finalFieldH.ravel())
     assert R[0, 1] > 0.9999
+
+
+def test_fdtd2d_yee_matches_lf2():
+    for bdrs in [
+        {"XL": "PEC", "XU": "PMC", "YL": "PMC", "YU": "PEC"},
+        {"XL": "PMC", "XU": "PEC", "YL": "PEC", "YU": "PMC"},
+    ]:
+        sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=40, boundary_labels=bdrs)
+        xH, yH = np.meshgrid(sp.xH, sp.yH)
+        initialFieldH = np.exp(-(xH**2 + yH**2)/(2*0.25**2))
+
+        drivers = [MaxwellDriver(sp, timeIntegratorType=t) for t in ['LF2', 'YEE']]
+        for driver in drivers:
+            driver['H'][:,:] = initialFieldH[:,:]
+            for _ in range(100):
+                driver.step()
+
+        assert np.allclose(drivers[0]['H'], drivers[1]['H'], rtol=0, atol=1e-12)
+        assert np.allclose(drivers[0]['E']['x'], drivers[1]['E']['x'], rtol=0, atol=1e-12)
+        assert np.allclose(drivers[0]['E']['y'], drivers[1]['E']['y'], rtol=0, atol=1e-12)
+
+
+def test_fdtd2d_tiled_steps_are_bit_identical():
+    bdrs = {
+        "XL": "PMC",
+        "XU": "PEC",
+        "YL": "PMC",
+        "YU": "PMC"
+    }
+    sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=50, boundary_labels=bdrs)
+    xH, yH = np.meshgrid(sp.xH, sp.yH)
+    initialFieldH = np.exp(-((xH - 0.2)**2 + yH**2)/(2*0.2**2))
+    dt = MaxwellDriver(sp, timeIntegratorType='YEE').dt
+
+    reference = sp.buildFields()
+    reference['H'][:,:] = initialFieldH
+    for _ in range(24):
+        sp.updateE(reference, dt)
+        sp.updateH(reference, dt)
+
+    for tileRows, steps in [(8, 3), (7, 4), (4, 6), (50, 6), (13, 12)]:
+        fields = sp.buildFields()
+        fields['H'][:,:] = initialFieldH
+        for _ in range(24 // steps):
+            sp.stepTiled(fields, dt, steps, tileRows)
+
+        assert np.array_equal(fields['H'], reference['H'])
+        assert np.array_equal(fields['E']['x'], reference['E']['x'])
+        assert np.array_equal(fields['E']['y'], reference['E']['y'])
+
+
+def test_fdtd2d_rectangular_cavity_mode():
+    sp = FD2D(x_min=0.0, x_max=2.0, kx_elem=40, y_min=0.0, y_max=1.0, ky_elem=20)
+    driver = MaxwellDriver(sp, timeIntegratorType='YEE', CFL=0.9)
+    xH, yH = np.meshgrid(sp.xH, sp.yH)
+    assert xH.shape == (20, 40)
+
+    # TE10 mode, angular frequency pi/2.
+    initialFieldH = np.cos(np.pi*xH/2.0)
+    driver['H'][:,:] = initialFieldH
+    final_time = 2.0
+    steps = int(np.ceil(final_time/driver.dt))
+    for _ in range(steps):
+        driver.step(final_time/steps)
+
+    assert np.allclose(driver['H'], -initialFieldH, atol=2e-3)
+
+
+def test_fdtd2d_graded_grid():
+    def halfPeriodError(sp):
+        driver = MaxwellDriver(sp, timeIntegratorType='YEE', CFL=0.9)
+        xH, yH = np.meshgrid(sp.xH, sp.yH)
+        initialFieldH = np.cos(np.pi*xH)*np.cos(np.pi*yH)
+        driver['H'][:,:] = initialFieldH
+        final_time = 1.0/np.sqrt(2.0)
+        steps = int(np.ceil(final_time/driver.dt))
+        for _ in range(steps):
+            driver.step(final_time/steps)
+        return np.max(np.abs(driver['H'] + initialFieldH))
+
+    # Cells 4 times smaller than uniform ones at x = 0 and 1 and 7 times
+    # smaller than the largest ones, at x = 0.5.
+    u = np.linspace(0.0, 1.0, 41)
+    x = u - 0.75/(2*np.pi)*np.sin(2*np.pi*u)
+    graded = FD2D.fromNodes(x, np.linspace(0.0, 1.0, 21))
+    assert np.isclose(np.max(graded.dx)/np.min(graded.dx), 7.0, rtol=0.05)
+
+    coarse = FD2D(x_min=0.0, x_max=1.0, kx_elem=20)
+    assert halfPeriodError(graded) < 0.02
+    assert halfPeriodError(coarse) < 0.02
+
+    uniform = FD2D.fromNodes(np.linspace(0.0, 1.0, 21), np.linspace(0.0, 1.0, 21))
+    assert np.array_equal(uniform.x, coarse.x)
+    assert np.allclose(uniform.cEx, coarse.cEx)
+
+
+def test_fdtd2d_graded_grid_beats_uniform_grid_on_dielectric():
+    # Pulse entering a dielectric strip, epsilon = 9, on x < 0.25 where
+    # the graded grid has three times more cells.
+    def finalH(x, final_time=0.8):
+        y = np.linspace(0.0, 0.1, 3)
+        xH = (x[:-1] + x[1:])/2
+        epsilon = np.where(xH < 0.25, 9.0, 1.0)*np.ones((len(y) - 1, 1))
+        sp = FD2D.fromNodes(x, y, epsilon=epsilon)
+        driver = MaxwellDriver(sp, timeIntegratorType='YEE', CFL=0.9)
+        driver['H'][:, :] = np.exp(-(sp.xH - 0.6)**2/(2*0.05**2))
+        steps = int(np.ceil(final_time/driver.dt))
+        for _ in range(steps):
+            driver.step(final_time/steps)
+        return sp.xH, driver['H'][0].copy()
+
+    xRef, HRef = finalH(np.linspace(0.0, 1.0, 961))
+
+    def error(x):
+        xH, H = finalH(x)
+        return np.max(np.abs(H - np.interp(xH, xRef, HRef)))
+
+    uniform = np.linspace(0.0, 1.0, 61)
+    graded = np.concatenate([np.linspace(0.0, 0.25, 31), np.linspace(0.25, 1.0, 31)[1:]])
+    assert error(graded) < 0.6*error(uniform)
+
+
+def test_fdtd2d_graded_tiled_steps_are_bit_identical():
+    x = np.cumsum(np.concatenate([[0.0], np.linspace(0.02, 0.06, 30)]))
+    y = np.cumsum(np.concatenate([[0.0], np.linspace(0.05, 0.01, 37)]))
+    sp = FD2D.fromNodes(x, y, boundary_labels={"XL": "PEC", "XU": "PMC", "YL": "PMC", "YU": "PEC"})
+    xH, yH = np.meshgrid(sp.xH, sp.yH)
+    dt = MaxwellDriver(sp, timeIntegratorType='YEE').dt
+
+    reference = sp.buildFields()
+    reference['H'][:,:] = np.exp(-((xH - 0.5)**2 + (yH - 0.4)**2)/(2*0.1**2))
+    fields = sp.buildFields()
+    fields['H'][:,:] = reference['H']
+    for _ in range(12):
+        sp.updateE(reference, dt)
+        sp.updateH(reference, dt)
+    for _ in range(3):
+        sp.stepTiled(fields, dt, 4, tileRows=9)
+
+    assert np.array_equal(fields['H'], reference['H'])
+    assert np.array_equal(fields['E']['x'], reference['E']['x'])
+
+
+def test_fdtd2d_invalid_grids():
+    with pytest.raises(ValueError):
+        FD2D(x_min=0.0, x_max=1.0, kx_elem=10, y_min=1.0, y_max=0.0, ky_elem=10)
+    with pytest.raises(ValueError):
+        FD2D.fromNodes([0.0, 0.5, 0.4, 1.0], [0.0, 1.0])
+
+
+def test_fdtd2d_cpml_absorbs_outgoing_pulse():
+    def run(sp):
+        driver = MaxwellDriver(sp, timeIntegratorType='YEE')
+        xH, yH = np.meshgrid(sp.xH, sp.yH)
+        driver['H'][:,:] = np.exp(-(xH**2 + yH**2)/(2*0.1**2))
+        dt = 0.9*0.02/np.sqrt(2.0)
+        for _ in range(int(2.0/dt)):
+            driver.step(dt)
+        return driver['H']
+
+    # Region of interest [-1, 1]^2 with 10 cells of CPML or PEC around it.
+    n = 10
+    cpml = FD2D(x_min=-1.2, x_max=1.2, kx_elem=120, boundary_labels="CPML")
+    pec = FD2D(x_min=-1.2, x_max=1.2, kx_elem=120, boundary_labels="PEC")
+    reference = FD2D(x_min=-4.0, x_max=4.0, kx_elem=400)
+
+    roi = slice(n, n + 100)
+    expected = run(reference)[150:250, 150:250]
+
+    assert np.max(np.abs(run(cpml)[roi, roi] - expected)) < 1e-4
+    assert np.max(np.abs(run(pec)[roi, roi] - expected)) > 1e-1
+
+    # Auxiliary fields are only stored in the layers.
+    for layer in cpml.cpmlLayers:
+        assert n in layer['psi']['E'].shape
+        assert n in layer['psi']['H'].shape
+
+
+def test_fdtd2d_cpml_requires_yee():
+    sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=40,
+              boundary_labels={"XL": "CPML", "XU": "PEC", "YL": "PEC", "YU": "PEC"})
+    sp.setCPML(thickness=5, grading=4, reflection=1e-8)
+    assert len(sp.cpmlLayers) == 1
+
+    driver = MaxwellDriver(sp, timeIntegratorType='LF2')
+    with pytest.raises(ValueError):
+        driver.step()
+    with pytest.raises(ValueError):
+        sp.stepTiled(driver.fields, driver.dt, 2)
+
+
+def test_fdtd2d_cpml_settings():
+    # The default 10 cell layer does not fit this grid.
+    with pytest.raises(ValueError):
+        FD2D(x_min=0.0, x_max=1.0, kx_elem=10, boundary_labels="CPML")
+    with pytest.raises(ValueError):
+        FD2D(x_min=0.0, x_max=1.0, kx_elem=10, boundary_labels="CPML", width=3)
+
+    sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=10, boundary_labels="CPML", thickness=3)
+    assert len(sp.cpmlLayers) == 4
+    for layer in sp.cpmlLayers:
+        assert layer['H'][0].stop - layer['H'][0].start == 3
+
+    # Settings given to setCPML are kept when the grid changes.
+    sp.setCPML(thickness=2, grading=4)
+    x = np.linspace(0.0, 1.0, 13)
+    sp.setGrid(x, x)
+    assert sp.cpmlSettings['thickness'] == 2
+    assert sp.cpmlSettings['grading'] == 4
+    for layer in sp.cpmlLayers:
+        assert layer['H'][0].stop - layer['H'][0].start == 2
+
+    nodes = FD2D.fromNodes(x, x, boundary_labels="CPML", thickness=4)
+    for layer in nodes.cpmlLayers:
+        assert layer['E'][0].stop - layer['E'][0].start == 4
+
+
+def test_fdtd2d_dielectric_cavity_mode():
+    sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=30, epsilon=4.0*np.ones((30, 30)))
+    driver = MaxwellDriver(sp, timeIntegratorType='YEE', CFL=0.9)
+    xH, yH = np.meshgrid(sp.xH, sp.yH)
+
+    # TE11 mode, angular frequency pi*sqrt(2)/2.
+    initialFieldH = np.cos(np.pi*xH)*np.cos(np.pi*yH)
+    driver['H'][:,:] = initialFieldH
+    final_time = np.sqrt(2.0)
+    steps = int(np.ceil(final_time/driver.dt))
+    for _ in range(steps):
+        driver.step(final_time/steps)
+
+    assert np.allclose(driver['H'], -initialFieldH, atol=5e-3)
+
+
+def test_fdtd2d_materials_yee_matches_lf2():
+    rng = np.random.default_rng(0)
+    bdrs = {"XL": "PEC", "XU": "PMC", "YL": "PMC", "YU": "PEC"}
+    sp = FD2D(x_min=-1.0, x_max=1.0, kx_elem=30, boundary_labels=bdrs,
+              epsilon=1.0 + rng.random((30, 30)), mu=1.0 + rng.random((30, 30)))
+    xH, yH = np.meshgrid(sp.xH, sp.yH)
+
+    drivers = [MaxwellDriver(sp, timeIntegratorType=t) for t in ['LF2', 'YEE']]
+    for driver in drivers:
+        driver['H'][:,:] = np.exp(-(xH**2 + yH**2)/(2*0.25**2))
+        for _ in range(100):
+            driver.step()
+
+    assert np.allclose(drivers[0]['H'], drivers[1]['H'], rtol=0, atol=1e-12)
+    assert np.allclose(drivers[0]['E']['x'], drivers[1]['E']['x'], rtol=0, atol=1e-12)
+    assert np.allclose(drivers[0]['E']['y'], drivers[1]['E']['y'], rtol=0, atol=1e-12)
+
+
+def test_fdtd2d_lossy_tiled_steps_are_bit_identical():
+    rng = np.random.default_rng(1)
+    shape = (36, 40)
+    sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=40, y_min=0.0, y_max=0.9, ky_elem=36,
+              boundary_labels="PMC", epsilon=1.0 + rng.random(shape),
+              mu=1.0 + rng.random(shape), sigma=rng.random(shape))
+    xH, yH = np.meshgrid(sp.xH, sp.yH)
+    dt = MaxwellDriver(sp, timeIntegratorType='YEE').dt
+
+    reference = sp.buildFields()
+    reference['H'][:,:] = np.exp(-((xH - 0.5)**2 + (yH - 0.4)**2)/(2*0.1**2))
+    fields = sp.buildFields()
+    fields['H'][:,:] = reference['H']
+    for _ in range(12):
+        sp.updateE(reference, dt)
+        sp.updateH(reference, dt)
+    for _ in range(3):
+        sp.stepTiled(fields, dt, 4, tileRows=7)
+
+    assert np.array_equal(fields['H'], reference['H'])
+    assert np.array_equal(fields['E']['x'], reference['E']['x'])
+    assert np.array_equal(fields['E']['y'], reference['E']['y'])
+    assert np.max(np.abs(fields['H'])) < 0.9
+
+
+def test_fdtd2d_invalid_materials():
+    with pytest.raises(ValueError):
+        FD2D(x_min=0.0, x_max=1.0, kx_elem=10, epsilon=np.ones((10, 9)))
+
+
+def test_fdtd2d_fourth_order_cavity():
+    def periodError(order):
+        bdrs = {"XL": "PEC", "XU": "PMC", "YL": "PMC", "YU": "PEC"}
+        sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=10, boundary_labels=bdrs, order=order)
+        driver = MaxwellDriver(sp, timeIntegratorType='YEE', CFL=0.5)
+        xH, yH = np.meshgrid(sp.xH, sp.yH)
+        initialFieldH = np.cos(np.pi*xH/2)*np.sin(np.pi*yH/2)
+        driver['H'][:,:] = initialFieldH
+        # Angular frequency pi/sqrt(2).
+        final_time = 2*np.sqrt(2.0)
+        steps = int(np.ceil(final_time/driver.dt))
+        for _ in range(steps):
+            driver.step(final_time/steps)
+        return np.max(np.abs(driver['H'] - initialFieldH))
+
+    assert periodError(4) < periodError(2)/4
+
+
+def test_fdtd2d_fourth_order_invalid():
+    with pytest.raises(ValueError):
+        FD2D(x_min=0.0, x_max=1.0, kx_elem=10, boundary_labels="CPML", order=4)
+    with pytest.raises(ValueError):
+        FD2D.fromNodes([0.0, 0.1, 0.3, 0.6, 1.0], [0.0, 0.5, 1.0], order=4)
+    sp = FD2D(x_min=0.0, x_max=1.0, kx_elem=10, order=4)
+    with pytest.raises(ValueError):
+        sp.stepTiled(sp.buildFields(), 0.01, 2)
+
+
+def test_fdtd2d_invalid_boundary_tag():
+    with pytest.raises(ValueError):
+        FD2D(x_min=0.0, x_max=1.0, kx_elem=10,
+             boundary_labels={"XL": "PEC", "XU": "PEC", "YL": "PEC", "YT": "PEC"})